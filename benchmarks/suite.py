@@ -0,0 +1,717 @@
+"""
+Benchmark suite of the hot paths of ``sinophone``,
+on synthetic phonologies of 10 to 10k syllables from ``PhonologyGenerator``.
+
+Run ``make bench``, or ``python -m benchmarks.suite``,
+which prints the results and writes them as JSON with ``--output``.
+Compare the results of two commits with
+``python -m benchmarks.suite --compare OLD.json NEW.json``.
+Run some benchmarks by name, e.g. ``python -m benchmarks.suite parse_syllables``,
+and report the functions they spend the most time in with ``--profile``,
+e.g. ``python -m benchmarks.suite comparisons --profile``.
+"""
+
+import argparse
+import cProfile
+import json
+import os
+import platform
+import pstats
+import statistics
+import subprocess
+import sys
+import time
+import timeit
+import tracemalloc
+from collections import deque
+from dataclasses import dataclass
+from itertools import chain, cycle
+from pickle import dumps, loads
+from random import Random
+from tempfile import TemporaryDirectory
+from typing import Any, Callable, Dict, List, Optional, Sequence, Tuple
+
+from sinophone.phonetics import IPAFeatureGroup, IPAString, ipa_utils
+from sinophone.phonetics.ipa_utils import IPAChar, tokenize_ipa
+from sinophone.phonology import (
+    Coda,
+    Final,
+    Initial,
+    Medial,
+    Nucleus,
+    Phonology,
+    PhonologyGenerator,
+    RenderPlan,
+    Syllable,
+    SyllableInventory,
+    SyllableParser,
+    SyllableTable,
+    Tone,
+    ToneSandhi,
+    ToneSandhiRule,
+)
+from sinophone.phonology.syllable import sort_key
+
+FORMAT = "sinophone.benchmarks"
+FORMAT_VERSION = 1
+
+SIZES = (10, 100, 1000, 10000)
+"""The numbers of syllables of the synthetic phonologies."""
+
+Setup = Callable[[int], Callable[[], object]]
+"""Sets up a benchmark of a size, and returns the function to run."""
+
+
+@dataclass(frozen=True)
+class Benchmark(object):
+    """A benchmark registered with ``@benchmark``."""
+
+    setup: Setup
+    timed: bool = True
+    """
+    Whether the function returned by ``setup`` is timed,
+    or returns what it measures itself, e.g. the memory it allocates.
+    """
+    unit: str = "s"
+    sizes: Optional[Tuple[int, ...]] = None
+    """The sizes to run the benchmark at instead of ``--sizes``."""
+
+
+BENCHMARKS: Dict[str, Benchmark] = {}
+
+
+def benchmark(
+    setup: Optional[Setup] = None,
+    *,
+    timed: bool = True,
+    unit: str = "s",
+    sizes: Optional[Tuple[int, ...]] = None,
+) -> Any:
+    """Registers a benchmark, used as ``@benchmark`` or ``@benchmark(...)``."""
+
+    def register(setup: Setup) -> Setup:
+        BENCHMARKS[setup.__name__] = Benchmark(setup, timed, unit, sizes)
+        return setup
+
+    return register if setup is None else register(setup)
+
+
+def make_collocations(size: int) -> List[Syllable]:
+    """Returns the syllables of ``PhonologyGenerator(size)``, shuffled."""
+    syllables = PhonologyGenerator(size).syllables()
+    Random(size).shuffle(syllables)
+    return syllables
+
+
+def make_phonology(size: int) -> Phonology:
+    return PhonologyGenerator(size).phonology()
+
+
+# parsing
+
+
+@benchmark
+def ipa_string_init(size: int) -> Callable[[], object]:
+    transcriptions = [str(syllable) for syllable in make_collocations(size)]
+    return lambda: [IPAString(transcription) for transcription in transcriptions]
+
+
+@benchmark
+def tokenize_ipa_strings(size: int) -> Callable[[], object]:
+    transcriptions = [str(syllable) for syllable in make_collocations(size)]
+    return lambda: [tokenize_ipa(transcription) for transcription in transcriptions]
+
+
+CORPUS_SIZE = 1 << 20
+"""The size in bytes of the corpus of transcriptions tokenizers are compared on."""
+
+
+def make_corpus(size: int) -> List[str]:
+    """Returns transcriptions of about ``size`` bytes in UTF-8."""
+    words = [str(syllable) for syllable in make_collocations(3000)]
+    transcriptions: List[str] = []
+    total = 0
+    while total < size:
+        word = words[len(transcriptions) % len(words)]
+        transcriptions.append(word)
+        total += len(word.encode("utf-8")) + 1
+    return transcriptions
+
+
+def tokenize_with_ipapy(unicode_str: str) -> List[IPAChar]:
+    """Parses with ``ipapy`` and re-wraps its characters, as ``IPAString`` used to."""
+    return [
+        getattr(ipa_utils, type(ipa_char).__name__)(ipa_char.canonical_representation)
+        for ipa_char in ipa_utils._OldIPAString(unicode_string=unicode_str)
+    ]
+
+
+@benchmark(sizes=(CORPUS_SIZE,))
+def tokenize_corpus(size: int) -> Callable[[], object]:
+    """Tokenizes a corpus of ``size`` bytes with ``tokenize_ipa``."""
+    corpus = make_corpus(size)
+    return lambda: [tokenize_ipa(transcription) for transcription in corpus]
+
+
+@benchmark(sizes=(CORPUS_SIZE,))
+def tokenize_corpus_with_ipapy(size: int) -> Callable[[], object]:
+    """Tokenizes the corpus of ``tokenize_corpus`` with ``ipapy``, to compare."""
+    corpus = make_corpus(size)
+    assert all(tokenize_with_ipapy(t) == tokenize_ipa(t) for t in corpus[:1000])
+    return lambda: [tokenize_with_ipapy(transcription) for transcription in corpus]
+
+
+@benchmark
+def parse_syllables(size: int) -> Callable[[], object]:
+    initials, finals, tones = PhonologyGenerator(size).inventory()
+    transcriptions = [str(syllable) for syllable in make_collocations(size)]
+    return lambda: list(
+        SyllableParser(initials, finals, tones).parse_many(transcriptions)
+    )
+
+
+@benchmark
+def parse_repeated_syllables(size: int) -> Callable[[], object]:
+    """Parses ``10 * size`` transcriptions of ``size`` syllables with one parser."""
+    phonology = make_phonology(size)
+    words = [str(syllable) for syllable in phonology.syllables]
+    random = Random(0)
+    transcriptions = [random.choice(words) for _ in range(10 * size)]
+    return lambda: list(phonology.parse_syllables(transcriptions))
+
+
+@benchmark(timed=False, unit="s", sizes=(1,))
+def import_sinophone(size: int) -> Callable[[], object]:
+    """Imports ``sinophone`` in a fresh interpreter, measured by ``-X importtime``."""
+
+    def run() -> float:
+        result = subprocess.run(
+            [sys.executable, "-X", "importtime", "-c", "import sinophone"],
+            capture_output=True,
+            text=True,
+            check=True,
+        )
+        for line in result.stderr.splitlines():
+            if line.startswith("import time:") and line.endswith("| sinophone"):
+                return int(line.split("|")[1]) / 1e6
+        raise RuntimeError("sinophone was not imported")
+
+    return run
+
+
+# syllables
+
+
+@benchmark(timed=False, unit="B")
+def syllables_memory(size: int) -> Callable[[], object]:
+    """Constructs syllables from strings, as a corpus loader would."""
+    phonemes = [
+        (
+            str(s.initial),
+            str(s.final.medial),
+            str(s.final.nucleus),
+            str(s.final.coda),
+            str(s.tone),
+        )
+        for s in make_collocations(size)
+    ]
+
+    def run() -> int:
+        tracemalloc.start()
+        try:
+            before = tracemalloc.take_snapshot()
+            syllables = [
+                Syllable(Initial(i), Final(Medial(m), Nucleus(n), Coda(c)), Tone(t))
+                for i, m, n, c, t in phonemes
+            ]
+            after = tracemalloc.take_snapshot()
+        finally:
+            tracemalloc.stop()
+        del syllables
+        return sum(stat.size_diff for stat in after.compare_to(before, "filename"))
+
+    return run
+
+
+@benchmark
+def syllable_set(size: int) -> Callable[[], object]:
+    syllables = make_collocations(size)
+    return lambda: set(syllables)
+
+
+@benchmark
+def syllable_lookups(size: int) -> Callable[[], object]:
+    syllables = make_collocations(size)
+    syllable_set = set(syllables)
+    return lambda: [syllable in syllable_set for syllable in syllables]
+
+
+@benchmark
+def sort_syllables(size: int) -> Callable[[], object]:
+    syllables = make_collocations(size)
+    return lambda: sorted(syllables, key=sort_key)
+
+
+@benchmark
+def sort_syllables_by_comparison(size: int) -> Callable[[], object]:
+    syllables = make_collocations(size)
+    return lambda: sorted(syllables)
+
+
+@benchmark
+def sort_ipa_chars(size: int) -> Callable[[], object]:
+    ipa_chars = list(
+        chain.from_iterable(syllable.ipa_chars for syllable in make_collocations(size))
+    )
+    return lambda: sorted(ipa_chars)
+
+
+@benchmark
+def comparisons(size: int) -> Callable[[], object]:
+    """
+    Sorts and combines syllables, finals, IPA strings and feature groups.
+    Run it with ``--profile`` for the time spent in comparisons.
+    """
+    syllables = make_collocations(size)
+    half = len(syllables) // 2
+    groups = [IPAFeatureGroup("+stop +voiced") for _ in range(size)]
+    nasal = IPAFeatureGroup("+nasal")
+
+    def run() -> None:
+        sorted(syllables)
+        sorted(syllable.final for syllable in syllables)
+        sorted(syllable.ipa_str for syllable in syllables)
+        set(syllables[: half + half // 2]) & set(syllables[half // 2 :])
+        sorted(groups)
+        for group in groups:
+            group | nasal
+
+    return run
+
+
+@benchmark
+def syllable_table_init(size: int) -> Callable[[], object]:
+    syllables = make_collocations(size)
+    return lambda: SyllableTable(syllables)
+
+
+@benchmark
+def syllable_table_sorted(size: int) -> Callable[[], object]:
+    return SyllableTable(make_collocations(size)).sorted
+
+
+@benchmark
+def syllable_table_union(size: int) -> Callable[[], object]:
+    syllables = make_collocations(size)
+    table = SyllableTable(syllables)
+    third = len(syllables) // 3
+    first = SyllableTable(syllables[: 2 * third], table.codebook)
+    second = SyllableTable(syllables[third:], table.codebook)
+    return lambda: first | second
+
+
+# phonologies
+
+
+@benchmark
+def phonology_init(size: int) -> Callable[[], object]:
+    generator = PhonologyGenerator(size)
+    syllables = generator.syllables()
+    phonotactics, rules = generator.phonotactics(), generator.phonological_rules()
+    return lambda: Phonology(
+        syllables=set(syllables),
+        phonotactics=set(phonotactics),
+        phonological_rules=list(rules),
+    )
+
+
+@benchmark
+def update_rendered_syllables(size: int) -> Callable[[], object]:
+    phonology = make_phonology(size)
+
+    def run() -> None:
+        phonology.clear_render_cache()
+        phonology.update_rendered_syllables()
+
+    return run
+
+
+@benchmark
+def render_syllable_cached(size: int) -> Callable[[], object]:
+    phonology = make_phonology(size)
+    phonology.render_cache_size = size
+    syllables = sorted(phonology.syllables, key=sort_key)
+
+    def run() -> None:
+        for syllable in syllables:
+            phonology.render_syllable(syllable)
+
+    return run
+
+
+@benchmark
+def render_workers(size: int) -> Callable[[], object]:
+    """
+    Refreshes a phonology rendering with 2 worker processes,
+    which are only used above ``CHUNK_SIZE`` syllables.
+    """
+    phonology = make_phonology(size)
+    phonology.render_cache_size = 0
+    phonology.render_workers = 2
+    return phonology.refresh
+
+
+@benchmark
+def collocations(size: int) -> Callable[[], object]:
+    phonology = make_phonology(size)
+
+    def run() -> object:
+        phonology.clear_render_cache()
+        return phonology.collocations
+
+    return run
+
+
+@benchmark
+def add_phonological_rule(size: int) -> Callable[[], object]:
+    """Removes the last rule of a phonology and adds it back."""
+    phonology = make_phonology(size)
+    rule = phonology.phonological_rules[-1]
+
+    def run() -> None:
+        phonology.remove_phonological_rule(rule)
+        phonology.add_phonological_rule(rule)
+
+    return run
+
+
+# render plans
+
+
+@benchmark
+def render_plan(size: int) -> Callable[[], object]:
+    """Renders syllables with a fresh plan of 40 constraints and 200 rules."""
+    generator = PhonologyGenerator(size, n_phonotactics=40, n_phonological_rules=200)
+    phonotactics = tuple(generator.phonotactics())
+    phonological_rules = tuple(generator.phonological_rules())
+    syllables = generator.syllables()
+
+    def run() -> None:
+        plan = RenderPlan(phonotactics, phonological_rules)
+        for syllable in syllables:
+            plan.render(syllable)
+
+    return run
+
+
+@benchmark
+def feature_dag(size: int) -> Callable[[], object]:
+    """Renders syllables with a fresh plan of 300 constraints of up to 3 clauses."""
+    generator = PhonologyGenerator(
+        size, n_phonotactics=300, n_phonological_rules=0, max_clauses=3
+    )
+    phonotactics = tuple(generator.phonotactics())
+    syllables = generator.syllables()
+
+    def run() -> None:
+        plan = RenderPlan(phonotactics, ())
+        for syllable in syllables:
+            plan.render(syllable)
+
+    return run
+
+
+# serialization
+
+
+@benchmark
+def phonology_dumps(size: int) -> Callable[[], object]:
+    return make_phonology(size).dumps
+
+
+@benchmark
+def phonology_loads(size: int) -> Callable[[], object]:
+    data = make_phonology(size).dumps()
+    return lambda: Phonology.loads(data)
+
+
+@benchmark
+def phonology_pickle_loads(size: int) -> Callable[[], object]:
+    pickled = dumps(make_phonology(size))
+    return lambda: loads(pickled)
+
+
+def write_inventory(size: int) -> Tuple[TemporaryDirectory, str]:
+    """
+    Writes the syllables of ``PhonologyGenerator(size)`` to an inventory file
+    in a temporary directory, which is removed when it is garbage collected,
+    so benchmarks keep a reference to it for as long as they use the file.
+    """
+    directory = TemporaryDirectory()
+    path = os.path.join(directory.name, "syllables.bin")
+    PhonologyGenerator(size).write_inventory(path)
+    return directory, path
+
+
+@benchmark
+def inventory_open(size: int) -> Callable[[], object]:
+    directory, path = write_inventory(size)
+
+    def run() -> None:
+        assert directory
+        SyllableInventory.open(path).close()
+
+    return run
+
+
+@benchmark
+def inventory_contains(size: int) -> Callable[[], object]:
+    directory, path = write_inventory(size)
+    inventory = SyllableInventory.open(path)
+    syllables = make_collocations(size)
+
+    def run() -> object:
+        assert directory
+        return [syllable in inventory for syllable in syllables]
+
+    return run
+
+
+@benchmark
+def inventory_decode(size: int) -> Callable[[], object]:
+    directory, path = write_inventory(size)
+    inventory = SyllableInventory.open(path)
+
+    def run() -> object:
+        assert directory
+        return list(inventory)
+
+    return run
+
+
+@benchmark
+def phonology_open_inventory(size: int) -> Callable[[], object]:
+    """Opens an inventory as a lazy phonology, with phonotactics and rules."""
+    directory, path = write_inventory(size)
+    generator = PhonologyGenerator(size)
+    phonotactics, rules = generator.phonotactics(), generator.phonological_rules()
+
+    def run() -> None:
+        assert directory
+        Phonology.open_inventory(
+            path, phonotactics=set(phonotactics), phonological_rules=list(rules)
+        ).close()
+
+    return run
+
+
+@benchmark
+def generate_syllable_table(size: int) -> Callable[[], object]:
+    return PhonologyGenerator(size).syllable_table
+
+
+@benchmark
+def write_inventory_table(size: int) -> Callable[[], object]:
+    directory = TemporaryDirectory()
+    path = os.path.join(directory.name, "syllables.bin")
+    table = PhonologyGenerator(size).syllable_table()
+
+    def run() -> None:
+        assert directory
+        SyllableInventory.write_table(path, table)
+
+    return run
+
+
+# tone sandhi
+
+
+def make_tone_sandhi(tones: List[Tone]) -> ToneSandhi:
+    """Returns Wu-like rules spreading the tone of the first syllable of a word."""
+    rules = []
+    sandhi_tones = cycle(tones)
+    for length in (4, 3, 2):
+        for tone in tones:
+            rules.append(
+                ToneSandhiRule(
+                    (tone,) + (None,) * (length - 1),
+                    tuple(next(sandhi_tones) for _ in range(length)),
+                    word_initial=True,
+                    word_final=True,
+                )
+            )
+    return ToneSandhi(rules)
+
+
+def make_words(size: int) -> Tuple[ToneSandhi, List[List[Syllable]]]:
+    """
+    Returns the tone sandhi of ``PhonologyGenerator(size)``,
+    and ``size`` words of 2 to 4 of its syllables.
+    """
+    random = Random(size)
+    generator = PhonologyGenerator(size)
+    syllables = generator.syllables()
+    words = [
+        random.sample(syllables, min(len(syllables), random.randint(2, 4)))
+        for _ in range(size)
+    ]
+    return make_tone_sandhi(generator.inventory()[2]), words
+
+
+@benchmark
+def tone_sandhi_apply_many(size: int) -> Callable[[], object]:
+    tone_sandhi, words = make_words(size)
+    return lambda: deque(tone_sandhi.apply_many(words), maxlen=0)
+
+
+@benchmark
+def tone_sandhi_apply_stream(size: int) -> Callable[[], object]:
+    tone_sandhi, words = make_words(size)
+    return lambda: deque(tone_sandhi.apply_stream(chain.from_iterable(words)), maxlen=0)
+
+
+def format_value(value: float, unit: str) -> str:
+    if unit == "s":
+        return f"{value * 1000:.2f} ms"
+    return f"{value:.0f} {unit}"
+
+
+def run_benchmarks(
+    names: Sequence[str], sizes: Sequence[int], repeat: int
+) -> List[Dict[str, Any]]:
+    """
+    Runs benchmarks, and returns the best and median of what each measures,
+    in seconds for timed benchmarks.
+    """
+    results = []
+    for name in names:
+        bench = BENCHMARKS[name]
+        for size in bench.sizes or sizes:
+            func = bench.setup(size)
+            func()  # warm up interning and caches
+            if bench.timed:
+                values = timeit.repeat(func, number=1, repeat=repeat)
+            else:
+                values = [float(func()) for _ in range(repeat)]  # type: ignore
+            result: Dict[str, Any] = {
+                "benchmark": name,
+                "size": size,
+                "unit": bench.unit,
+                "min": min(values),
+                "median": statistics.median(values),
+                "repeat": repeat,
+            }
+            print(
+                f"{name}[{size}]: {format_value(result['min'], bench.unit)}"
+                f" (median {format_value(result['median'], bench.unit)})"
+            )
+            results.append(result)
+    return results
+
+
+def profile_benchmarks(names: Sequence[str], sizes: Sequence[int], limit: int) -> None:
+    """Profiles benchmarks, and prints the ``limit`` functions taking the most time."""
+    for name in names:
+        bench = BENCHMARKS[name]
+        for size in bench.sizes or sizes:
+            func = bench.setup(size)
+            func()  # warm up interning and caches
+            profiler = cProfile.Profile()
+            profiler.runcall(func)
+            print(f"{name}[{size}]:")
+            stats = pstats.Stats(profiler, stream=sys.stdout)
+            stats.sort_stats("tottime").print_stats(limit)
+
+
+def current_commit() -> Optional[str]:
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "HEAD"], capture_output=True, text=True, check=True
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def compare(old: Dict[str, Any], new: Dict[str, Any], threshold: float) -> bool:
+    """
+    Prints the ratios of the best values of two results,
+    and returns whether any benchmark is worse than ``threshold`` times.
+    """
+    old_values = {(r["benchmark"], r["size"]): r["min"] for r in old["results"]}
+    regressed = False
+    for result in new["results"]:
+        key = (result["benchmark"], result["size"])
+        if key not in old_values:
+            continue
+        unit = result.get("unit", "s")
+        ratio = result["min"] / old_values[key] if old_values[key] else 1.0
+        flag = ""
+        if ratio > threshold:
+            flag, regressed = "  <- regressed", True
+        print(
+            f"{key[0]}[{key[1]}]: {format_value(old_values[key], unit)}"
+            f" -> {format_value(result['min'], unit)} ({ratio:.2f}x){flag}"
+        )
+    return regressed
+
+
+def main(argv: Optional[Sequence[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0].strip())
+    parser.add_argument(
+        "benchmarks", nargs="*", help=f"any of {', '.join(BENCHMARKS)} (default: all)"
+    )
+    parser.add_argument("--sizes", nargs="+", type=int, default=list(SIZES))
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument("--output", help="write the results as JSON to this file")
+    parser.add_argument(
+        "--compare", nargs=2, metavar=("OLD", "NEW"), help="compare two results"
+    )
+    parser.add_argument(
+        "--threshold",
+        type=float,
+        default=1.2,
+        help="ratio above which --compare reports a regression and exits with 1",
+    )
+    parser.add_argument(
+        "--profile",
+        nargs="?",
+        type=int,
+        const=12,
+        metavar="N",
+        help="profile the benchmarks instead, printing the N slowest functions",
+    )
+    args = parser.parse_args(argv)
+
+    if args.compare:
+        old_path, new_path = args.compare
+        with open(old_path) as old, open(new_path) as new:
+            return int(compare(json.load(old), json.load(new), args.threshold))
+
+    unknown = set(args.benchmarks) - set(BENCHMARKS)
+    if unknown:
+        parser.error(f"unknown benchmarks: {', '.join(sorted(unknown))}")
+    names = args.benchmarks or list(BENCHMARKS)
+    if args.profile is not None:
+        profile_benchmarks(names, args.sizes, args.profile)
+        return 0
+    results = run_benchmarks(names, args.sizes, args.repeat)
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump(
+                {
+                    "format": FORMAT,
+                    "version": FORMAT_VERSION,
+                    "commit": current_commit(),
+                    "timestamp": time.time(),
+                    "python": platform.python_version(),
+                    "platform": platform.platform(),
+                    "results": results,
+                },
+                f,
+                indent=2,
+            )
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -96,3 +96,11 @@ See `sinophone.options.RAINBOW_COLOR_SCHEME` for more colors.
 """
 [<IPAString 'bʊ̃ŋ˥˥'>, <IPAString 'bo˥˥'>, <IPAString 'bɐʔ˥˥'>]
 """
+
+# Parse transcriptions into syllables of the phonology,
+# segmented by its initials, finals and tones.
+list(phonology.parse_syllables(["bɐʔ˥˥", "koŋ˨˧"]))
+"""
+[<Syllable [<Initial 'b'> <Final [<Medial ''> <Nucleus 'ɐ'> <Coda 'ʔ'>]> <Tone '˥˥'>]>,
+<Syllable [<Initial 'k'> <Final [<Medial ''> <Nucleus 'o'> <Coda 'ŋ'>]> <Tone '˨˧'>]>]
+"""
@@ -1,17 +1,32 @@
-import os
+import sys
 from copy import copy
 from dataclasses import dataclass, field
 from typing import Dict
 
 
-class AnsiColors(object):
-    """ANSI colors and styles."""
-
-    os.system("")
+def enable_ansi_colors() -> None:
     """
-    https://stackoverflow.com/questions/12492810/...
-    python-how-can-i-make-the-ansi-escape-codes-to-work-also-in-windows
+    Enables ANSI escape codes in the Windows console, which does not interpret
+    them by default. Does nothing on other platforms.
+
+    https://learn.microsoft.com/en-us/windows/console/setconsolemode
     """
+    if sys.platform != "win32":
+        return
+    import ctypes
+    from ctypes import wintypes
+
+    ENABLE_VIRTUAL_TERMINAL_PROCESSING = 0x0004
+    STD_OUTPUT_HANDLE = -11
+    kernel32 = ctypes.windll.kernel32  # type: ignore
+    handle = kernel32.GetStdHandle(STD_OUTPUT_HANDLE)
+    mode = wintypes.DWORD()
+    if kernel32.GetConsoleMode(handle, ctypes.byref(mode)):
+        kernel32.SetConsoleMode(handle, mode.value | ENABLE_VIRTUAL_TERMINAL_PROCESSING)
+
+
+class AnsiColors(object):
+    """ANSI colors and styles."""
 
     BLACK = "\033[0;30;48m"
     RED = "\033[0;31;48m"
@@ -78,5 +93,7 @@ class Options(object):
         self._repr_lang = lang
 
 
+enable_ansi_colors()
+
 options = Options()
 """``sinophone`` package options."""
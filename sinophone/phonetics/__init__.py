@@ -5,9 +5,10 @@ Phonetics
 """
 
 from copy import deepcopy
+from typing import Any
 
 from .ipa_utils import (
-    DG_ALL_DESCRIPTORS,
+    IPA_CHAR_POOL,
     IPAChar,
     IPAConsonant,
     IPADescriptor,
@@ -16,14 +17,30 @@ from .ipa_utils import (
     IPAString,
     IPATone,
     IPAVowel,
+    all_descriptors,
 )
 from .phonetics import IPAFeature, IPAFeatureGroup
 
-ALL_DESCRIPTORS = deepcopy(DG_ALL_DESCRIPTORS)
-"""All valid IPA descriptors can be found in this ``IPADescriptorGroup``."""
+ALL_DESCRIPTORS: IPADescriptorGroup
+"""
+All valid IPA descriptors can be found in this ``IPADescriptorGroup``.
+It is copied on first use rather than on import.
+"""
+
+
+def __getattr__(name: str) -> Any:
+    if name == "ALL_DESCRIPTORS":
+        global ALL_DESCRIPTORS
+        ALL_DESCRIPTORS = deepcopy(all_descriptors())
+        return ALL_DESCRIPTORS
+    if name == "DG_ALL_DESCRIPTORS":
+        return all_descriptors()
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+
 
 __all__ = [
     "ALL_DESCRIPTORS",
+    "IPA_CHAR_POOL",
     "IPAChar",
     "IPAConsonant",
     "IPADescriptor",
@@ -2,22 +2,28 @@
 Fixes problems in ``ipapy``, and augment its classes for purposes of ``sinophone``.
 """
 
-from functools import total_ordering
+from functools import lru_cache, total_ordering
 from itertools import chain
 from typing import (
     TYPE_CHECKING,
     AbstractSet,
+    Any,
+    Callable,
     Collection,
+    Dict,
     FrozenSet,
+    Hashable,
     Iterator,
     List,
     MutableSequence,
+    Optional,
     Sequence,
+    Tuple,
     Union,
     overload,
 )
 
-from ipapy import IPA_TO_UNICODE as _OLD_IPA_TO_UNICODE
+from ipapy import IPA_TO_UNICODE as _OLD_IPA_TO_UNICODE, UNICODE_TO_IPA
 from ipapy.ipachar import (
     D_DIACRITIC,
     D_TONE,
@@ -37,9 +43,11 @@ from ipapy.ipadescriptor import (
 )
 
 from ..utils import (
+    Interned,
+    InternPool,
     PrettyClass,
     fix_ipapy_import_from_collections,
-    obj_to_mro_chain_names,
+    has_capability,
     warn_about_dict_ordering,
 )
 
@@ -56,24 +64,121 @@ IPA_TO_UNICODE_PATCH = {
     "low-level tone": "˨",
     "extra-low-level tone": "˩",
 }
-IPA_TO_UNICODE = _OLD_IPA_TO_UNICODE.copy()
-IPA_TO_UNICODE.update(IPA_TO_UNICODE_PATCH)
-IPA_TO_ORDER = {ipa: i for i, ipa in enumerate(IPA_TO_UNICODE.keys())}
+
+
+@lru_cache(maxsize=None)
+def ipa_to_unicode() -> Dict[str, str]:
+    """
+    Maps canonical IPA representations to Unicode strings,
+    including ``IPA_TO_UNICODE_PATCH``. Also available as ``IPA_TO_UNICODE``.
+    """
+    table = _OLD_IPA_TO_UNICODE.copy()
+    table.update(IPA_TO_UNICODE_PATCH)
+    return table
+
+
+@lru_cache(maxsize=None)
+def ipa_to_order() -> Dict[str, int]:
+    """
+    Maps canonical IPA representations to their order in the IPA alphabet.
+    Also available as ``IPA_TO_ORDER``.
+    """
+    return {ipa: i for i, ipa in enumerate(ipa_to_unicode().keys())}
+
+
+@lru_cache(maxsize=None)
+def descriptor_label_to_bit() -> Dict[str, int]:
+    """
+    Maps every descriptor label, including aliases, to the bit of its descriptor
+    in ``IPAChar.descriptor_mask``. Also available as ``DESCRIPTOR_LABEL_TO_BIT``.
+    """
+    return {
+        label: 1 << i
+        for i, descriptor in enumerate(_OLD_DG_ALL_DESCRIPTORS.descriptors)
+        for label in descriptor.labels
+    }
+
+
+IPA_CHAR_POOL = InternPool()
+"""
+The pool of all ``IPAChar`` instances.
+
+Use ``IPA_CHAR_POOL.stats()`` to inspect its size and hit rate.
+"""
 
 
 @total_ordering
-class IPAChar(PrettyClass, _OldIPAChar):
+class IPAChar(PrettyClass, _OldIPAChar, metaclass=Interned):
     """
     吳：IPA 字元
+
+    ``IPAChar`` instances are immutable flyweights:
+    constructing the same character twice returns the same object.
     """
 
+    intern_pool = IPA_CHAR_POOL
+    _frozen = False
+    _canonical_string: str
+    _hash: int
+    _ipa_order: Optional[int]
+    _descriptor_mask: int
+
     def __init__(self, descriptors: str) -> None:
         super().__init__(descriptors)
 
+    @classmethod
+    def _intern_call_key(cls, descriptors=None, *args, **kwargs) -> Optional[Hashable]:
+        if args or kwargs:
+            return None
+        if isinstance(descriptors, str):
+            return (cls, descriptors)
+        if isinstance(descriptors, (list, tuple)):
+            return (cls, tuple(descriptors))
+        return None
+
+    def _intern_canonical_key(self) -> Hashable:
+        # the spelling of descriptors shows in ``canonical_representation``,
+        # so only instances that are indistinguishable are shared
+        return (
+            type(self),
+            self._old_canonical_representation,
+            self.canonical_representation,
+        )
+
+    def _freeze(self) -> None:
+        self._frozen = True
+
+    def _compute_canonical_string(self) -> None:
+        # called by the descriptor setters, so everything derived from
+        # the descriptors is recomputed here and only here
+        super()._compute_canonical_string()
+        self._canonical_string = super().canonical_representation
+        self._hash = hash((type(self).__name__, self._canonical_string))
+        warn_about_dict_ordering()
+        self._ipa_order = ipa_to_order().get(self._canonical_string)
+        label_to_bit = descriptor_label_to_bit()
+        self._descriptor_mask = 0
+        for label in self.descriptors:
+            self._descriptor_mask |= label_to_bit.get(label, 0)
+
+    def __setattr__(self, name, value) -> None:
+        if self._frozen:
+            raise AttributeError(f"{type(self).__name__} is immutable")
+        super().__setattr__(name, value)
+
+    def __copy__(self) -> "IPAChar":
+        return self
+
+    def __deepcopy__(self, memo) -> "IPAChar":
+        return self
+
+    def __reduce__(self):
+        return (type(self), (self._old_canonical_representation,))
+
     @property
     def unicode_repr(self) -> str:
         """Returns the unicode string converted from descriptors."""
-        return IPA_TO_UNICODE[self._old_canonical_representation]
+        return ipa_to_unicode()[self._old_canonical_representation]
 
     @unicode_repr.setter
     def unicode_repr(self, value):
@@ -87,40 +192,47 @@ class IPAChar(PrettyClass, _OldIPAChar):
         The order is as defined in
         https://github.com/pettarin/ipapy/blob/v0.0.9/ipapy/data/ipa.dat.
         """
-        warn_about_dict_ordering()
-        return IPA_TO_ORDER[self._old_canonical_representation]
+        if self._ipa_order is None:
+            raise KeyError(self._canonical_string)
+        return self._ipa_order
+
+    @property
+    def descriptor_mask(self) -> int:
+        """
+        Returns the descriptors of this IPAChar as a bitmask,
+        as indexed by ``descriptor_label_to_bit()``.
+        """
+        return self._descriptor_mask
 
     @property
     def _old_canonical_representation(self) -> str:
-        super()._compute_canonical_string()
-        return super().canonical_representation
+        return self._canonical_string
 
     def __eq__(self, other) -> bool:
+        if self is other:
+            return True
         return (
             type(self) == type(other)
-            and "IPAChar" in obj_to_mro_chain_names(other)
+            and has_capability(other, "IPAChar")
             and self._old_canonical_representation
             == other._old_canonical_representation
         )
 
     def __lt__(self, other) -> bool:
-        if "IPAChar" not in obj_to_mro_chain_names(other):
+        if not has_capability(other, "IPAChar"):
             raise TypeError("Cannot compare IPAChar to non-IPAChar")
         return self.ipa_order < other.ipa_order
 
     def __hash__(self) -> int:
-        return hash((type(self).__name__, self._old_canonical_representation))
+        return self._hash
 
     def has_feature(self, feature: "IPAFeature") -> bool:
         """Returns True if this IPAChar has the given feature."""
-        return (
-            self.has_descriptor(feature.ipa_descriptor.canonical_label)
-            == feature.presence
-        )
+        return bool(self._descriptor_mask & feature.mask) == feature.presence
 
     def has_features(self, features: "IPAFeatureGroup") -> bool:
         """Returns True if this IPAChar has all the given features."""
-        return all(self.has_feature(feature) for feature in features)
+        return features.matches_mask(self._descriptor_mask)
 
 
 class IPAConsonant(IPAChar, _OldIPAConsonant):
@@ -208,6 +320,102 @@ class IPAVowel(IPAChar, _OldIPAVowel):
         return " ".join([self.height, self.backness, self.roundness, "vowel"])
 
 
+IPATrie = Dict[str, Any]
+"""A node of ``ipa_trie()``: maps a Unicode character to the next node."""
+
+_TRIE_END = ""
+"""The key of a node that holds the ``IPAChar`` of the Unicode string ending there."""
+
+_ipa_trie: Optional[IPATrie] = None
+
+
+def ipa_trie() -> IPATrie:
+    """
+    Returns the longest-match trie over the Unicode strings of IPA characters,
+    including the tone letters of ``IPA_TO_UNICODE_PATCH``.
+
+    The trie is built on first use.
+    Its leaves hold the classes and descriptors of the characters,
+    which are replaced by the interned ``IPAChar`` objects once parsed.
+    ``IPA_CHAR_POOL.clear()`` also drops the trie.
+    """
+    global _ipa_trie
+    if _ipa_trie is None:
+        unicode_to_ipa = {
+            unicode_str: (
+                globals().get(type(ipa_char).__name__),
+                ipa_char.canonical_representation,
+            )
+            for unicode_str, ipa_char in UNICODE_TO_IPA.items()
+        }
+        unicode_to_ipa.update(
+            (unicode_str, (IPATone, descriptors))
+            for descriptors, unicode_str in IPA_TO_UNICODE_PATCH.items()
+        )
+        trie: IPATrie = {}
+        for unicode_str, ipa_char in unicode_to_ipa.items():
+            if any(char not in unicode_to_ipa for char in unicode_str):
+                # ``ipapy`` rejects strings with characters not valid on their own
+                continue
+            if ipa_char[0] is None:
+                # e.g. suprasegmentals, which have no ``IPAChar`` class
+                continue
+            node = trie
+            for char in unicode_str:
+                node = node.setdefault(char, {})
+            node[_TRIE_END] = ipa_char
+        _ipa_trie = trie
+    return _ipa_trie
+
+
+def _clear_ipa_trie() -> None:
+    global _ipa_trie
+    _ipa_trie = None
+
+
+IPA_CHAR_POOL.on_clear(_clear_ipa_trie)
+
+
+def tokenize_ipa(unicode_str: str) -> List[IPAChar]:
+    """
+    Splits a Unicode string into the fewest interned ``IPAChar`` objects,
+    matching the longest IPA character at each position, as ``ipapy`` does.
+
+    Raises ``ValueError`` if the string contains characters that are not IPA valid.
+    """
+    trie = ipa_trie()
+    leaves: List[IPATrie] = []
+    i, length = 0, len(unicode_str)
+    while i < length:
+        node = trie
+        end, leaf = i, None
+        for j in range(i, length):
+            child = node.get(unicode_str[j])
+            if child is None:
+                break
+            node = child
+            if _TRIE_END in node:
+                end, leaf = j + 1, node
+        if leaf is None:
+            raise ValueError(f"'{unicode_str}' contains characters not IPA valid")
+        leaves.append(leaf)
+        i = end
+
+    ipa_chars: List[IPAChar] = []
+    hits = 0
+    for leaf in leaves:
+        ipa_char = leaf[_TRIE_END]
+        if isinstance(ipa_char, IPAChar):
+            hits += 1
+        else:
+            cls, descriptors = ipa_char
+            ipa_char = leaf[_TRIE_END] = cls(descriptors)
+        ipa_chars.append(ipa_char)
+    # characters cached in the trie count as hits of the pool
+    IPA_CHAR_POOL.hits += hits
+    return ipa_chars
+
+
 @total_ordering
 class IPAString(PrettyClass, _OldIPAString, MutableSequence[IPAChar]):
     """
@@ -224,7 +432,8 @@ class IPAString(PrettyClass, _OldIPAString, MutableSequence[IPAChar]):
 
     def __init__(self, ipa_str: Union[str, Sequence[IPAChar]] = "") -> None:
         if isinstance(ipa_str, str):
-            super().__init__(unicode_string=ipa_str)
+            # tokenized natively into interned IPAChar objects
+            super().__init__(ipa_chars=tokenize_ipa(ipa_str))
         elif isinstance(ipa_str, Sequence):
             super().__init__(ipa_chars=list(ipa_str))
         else:
@@ -232,13 +441,16 @@ class IPAString(PrettyClass, _OldIPAString, MutableSequence[IPAChar]):
                 "IPAString must be initialized with a string or sequence of IPAChars"
             )
 
-        # use newly defined IPAChar subclasses
+        # use newly defined IPAChar subclasses, which are interned
+        if all(isinstance(ipa_char, IPAChar) for ipa_char in self.__ipa_chars):
+            return
         self.ipa_chars: Sequence[IPAChar] = [
-            globals()[type(ipa_char).__name__](ipa_char.canonical_representation)
-            if type(ipa_char)
-            in [v for k, v in globals().items() if k.startswith("_OldIPA")]
-            else globals()[type(ipa_char).__name__](
-                ipa_char._old_canonical_representation
+            (
+                ipa_char
+                if isinstance(ipa_char, IPAChar)
+                else globals()[type(ipa_char).__name__](
+                    ipa_char.canonical_representation
+                )
             )
             for ipa_char in self.__ipa_chars
         ]
@@ -249,20 +461,25 @@ class IPAString(PrettyClass, _OldIPAString, MutableSequence[IPAChar]):
     def __eq__(self, other) -> bool:
         return (
             type(self) == type(other)
-            and "IPAString" in obj_to_mro_chain_names(other)
+            and has_capability(other, "IPAString")
             and self.ipa_chars == other.ipa_chars
         )
 
     def __lt__(self, other) -> bool:
-        if "IPAString" not in obj_to_mro_chain_names(other):
+        if not has_capability(other, "IPAString"):
             raise TypeError("Cannot compare IPAString to non-IPAString")
-        return tuple(self) < tuple(other)
+        return self.sort_key < other.sort_key
+
+    @property
+    def sort_key(self) -> Tuple[int, ...]:
+        """Returns the IPA orders of the characters, by which IPAStrings are ordered."""
+        return tuple(ipa_char.ipa_order for ipa_char in self.ipa_chars)
 
     def __hash__(self) -> int:
         return hash((type(self).__name__, tuple(self.ipa_chars)))
 
     def __add__(self, other) -> "IPAString":
-        if "IPAString" not in obj_to_mro_chain_names(other):
+        if not has_capability(other, "IPAString"):
             raise TypeError(
                 f"Cannot concatenate {type(other)} that is not an IPAString"
             )
@@ -313,7 +530,7 @@ class IPADescriptor(PrettyClass, _OldIPADescriptor):
     def __eq__(self, other) -> bool:
         return (
             type(self) == type(other)
-            and "IPADescriptor" in obj_to_mro_chain_names(other)
+            and has_capability(other, "IPADescriptor")
             and self.canonical_label == other.canonical_label
         )
 
@@ -348,7 +565,7 @@ class IPADescriptorGroup(
                     )
                 ]
             )
-        except (KeyError):
+        except KeyError:
             raise TypeError(
                 "IPADescriptorGroup must be initialized "
                 "with a collection of IPADescriptors"
@@ -363,12 +580,12 @@ class IPADescriptorGroup(
     def __eq__(self, other) -> bool:
         return (
             type(self) == type(other)
-            and "IPADescriptorGroup" in obj_to_mro_chain_names(other)
+            and has_capability(other, "IPADescriptorGroup")
             and self.descriptors == other.descriptors
         )
 
     def __or__(self, other):
-        if "IPADescriptorGroup" not in obj_to_mro_chain_names(other):
+        if not has_capability(other, "IPADescriptorGroup"):
             raise TypeError(
                 f"Cannot concatenate {type(other)} that is not an IPADescriptorGroup"
             )
@@ -382,7 +599,7 @@ class IPADescriptorGroup(
 
     @staticmethod
     def _check_IPADescriptor(descriptor: IPADescriptor) -> IPADescriptor:
-        if "IPADescriptor" in obj_to_mro_chain_names(descriptor):
+        if has_capability(descriptor, "IPADescriptor"):
             return descriptor
         else:
             raise TypeError(
@@ -399,7 +616,40 @@ class IPADescriptorGroup(
         self.__descriptors = value
 
 
-DG_ALL_DESCRIPTORS = IPADescriptorGroup(_OLD_DG_ALL_DESCRIPTORS)
-"""
-吳：所有描述器
-"""
+@lru_cache(maxsize=None)
+def all_descriptors() -> IPADescriptorGroup:
+    """
+    吳：所有描述器
+
+    Also available as ``DG_ALL_DESCRIPTORS``.
+    """
+    return IPADescriptorGroup(_OLD_DG_ALL_DESCRIPTORS)
+
+
+@lru_cache(maxsize=None)
+def label_to_descriptor() -> Dict[str, IPADescriptor]:
+    """
+    Maps every descriptor label, including aliases, to its ``IPADescriptor``.
+    Also available as ``LABEL_TO_DESCRIPTOR``.
+    """
+    return {
+        label: descriptor
+        for descriptor in all_descriptors()
+        for label in descriptor.labels
+    }
+
+
+_LAZY_TABLES: Dict[str, Callable[[], Any]] = {
+    "IPA_TO_UNICODE": ipa_to_unicode,
+    "IPA_TO_ORDER": ipa_to_order,
+    "DESCRIPTOR_LABEL_TO_BIT": descriptor_label_to_bit,
+    "DG_ALL_DESCRIPTORS": all_descriptors,
+    "LABEL_TO_DESCRIPTOR": label_to_descriptor,
+}
+"""Module attributes built on first use, so that importing this module is fast."""
+
+
+def __getattr__(name: str) -> Any:
+    if name in _LAZY_TABLES:
+        return _LAZY_TABLES[name]()
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
@@ -1,8 +1,18 @@
-from functools import total_ordering
-from typing import Collection, Iterator, MutableSet, Union, overload
-
-from ..utils import PrettyClass, obj_to_mro_chain_names
-from .ipa_utils import DG_ALL_DESCRIPTORS
+from functools import lru_cache, total_ordering
+from typing import (
+    Collection,
+    FrozenSet,
+    Iterable,
+    Iterator,
+    MutableSet,
+    Optional,
+    Tuple,
+    Union,
+    overload,
+)
+
+from ..utils import PrettyClass, has_capability
+from .ipa_utils import descriptor_label_to_bit, label_to_descriptor
 
 
 @total_ordering
@@ -17,17 +27,20 @@ class IPAFeature(PrettyClass):
                 presence = not presence
             descriptor = descriptor[1:]
 
-        for ipa_descriptor in DG_ALL_DESCRIPTORS:
-            if descriptor in ipa_descriptor.labels:
-                self.ipa_descriptor = ipa_descriptor
-                self.presence = presence
-                return
-
-        raise ValueError(f"Unknown descriptor: {descriptor}")
+        descriptors = label_to_descriptor()
+        if descriptor not in descriptors:
+            raise ValueError(f"Unknown descriptor: {descriptor}")
+        self.ipa_descriptor = descriptors[descriptor]
+        self.presence = presence
 
     def __str__(self) -> str:
         return f"{'+' if self.presence else '-'}{self.ipa_descriptor.canonical_label}"
 
+    @property
+    def mask(self) -> int:
+        """Returns the bit of the descriptor in ``IPAChar.descriptor_mask``."""
+        return descriptor_label_to_bit()[self.ipa_descriptor.canonical_label]
+
     def __pos__(self) -> "IPAFeature":
         return IPAFeature(self.ipa_descriptor.canonical_label, self.presence)
 
@@ -37,13 +50,13 @@ class IPAFeature(PrettyClass):
     def __eq__(self, other) -> bool:
         return (
             type(self) == type(other)
-            and "IPAFeature" in obj_to_mro_chain_names(other)
+            and has_capability(other, "IPAFeature")
             and self.presence == other.presence
             and self.ipa_descriptor == other.ipa_descriptor
         )
 
     def __gt__(self, other) -> bool:
-        if "IPAFeature" not in obj_to_mro_chain_names(other):
+        if not has_capability(other, "IPAFeature"):
             raise TypeError("Cannot compare IPAFeature to non-IPAFeature")
         if self.presence != other.presence:
             return self.presence
@@ -57,6 +70,23 @@ class IPAFeature(PrettyClass):
         )
 
 
+def _compile_masks(features: Iterable[IPAFeature]) -> Tuple[int, int]:
+    present = absent = 0
+    for feature in features:
+        if feature.presence:
+            present |= feature.mask
+        else:
+            absent |= feature.mask
+    return present, absent
+
+
+@lru_cache(maxsize=1024)
+def _parse_features(features: str) -> Tuple[FrozenSet[IPAFeature], Tuple[int, int]]:
+    """Parses and compiles features like ``"-nasal +voiced"``, with caching."""
+    parsed = frozenset(IPAFeature(feature) for feature in features.split())
+    return parsed, _compile_masks(parsed)
+
+
 @total_ordering
 class IPAFeatureGroup(MutableSet[IPAFeature], PrettyClass):
     """
@@ -75,9 +105,11 @@ class IPAFeatureGroup(MutableSet[IPAFeature], PrettyClass):
 
     def __init__(self, features: Union[str, Collection[IPAFeature]] = None) -> None:
         self.features: MutableSet[IPAFeature] = set()
-        if features is not None:
-            if isinstance(features, str):
-                features = [IPAFeature(feature) for feature in features.split()]
+        self._masks: Optional[Tuple[int, int]] = None
+        if isinstance(features, str):
+            parsed_features, self._masks = _parse_features(features)
+            self.features.update(parsed_features)
+        elif features is not None:
             for feature in features:
                 self.add(feature)
 
@@ -100,7 +132,7 @@ class IPAFeatureGroup(MutableSet[IPAFeature], PrettyClass):
         return IPAFeatureGroup([-feature for feature in self.features])
 
     def __or__(self, other) -> "IPAFeatureGroup":
-        if "IPAFeatureGroup" not in obj_to_mro_chain_names(other):
+        if not has_capability(other, "IPAFeatureGroup"):
             raise TypeError(
                 f"Cannot concatenate {type(other)} that is not an IPAFeatureGroup"
             )
@@ -109,12 +141,12 @@ class IPAFeatureGroup(MutableSet[IPAFeature], PrettyClass):
     def __eq__(self, other) -> bool:
         return (
             type(self) == type(other)
-            and "IPAFeatureGroup" in obj_to_mro_chain_names(other)
+            and has_capability(other, "IPAFeatureGroup")
             and tuple(sorted(self)) == tuple(sorted(other))
         )
 
     def __lt__(self, other) -> bool:
-        if "IPAFeatureGroup" not in obj_to_mro_chain_names(other):
+        if not has_capability(other, "IPAFeatureGroup"):
             raise TypeError("Cannot compare IPAFeatureGroup to non-IPAFeatureGroup")
         return tuple(sorted(self)) < tuple(sorted(other))
 
@@ -122,10 +154,31 @@ class IPAFeatureGroup(MutableSet[IPAFeature], PrettyClass):
         return hash((type(self).__name__, frozenset(self.features)))
 
     def add(self, value) -> None:
-        if "IPAFeature" in obj_to_mro_chain_names(value):
+        if has_capability(value, "IPAFeature"):
             self.features.add(value)
+            self._masks = None
         else:
             raise TypeError(f"{value} is not an IPA feature")
 
     def discard(self, value) -> None:
+        self._masks = None
         return self.features.discard(value)
+
+    @property
+    def masks(self) -> Tuple[int, int]:
+        """
+        Returns the bitmasks of descriptors that are required to be present,
+        and of those required to be absent.
+
+        They are compiled once and recompiled after the group is modified.
+        """
+        if self._masks is None:
+            self._masks = _compile_masks(self.features)
+        return self._masks
+
+    def matches_mask(self, descriptor_mask: int) -> bool:
+        """
+        Returns True if an ``IPAChar.descriptor_mask`` has all the features.
+        """
+        present, absent = self.masks
+        return descriptor_mask & present == present and not descriptor_mask & absent
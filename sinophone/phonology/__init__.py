@@ -4,11 +4,15 @@ Phonology
 音韻
 """
 
+from .feature_dag import FeatureDAG, FeatureTestResult, PatternExplanation
 from .phonology import (
+    CollocationGrid,
     PhonologicalRule,
     Phonology,
     PhonotacticAcceptability,
     PhonotacticConstraint,
+    RenderExplanation,
+    RenderPlan,
     SyllableFeatures,
     SyllableInPhonology,
     SyllablePattern,
@@ -26,24 +30,44 @@ from .syllable import (
     SyllableComponent,
     Tone,
 )
+from .syllable_inventory import SyllableInventory
+from .syllable_parser import SyllableParser, SyllableParserStats
+from .syllable_table import PhonemeCodebook, SyllableTable
+from .synthetic import PhonologyGenerator
+from .tone_sandhi import SyllableSequence, ToneSandhi, ToneSandhiRule
 
 __all__ = [
     "BranchSyllableComponent",
     "Coda",
+    "CollocationGrid",
+    "FeatureDAG",
+    "FeatureTestResult",
     "Final",
     "Initial",
     "LeafSyllableComponent",
     "Medial",
     "Nucleus",
+    "PatternExplanation",
+    "PhonemeCodebook",
     "PhonologicalRule",
     "Phonology",
+    "PhonologyGenerator",
     "PhonotacticAcceptability",
     "PhonotacticConstraint",
+    "RenderExplanation",
+    "RenderPlan",
     "RootSyllableComponent",
     "Syllable",
     "SyllableComponent",
     "SyllableFeatures",
     "SyllableInPhonology",
+    "SyllableInventory",
+    "SyllableParser",
+    "SyllableParserStats",
     "SyllablePattern",
+    "SyllableSequence",
+    "SyllableTable",
     "Tone",
+    "ToneSandhi",
+    "ToneSandhiRule",
 ]
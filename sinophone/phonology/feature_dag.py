@@ -0,0 +1,195 @@
+"""
+Compiles ``SyllableFeatures`` into a decision DAG shared by syllable patterns.
+
+A ``SyllableFeatures`` is a conjunction of clauses, one per component name,
+each of which is a disjunction of feature tests:
+every component with that name must have any of the features.
+Equal clauses and feature tests are shared by all the patterns added to a DAG,
+and their results are cached by component, so that each feature test
+is evaluated at most once per component, however many patterns contain it.
+"""
+
+from dataclasses import dataclass
+from itertools import chain
+from typing import (
+    TYPE_CHECKING,
+    Dict,
+    FrozenSet,
+    Iterable,
+    Iterator,
+    List,
+    Optional,
+    Tuple,
+)
+
+from ..phonetics.phonetics import IPAFeatureGroup
+from ..utils import PrettyClass, type_capabilities
+from .syllable import Syllable, SyllableComponent
+
+if TYPE_CHECKING:  # pragma: no cover
+    from .phonology import SyllableFeatures
+
+Clause = Tuple[str, Tuple[IPAFeatureGroup, ...]]
+"""A component name, and the features a component of that name must have any of."""
+
+
+@dataclass(frozen=True)
+class FeatureTestResult(object):
+    """The result of a clause of a ``SyllableFeatures`` on a syllable component."""
+
+    component: SyllableComponent
+    component_name: str
+    features: Tuple[IPAFeatureGroup, ...]
+    matched_features: Optional[IPAFeatureGroup]
+    """The first of ``features`` the component has, ``None`` if it has none."""
+
+    @property
+    def passed(self) -> bool:
+        return self.matched_features is not None
+
+    def __str__(self) -> str:
+        if self.matched_features is not None:
+            features = f"{{{self.matched_features}}}"
+            return f"{self.component_name} {self.component} has {features}"
+        features = ", ".join(f"{{{f}}}" for f in self.features)
+        return f"{self.component_name} {self.component} has none of {features}"
+
+
+@dataclass(frozen=True)
+class PatternExplanation(object):
+    """Why a syllable pattern matches a syllable or not."""
+
+    matched: bool
+    results: Tuple[FeatureTestResult, ...] = ()
+    """
+    The clauses evaluated on the components of the syllable, in order,
+    up to the first failed one. Empty for patterns other than ``SyllableFeatures``.
+    """
+
+    def __str__(self) -> str:
+        return "\n".join(map(str, self.results))
+
+
+class FeatureDAG(PrettyClass):
+    """
+    吳：特徵判定圖
+
+    ``SyllableFeatures`` compiled into shared clauses and feature tests.
+    Patterns are added with ``add``, and are then referred to by their node.
+    """
+
+    def __init__(self) -> None:
+        self.clauses: List[Clause] = []
+        # the indices in ``clauses`` of the clauses of each pattern
+        self.nodes: List[Tuple[int, ...]] = []
+        self._clause_indices: Dict[Tuple[str, FrozenSet[IPAFeatureGroup]], int] = {}
+        self._node_indices: Dict["SyllableFeatures", int] = {}
+        self._clause_results: Dict[
+            Tuple[int, SyllableComponent], Optional[IPAFeatureGroup]
+        ] = {}
+        self._test_results: Dict[Tuple[SyllableComponent, IPAFeatureGroup], bool] = {}
+
+    def __str__(self) -> str:
+        return (
+            f"{len(self.nodes)} patterns,"
+            f" {len(self.clauses)} clauses,"
+            f" {len(self._test_results)} feature tests evaluated"
+        )
+
+    @property
+    def tests_evaluated(self) -> int:
+        """How many distinct feature tests have been evaluated on components."""
+        return len(self._test_results)
+
+    def add(self, syllable_features: "SyllableFeatures") -> int:
+        """Adds a ``SyllableFeatures`` to the DAG, and returns its node."""
+        node = self._node_indices.get(syllable_features)
+        if node is None:
+            clauses = tuple(
+                self._add_clause(name, set_of_features)
+                for name, set_of_features in (
+                    syllable_features.syllable_component_features.items()
+                )
+            )
+            node = self._node_indices[syllable_features] = len(self.nodes)
+            self.nodes.append(clauses)
+        return node
+
+    def _add_clause(self, name: str, set_of_features: Iterable[IPAFeatureGroup]) -> int:
+        key = (name, frozenset(set_of_features))
+        c = self._clause_indices.get(key)
+        if c is None:
+            c = self._clause_indices[key] = len(self.clauses)
+            self.clauses.append((name, tuple(sorted(key[1], key=_masks))))
+        return c
+
+    def _clause_result(
+        self, c: int, component: SyllableComponent
+    ) -> Optional[IPAFeatureGroup]:
+        """Returns the first features of the ``c``-th clause a component has."""
+        key = (c, component)
+        if key in self._clause_results:
+            return self._clause_results[key]
+        matched_features = None
+        test_results = self._test_results
+        for features in self.clauses[c][1]:
+            test = (component, features)
+            passed = test_results.get(test)
+            if passed is None:
+                passed = test_results[test] = component.has_features(features)
+            if passed:
+                matched_features = features
+                break
+        self._clause_results[key] = matched_features
+        return matched_features
+
+    def matches_component(self, node: int, component: SyllableComponent) -> bool:
+        """
+        Returns whether a component of a syllable, together with its
+        sub-components, satisfies a pattern,
+        as ``SyllableFeatures.matches_component`` does.
+        """
+        clauses = self.clauses
+        for sub_component in chain([component], component.recursive_sub_components):
+            capabilities = type_capabilities(type(sub_component))
+            for c in self.nodes[node]:
+                if (
+                    clauses[c][0] in capabilities
+                    and self._clause_result(c, sub_component) is None
+                ):
+                    return False
+        return True
+
+    def matches(self, node: int, syllable: Syllable) -> bool:
+        """Returns whether a syllable matches a pattern."""
+        return all(
+            self.matches_component(node, component)
+            for component in syllable.sub_components
+        )
+
+    def _results(
+        self, node: int, component: SyllableComponent
+    ) -> Iterator[FeatureTestResult]:
+        for sub_component in chain([component], component.recursive_sub_components):
+            capabilities = type_capabilities(type(sub_component))
+            for c in self.nodes[node]:
+                name, features = self.clauses[c]
+                if name in capabilities:
+                    matched_features = self._clause_result(c, sub_component)
+                    yield FeatureTestResult(
+                        sub_component, name, features, matched_features
+                    )
+
+    def explain(self, node: int, syllable: Syllable) -> PatternExplanation:
+        """Returns which clauses of a pattern a syllable passes or fails."""
+        results = []
+        for component in syllable.sub_components:
+            for result in self._results(node, component):
+                results.append(result)
+                if not result.passed:
+                    return PatternExplanation(False, tuple(results))
+        return PatternExplanation(True, tuple(results))
+
+
+def _masks(features: IPAFeatureGroup) -> Tuple[int, int]:
+    return features.masks
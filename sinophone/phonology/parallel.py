@@ -0,0 +1,225 @@
+"""
+Renders syllables in worker processes.
+
+The phonotactics and phonological rules are shipped to each worker once,
+as a ``RenderPlan``, together with the initials, finals and tones to render.
+Syllables are then sent in chunks as triples of indices of their phonemes,
+and come back as their acceptability and the indices of the rules
+whose phonetic IPA strings they are realized with,
+so that little more than integers cross process boundaries.
+Results are returned in the order of the input,
+so that rendering in processes is deterministic.
+"""
+
+from itertools import product
+from pickle import PicklingError, dumps
+from typing import (
+    TYPE_CHECKING,
+    Dict,
+    Iterator,
+    List,
+    Optional,
+    Sequence,
+    Tuple,
+    TypeVar,
+    Union,
+)
+
+from ..phonetics.ipa_utils import IPAString
+from .syllable import Final, Initial, Syllable, SyllableComponent, Tone
+
+if TYPE_CHECKING:  # pragma: no cover
+    from .phonology import RenderPlan, SyllableInPhonology
+
+T = TypeVar("T")
+
+CHUNK_SIZE = 1024
+"""How many syllables a worker renders at a time."""
+
+SyllableIndices = Tuple[int, int, int]
+"""The indices of the initial, final and tone of a syllable."""
+
+EncodedOverlay = Tuple[Tuple[int, Union[int, IPAString]], ...]
+"""
+The phonetic overlay of a rendered syllable, each component encoded as
+its index in ``recursive_sub_components`` (-1 for the syllable itself),
+and each phonetic IPA string as the index of the rule it comes from.
+"""
+
+EncodedSyllable = Tuple[bool, bool, EncodedOverlay]
+"""A rendered syllable, as its existence, grammaticality and phonetic overlay."""
+
+
+class _Worker(object):
+    """The state of a worker process."""
+
+    plan: "RenderPlan"
+    initials: Sequence[Initial]
+    finals: Sequence[Final]
+    tones: Sequence[Tone]
+    rule_indices: Dict[int, int]
+
+
+_worker: Optional[_Worker] = None
+
+
+def _init_worker(
+    plan: "RenderPlan",
+    initials: Sequence[Initial],
+    finals: Sequence[Final],
+    tones: Sequence[Tone],
+) -> None:
+    global _worker
+    _worker = _Worker()
+    _worker.plan = plan
+    _worker.initials, _worker.finals, _worker.tones = initials, finals, tones
+    _worker.rule_indices = {
+        id(rule.phonetic_ipa_str): k for k, rule in enumerate(plan.phonological_rules)
+    }
+
+
+def _encode(worker: _Worker, syllable: "SyllableInPhonology") -> EncodedSyllable:
+    overlay = syllable.phonetic_overlay
+    encoded_overlay: EncodedOverlay = ()
+    if overlay:
+        components: List[SyllableComponent] = [syllable]
+        components.extend(syllable.recursive_sub_components)
+        encoded_overlay = tuple(
+            (c - 1, worker.rule_indices.get(id(overlay[component]), overlay[component]))
+            for c, component in enumerate(components)
+            if component in overlay
+        )
+    acceptability = syllable.acceptability
+    return acceptability.existent, acceptability.grammatical, encoded_overlay
+
+
+def _render_chunk(chunk: List[SyllableIndices]) -> List[EncodedSyllable]:
+    worker = _worker
+    assert worker is not None
+    initials, finals, tones, render = (
+        worker.initials,
+        worker.finals,
+        worker.tones,
+        worker.plan.render,
+    )
+    return [
+        _encode(worker, render(Syllable(initials[i], finals[f], tones[t])))
+        for i, f, t in chunk
+    ]
+
+
+def is_picklable(obj: object) -> bool:
+    """
+    Returns whether an object can be shipped to worker processes.
+    Syllable patterns defined as lambdas or local functions cannot.
+    """
+    try:
+        dumps(obj)
+    except (PicklingError, AttributeError, TypeError):
+        return False
+    return True
+
+
+def chunked(items: Sequence[T], size: int) -> Iterator[List[T]]:
+    """Splits a sequence into lists of at most ``size`` items, in order."""
+    for start in range(0, len(items), size):
+        yield list(items[start : start + size])
+
+
+def _index(phonemes: Dict[T, int], phoneme: T) -> int:
+    index = phonemes.get(phoneme)
+    if index is None:
+        index = phonemes[phoneme] = len(phonemes)
+    return index
+
+
+def _render_indices(
+    plan: "RenderPlan",
+    initials: Sequence[Initial],
+    finals: Sequence[Final],
+    tones: Sequence[Tone],
+    indices: Sequence[SyllableIndices],
+    workers: int,
+    chunk_size: int,
+) -> List["SyllableInPhonology"]:
+    # imported here, as ``multiprocessing`` is slow to import
+    from concurrent.futures import ProcessPoolExecutor
+
+    with ProcessPoolExecutor(
+        workers,
+        initializer=_init_worker,
+        initargs=(plan, list(initials), list(finals), list(tones)),
+    ) as executor:
+        encoded_syllables = [
+            encoded
+            for chunk in executor.map(_render_chunk, chunked(indices, chunk_size))
+            for encoded in chunk
+        ]
+
+    # imported here, as ``phonology`` renders syllables with this module
+    from .phonology import PhonotacticAcceptability, SyllableInPhonology
+
+    rule_ipa_strs = [rule.phonetic_ipa_str for rule in plan.phonological_rules]
+    syllables = []
+    for (i, f, t), (existent, grammatical, encoded_overlay) in zip(
+        indices, encoded_syllables
+    ):
+        syllable = SyllableInPhonology(initials[i], finals[f], tones[t])
+        syllable.acceptability = PhonotacticAcceptability(existent, grammatical)
+        if encoded_overlay:
+            sub_components = syllable.recursive_sub_components
+            for c, value in encoded_overlay:
+                component = syllable if c < 0 else sub_components[c]
+                syllable.phonetic_overlay[component] = (
+                    rule_ipa_strs[value] if isinstance(value, int) else value
+                )
+        syllables.append(syllable)
+    return syllables
+
+
+def render_in_processes(
+    plan: "RenderPlan",
+    syllables: Sequence[Syllable],
+    workers: int,
+    chunk_size: int = CHUNK_SIZE,
+) -> List["SyllableInPhonology"]:
+    """
+    Renders syllables with ``workers`` processes,
+    and returns the rendered syllables in the order of ``syllables``.
+    """
+    initial_indices: Dict[Initial, int] = {}
+    final_indices: Dict[Final, int] = {}
+    tone_indices: Dict[Tone, int] = {}
+    indices = [
+        (
+            _index(initial_indices, syllable.initial),
+            _index(final_indices, syllable.final),
+            _index(tone_indices, syllable.tone),
+        )
+        for syllable in syllables
+    ]
+    return _render_indices(
+        plan,
+        list(initial_indices),
+        list(final_indices),
+        list(tone_indices),
+        indices,
+        workers,
+        chunk_size,
+    )
+
+
+def collocate_in_processes(
+    plan: "RenderPlan",
+    initials: Sequence[Initial],
+    finals: Sequence[Final],
+    tones: Sequence[Tone],
+    workers: int,
+    chunk_size: int = CHUNK_SIZE,
+) -> List["SyllableInPhonology"]:
+    """
+    Renders all collocations of the initials, finals and tones
+    with ``workers`` processes, in order of their initials, finals and tones.
+    """
+    indices = list(product(range(len(initials)), range(len(finals)), range(len(tones))))
+    return _render_indices(plan, initials, finals, tones, indices, workers, chunk_size)
@@ -1,15 +1,24 @@
+from collections import OrderedDict
 from copy import deepcopy
 from dataclasses import asdict, dataclass, field
-from itertools import product
+from itertools import chain, product
 from typing import (
+    IO,
     AbstractSet,
     Callable,
     Dict,
+    Iterable,
+    Iterator,
     List,
     Literal,
+    MutableSequence,
     MutableSet,
+    Optional,
     Sequence,
+    Set,
+    Tuple,
     TypeVar,
+    Union,
 )
 
 from ..options import options
@@ -19,18 +28,34 @@ from ..utils import (
     PrettyClass,
     color_str,
     dict_to_frozenset,
-    obj_to_mro_chain_names,
+    has_capability,
+    observed,
     repr_set_in_order,
     sinophone_warning,
+    type_capabilities,
+)
+from .feature_dag import FeatureDAG, PatternExplanation
+from .parallel import (
+    CHUNK_SIZE,
+    collocate_in_processes,
+    is_picklable,
+    render_in_processes,
 )
 from .syllable import (
+    Coda,
     Final,
     Initial,
     LeafSyllableComponent,
+    Medial,
+    Nucleus,
     Syllable,
     SyllableComponent,
     Tone,
+    sort_key,
 )
+from .syllable_inventory import SyllableInventory
+from .syllable_parser import SyllableParser
+from .syllable_table import PhonemeCodebook, SyllableTable
 
 SyllablePattern = Callable[[Syllable], bool]
 """
@@ -90,15 +115,27 @@ class SyllableFeatures(PrettyClass):
         )
 
     def __call__(self, syllable: S) -> bool:
-        for component in syllable.recursive_sub_components:
+        return all(
+            self.matches_component(component) for component in syllable.sub_components
+        )
+
+    def matches_component(self, component: SyllableComponent) -> bool:
+        """
+        Returns whether a component of a syllable (e.g. its ``Final``),
+        together with its sub-components, satisfies the features.
+
+        A syllable is matched if and only if all its sub-components are matched,
+        so syllables can be matched component by component.
+        """
+        for sub_component in chain([component], component.recursive_sub_components):
             for (
                 component_name,
                 set_of_features,
             ) in self.syllable_component_features.items():
-                if component_name in obj_to_mro_chain_names(component):
+                if has_capability(sub_component, component_name):
                     if not any(
                         [
-                            component.has_features(features)
+                            sub_component.has_features(features)
                             for features in set_of_features
                         ]
                     ):
@@ -141,7 +178,7 @@ class PhonotacticAcceptability(PrettyClass):
                 return "NonexistentUngrammatical"
 
     def __or__(self, other) -> "PhonotacticAcceptability":
-        if "PhonotacticAcceptability" not in obj_to_mro_chain_names(other):
+        if not has_capability(other, "PhonotacticAcceptability"):
             raise TypeError(
                 f"unsupported operand type(s) for |: '{type(self)}' and '{type(other)}'"
             )
@@ -151,7 +188,7 @@ class PhonotacticAcceptability(PrettyClass):
         )
 
     def __and__(self, other) -> "PhonotacticAcceptability":
-        if "PhonotacticAcceptability" not in obj_to_mro_chain_names(other):
+        if not has_capability(other, "PhonotacticAcceptability"):
             raise TypeError(
                 f"unsupported operand type(s) for &: '{type(self)}' and '{type(other)}'"
             )
@@ -164,9 +201,40 @@ class PhonotacticAcceptability(PrettyClass):
 class SyllableInPhonology(Syllable):
     """
     吳：音節在音系中個實現
+
+    Syllable components are shared with the syllable it is rendered from,
+    and are never modified. The phonetic realizations of its components are
+    stored in ``phonetic_overlay`` instead.
     """
 
     acceptability: PhonotacticAcceptability = PhonotacticAcceptability(True, True)
+    phonetic_overlay: Dict[SyllableComponent, IPAString]
+    """Phonetic IPA strings of components, as set by phonological rules."""
+
+    def __post_init__(self) -> None:
+        super().__post_init__()
+        self.phonetic_overlay = {}
+
+    @property
+    def phonetic_ipa_str(self) -> IPAString:
+        return self.phonetic_ipa_str_of(self)
+
+    @phonetic_ipa_str.setter
+    def phonetic_ipa_str(self, value) -> None:
+        self.phonetic_overlay[self] = value
+
+    def phonetic_ipa_str_of(self, component: SyllableComponent) -> IPAString:
+        """Returns the phonetic IPA string of a component in this syllable."""
+        if component in self.phonetic_overlay:
+            return self.phonetic_overlay[component]
+        if not component.sub_components:
+            return component.phonetic_ipa_str
+
+        phonetic_ipa_str = IPAString()
+        for sub_component in component.sub_components:
+            if sub_component:
+                phonetic_ipa_str += self.phonetic_ipa_str_of(sub_component)
+        return phonetic_ipa_str
 
     @property
     def color(self) -> str:
@@ -181,14 +249,17 @@ class SyllableInPhonology(Syllable):
 
     @classmethod
     def from_syllable(cls, syllable: S) -> "SyllableInPhonology":
-        """Casts a ``Syllable`` to a ``SyllableInPhonology``."""
-        new_syllable = cls(
-            deepcopy(syllable.initial),
-            deepcopy(syllable.final),
-            deepcopy(syllable.tone),
-        )
+        """
+        Casts a ``Syllable`` to a ``SyllableInPhonology``,
+        sharing its components.
+        """
+        new_syllable = cls(syllable.initial, syllable.final, syllable.tone)
         if hasattr(syllable, "acceptability"):
             new_syllable.acceptability = syllable.acceptability  # type: ignore
+        if hasattr(syllable, "phonetic_overlay"):
+            new_syllable.phonetic_overlay.update(
+                syllable.phonetic_overlay  # type: ignore
+            )
         return new_syllable
 
 
@@ -216,10 +287,14 @@ class PhonotacticConstraint(PrettyClass):
     def apply(self, syllable: S) -> SyllableInPhonology:
         """Returns a the syllable after applying the phonotactic constraint on it."""
         new_syllable = SyllableInPhonology.from_syllable(syllable)
-        if self.syllable_pattern(new_syllable):
-            new_syllable.acceptability &= self.acceptability
+        self.apply_in_place(new_syllable)
         return new_syllable
 
+    def apply_in_place(self, syllable: SyllableInPhonology) -> None:
+        """Applies the phonotactic constraint on a ``SyllableInPhonology``."""
+        if self.syllable_pattern(syllable):
+            syllable.acceptability &= self.acceptability
+
 
 @dataclass(repr=False, order=True)
 class PhonologicalRule(PrettyClass):
@@ -247,12 +322,283 @@ class PhonologicalRule(PrettyClass):
     def apply(self, syllable: S) -> SyllableInPhonology:
         """Returns a the syllable after applying the phonological rule on it."""
         new_syllable = SyllableInPhonology.from_syllable(syllable)
-        if self.syllable_pattern(new_syllable):
-            for component in new_syllable.recursive_sub_components:
-                if component == self.phoneme:
-                    component.phonetic_ipa_str = self.phonetic_ipa_str
+        self.apply_in_place(new_syllable)
         return new_syllable
 
+    def apply_in_place(self, syllable: SyllableInPhonology) -> None:
+        """Applies the phonological rule on a ``SyllableInPhonology``."""
+        if self.syllable_pattern(syllable):
+            for component in syllable.recursive_sub_components:
+                if component == self.phoneme:
+                    syllable.phonetic_overlay[component] = self.phonetic_ipa_str
+
+
+SLOT_COMPONENT_TYPES = ((Initial,), (Final, Medial, Nucleus, Coda), (Tone,))
+"""
+The types of the components in each slot of ``Syllable.sub_components``,
+i.e. the initial, final and tone, and their sub-components.
+"""
+
+
+def pattern_slots(syllable_pattern: SyllablePattern) -> Optional[Tuple[int, ...]]:
+    """
+    Returns the slots of ``Syllable.sub_components`` that a ``SyllableFeatures``
+    tests, or ``None`` for other syllable patterns, which may test anything.
+    """
+    if not isinstance(syllable_pattern, SyllableFeatures):
+        return None
+    names = syllable_pattern.syllable_component_features.keys()
+    return tuple(
+        s
+        for s, types in enumerate(SLOT_COMPONENT_TYPES)
+        if any(name in type_capabilities(cls) for cls in types for name in names)
+    )
+
+
+ConstraintGroup = Tuple[
+    Optional[Tuple[int, ...]],
+    Tuple[Tuple[int, PhonotacticAcceptability], ...],
+    Dict[Tuple[SyllableComponent, ...], PhonotacticAcceptability],
+]
+"""
+The slots tested by a group of constraints, the indices of their patterns
+with their acceptabilities, and the acceptability of the group
+cached by the components in these slots.
+"""
+
+
+@dataclass(frozen=True)
+class RenderExplanation(object):
+    """
+    How a syllable is rendered: which constraints and rules match it,
+    and which feature tests decided them (see ``Phonology.explain``).
+    """
+
+    syllable: SyllableInPhonology
+    constraints: Tuple[Tuple[PhonotacticConstraint, PatternExplanation], ...]
+    rules: Tuple[Tuple[PhonologicalRule, PatternExplanation], ...]
+    """The rules realizing components of the syllable, in order of application."""
+
+    def __str__(self) -> str:
+        syllable = self.syllable
+        lines = [
+            f"{syllable.ipa_str} [{syllable.phonetic_ipa_str}]:"
+            f" {syllable.acceptability}"
+        ]
+        for item, explanation in chain(self.constraints, self.rules):
+            lines.append(f"{'+' if explanation.matched else '-'} {item}")
+            lines.extend(f"    {result}" for result in explanation.results)
+        return "\n".join(lines)
+
+
+@dataclass(frozen=True)
+class RenderPlan(object):
+    """
+    The phonotactics and phonological rules of a phonology,
+    compiled to render syllables without the phonology,
+    e.g. in worker processes (see ``Phonology.render_workers``).
+
+    Rules are indexed by the phoneme they realize,
+    so only the rules of the phonemes of a syllable are tried.
+    Equal syllable patterns are evaluated once per syllable,
+    and a ``SyllableFeatures`` is only evaluated once per component,
+    as it matches a syllable component by component.
+    All ``SyllableFeatures`` are compiled into one ``FeatureDAG``,
+    so that their common feature tests are evaluated once per component.
+    Constraints are grouped by the slots they test,
+    and the acceptability of each group is cached by the components in them.
+
+    Syllable patterns other than ``SyllableFeatures`` are called
+    with the syllable being rendered, and are assumed to only depend
+    on its components and, for rules, its acceptability.
+    """
+
+    phonotactics: Tuple[PhonotacticConstraint, ...]
+    phonological_rules: Tuple[PhonologicalRule, ...]
+    feature_dag: FeatureDAG = field(init=False, repr=False, compare=False)
+    _patterns: List[SyllablePattern] = field(init=False, repr=False, compare=False)
+    _dag_nodes: List[Optional[int]] = field(init=False, repr=False, compare=False)
+    _pattern_slots: List[Optional[Tuple[int, ...]]] = field(
+        init=False, repr=False, compare=False
+    )
+    _component_matches: List[Dict[SyllableComponent, bool]] = field(
+        init=False, repr=False, compare=False
+    )
+    _constraint_groups: List[ConstraintGroup] = field(
+        init=False, repr=False, compare=False
+    )
+    _rules_by_phoneme: Dict[SyllableComponent, List[Tuple[int, IPAString]]] = field(
+        init=False, repr=False, compare=False
+    )
+
+    def __post_init__(self) -> None:
+        patterns: List[SyllablePattern] = []
+        pattern_indices: Dict[SyllablePattern, int] = {}
+
+        def index(syllable_pattern: SyllablePattern) -> int:
+            if syllable_pattern not in pattern_indices:
+                pattern_indices[syllable_pattern] = len(patterns)
+                patterns.append(syllable_pattern)
+            return pattern_indices[syllable_pattern]
+
+        pattern_acceptabilities: Dict[int, PhonotacticAcceptability] = {}
+        for constraint in self.phonotactics:
+            p = index(constraint.syllable_pattern)
+            pattern_acceptabilities[p] = (
+                pattern_acceptabilities.get(p, PhonotacticAcceptability(True, True))
+                & constraint.acceptability
+            )
+
+        rules_by_phoneme: Dict[SyllableComponent, List[Tuple[int, IPAString]]] = {}
+        # the last rule applied to a component wins, so rules are tried in reverse
+        for rule in reversed(self.phonological_rules):
+            rules_by_phoneme.setdefault(rule.phoneme, []).append(
+                (index(rule.syllable_pattern), rule.phonetic_ipa_str)
+            )
+
+        feature_dag = FeatureDAG()
+        dag_nodes = [
+            feature_dag.add(pattern) if isinstance(pattern, SyllableFeatures) else None
+            for pattern in patterns
+        ]
+        slots_of_patterns = [pattern_slots(pattern) for pattern in patterns]
+        grouped_constraints: Dict[
+            Optional[Tuple[int, ...]], List[Tuple[int, PhonotacticAcceptability]]
+        ] = {}
+        for p, acceptability in pattern_acceptabilities.items():
+            grouped_constraints.setdefault(slots_of_patterns[p], []).append(
+                (p, acceptability)
+            )
+
+        object.__setattr__(self, "feature_dag", feature_dag)
+        object.__setattr__(self, "_patterns", patterns)
+        object.__setattr__(self, "_dag_nodes", dag_nodes)
+        object.__setattr__(self, "_pattern_slots", slots_of_patterns)
+        object.__setattr__(self, "_component_matches", [{} for _ in patterns])
+        object.__setattr__(
+            self,
+            "_constraint_groups",
+            [
+                (slots, tuple(constraints), {})
+                for slots, constraints in grouped_constraints.items()
+            ],
+        )
+        object.__setattr__(self, "_rules_by_phoneme", rules_by_phoneme)
+
+    def _matches(
+        self,
+        p: int,
+        syllable: SyllableInPhonology,
+        components: Sequence[SyllableComponent],
+        results: Dict[int, bool],
+    ) -> bool:
+        """Returns whether the ``p``-th pattern matches a syllable."""
+        result = results.get(p)
+        if result is None:
+            slots = self._pattern_slots[p]
+            if slots is None:
+                result = bool(self._patterns[p](syllable))
+            else:
+                matches_component = self.feature_dag.matches_component
+                node: int = self._dag_nodes[p]  # type: ignore
+                component_matches = self._component_matches[p]
+                result = True
+                for s in slots:
+                    component = components[s]
+                    matched = component_matches.get(component)
+                    if matched is None:
+                        matched = component_matches[component] = matches_component(
+                            node, component
+                        )
+                    if not matched:
+                        result = False
+                        break
+            results[p] = result
+        return result
+
+    def render(self, syllable: Syllable) -> SyllableInPhonology:
+        """Renders a syllable by applying phonotactics and phonological rules."""
+        syllable_in_phonology = SyllableInPhonology(
+            syllable.initial, syllable.final, syllable.tone
+        )
+        components = syllable_in_phonology.sub_components
+
+        acceptability = PhonotacticAcceptability(True, True)
+        results: Dict[int, bool] = {}
+        for slots, constraints, cache in self._constraint_groups:
+            if slots is None:
+                for p, constraint_acceptability in constraints:
+                    if self._matches(p, syllable_in_phonology, components, results):
+                        acceptability &= constraint_acceptability
+                continue
+            key = tuple(components[s] for s in slots)
+            group_acceptability = cache.get(key)
+            if group_acceptability is None:
+                group_acceptability = PhonotacticAcceptability(True, True)
+                for p, constraint_acceptability in constraints:
+                    if self._matches(p, syllable_in_phonology, components, results):
+                        group_acceptability &= constraint_acceptability
+                cache[key] = group_acceptability
+            acceptability &= group_acceptability
+        syllable_in_phonology.acceptability = acceptability
+
+        rules_by_phoneme = self._rules_by_phoneme
+        if rules_by_phoneme:
+            # patterns are evaluated again, as they may depend on the acceptability
+            results = {}
+            overlay = syllable_in_phonology.phonetic_overlay
+            for component in syllable_in_phonology.recursive_sub_components:
+                rules = rules_by_phoneme.get(component)
+                if rules is None:
+                    continue
+                for p, phonetic_ipa_str in rules:
+                    if self._matches(p, syllable_in_phonology, components, results):
+                        overlay[component] = phonetic_ipa_str
+                        break
+        return syllable_in_phonology
+
+    def _explain(
+        self, syllable_pattern: SyllablePattern, syllable: SyllableInPhonology
+    ) -> PatternExplanation:
+        if isinstance(syllable_pattern, SyllableFeatures):
+            node = self.feature_dag.add(syllable_pattern)
+            return self.feature_dag.explain(node, syllable)
+        return PatternExplanation(bool(syllable_pattern(syllable)))
+
+    def explain(self, syllable: Syllable) -> RenderExplanation:
+        """
+        Renders a syllable, and returns which constraints and rules match it,
+        and which feature tests decided them.
+        """
+        syllable_in_phonology = self.render(syllable)
+        phonemes = set(syllable_in_phonology.recursive_sub_components)
+        return RenderExplanation(
+            syllable_in_phonology,
+            tuple(
+                (
+                    constraint,
+                    self._explain(constraint.syllable_pattern, syllable_in_phonology),
+                )
+                for constraint in self.phonotactics
+            ),
+            tuple(
+                (rule, self._explain(rule.syllable_pattern, syllable_in_phonology))
+                for rule in self.phonological_rules
+                if rule.phoneme in phonemes
+            ),
+        )
+
+
+@dataclass(frozen=True)
+class RenderCacheInfo(object):
+    """Statistics of the cache of ``Phonology.render_syllable``."""
+
+    hits: int
+    misses: int
+    evictions: int
+    size: int
+    maxsize: int
+
 
 @dataclass(repr=False)
 class Phonology(PrettyClass):
@@ -280,14 +626,108 @@ class Phonology(PrettyClass):
     """
     phonetic_str: bool = True
     """Whether to return the phonetic IPA string of a syllable."""
+    render_cache_size: int = field(default=4096, compare=False)
+    """
+    How many rendered syllables ``render_syllable`` keeps in its LRU cache.
+    The cache is invalidated whenever ``phonotactics`` or ``phonological_rules``
+    are modified or reassigned. Modifying a constraint or rule itself is not
+    detected, in which case ``clear_render_cache`` should be called.
+    """
+    render_workers: int = field(default=1, compare=False)
+    """
+    How many processes ``refresh`` and ``collocations`` render syllables with.
+    With more than one, syllables are rendered in chunks by worker processes,
+    provided that the phonotactics and phonological rules can be pickled
+    (syllable patterns defined as lambdas cannot).
+    """
+
+    lazy: bool = field(default=False, compare=False)
+    """
+    Whether to defer indexing and rendering the syllables until they are needed,
+    e.g. by ``rendered_syllables`` or ``syllables_matching``.
+    Syllables of a ``SyllableInventory`` are then not decoded on construction.
+    """
+
+    _rules_version = 0
+    _refresh_pending = False
+    _render_plan_version = -1
+
+    def __setattr__(self, name, value) -> None:
+        if name in ("phonotactics", "phonological_rules"):
+            value = observed(value, self._bump_rules_version)
+            super().__setattr__(name, value)
+            self._bump_rules_version()
+        else:
+            super().__setattr__(name, value)
+
+    def _bump_rules_version(self) -> None:
+        self._rules_version += 1
+
+    @property
+    def rules_version(self) -> int:
+        """
+        Returns a counter that increases whenever ``phonotactics`` or
+        ``phonological_rules`` are modified or reassigned.
+        """
+        return self._rules_version
 
     def refresh(self) -> None:
-        """Refreshes the phonology, re-generating all syllables."""
+        """
+        Refreshes the phonology, re-generating all syllables.
+
+        To edit a phonology incrementally, use ``add_syllable``,
+        ``add_phonotactic_constraint``, ``add_phonological_rule`` and their
+        counterparts instead, which only re-render the affected syllables.
+        """
+        self._refresh_pending = False
         self.update_phoneme_collections_from_syllables()
+        self.update_syllable_index()
         self.update_rendered_syllables()
 
+    def _refresh_if_pending(self) -> None:
+        if self._refresh_pending:
+            self._refresh_pending = False
+            self.update_syllable_index()
+            self.update_rendered_syllables()
+
     def __post_init__(self) -> None:
-        self.refresh()
+        self.phoneme_codebook = PhonemeCodebook()
+        """The codebook shared by the syllable tables of the phonology."""
+        self.clear_render_cache()
+        if self.lazy:
+            self.update_phoneme_collections_from_syllables()
+            self._refresh_pending = True
+        else:
+            self.refresh()
+
+    @classmethod
+    def open_inventory(cls, path: str, **kwargs) -> "Phonology":
+        """
+        Returns a lazy phonology of the syllables of a syllable inventory file,
+        which is memory-mapped instead of read (see ``SyllableInventory``).
+        Other fields of the phonology can be given as keyword arguments.
+        Release the file with ``close``, or use the phonology as a context manager.
+        """
+        kwargs.setdefault("lazy", True)
+        return cls(syllables=SyllableInventory.open(path), **kwargs)
+
+    def close(self) -> None:
+        """
+        Closes the syllable inventory file the syllables are read from, if any.
+        The syllables cannot be used afterwards.
+        """
+        if isinstance(self.syllables, SyllableInventory):
+            self.syllables.close()
+
+    def __enter__(self) -> "Phonology":
+        return self
+
+    def __exit__(self, *args) -> None:
+        self.close()
+
+    def write_inventory(self, path: str) -> None:
+        """Writes the syllables of the phonology to a syllable inventory file."""
+        SyllableInventory.write(path, self.syllables)
 
     def __str__(self) -> str:
         str_builder: List[str] = [
@@ -298,8 +738,87 @@ class Phonology(PrettyClass):
         ]
         return " ".join(str_builder)
 
+    def _observe_rules(self) -> None:
+        # observed containers are copied and pickled as plain ones,
+        # and must notify this phonology rather than the one they were copied from
+        for name in ("phonotactics", "phonological_rules"):
+            self.__dict__[name] = observed(
+                self.__dict__[name], self._bump_rules_version
+            )
+
+    def __copy__(self) -> "Phonology":
+        copied = object.__new__(type(self))
+        copied.__dict__.update(self.__dict__)
+        # the caches are copied too, so that either phonology can be modified
+        # and rendered without leaving stale syllables in the other
+        copied._render_cache = OrderedDict(self._render_cache)
+        if "_syllable_index" in self.__dict__:
+            copied._syllable_index = {
+                component: set(syllables)
+                for component, syllables in self._syllable_index.items()
+            }
+        if "_rendered_syllables" in self.__dict__:
+            copied._rendered_syllables = dict(self._rendered_syllables)
+        copied._observe_rules()
+        return copied
+
+    def __deepcopy__(self, memo) -> "Phonology":
+        try:
+            copied = Phonology.loads(self.dumps())
+        except TypeError:
+            copied = object.__new__(type(self))
+            memo[id(self)] = copied
+            copied.__setstate__(deepcopy(self.__dict__, memo))
+        memo[id(self)] = copied
+        return copied
+
+    def __setstate__(self, state: Dict) -> None:
+        self.__dict__.update(state)
+        self._observe_rules()
+
+    def __reduce_ex__(self, protocol):
+        # pickled in the format of ``dumps`` if possible,
+        # which is much smaller than the rendered syllables and caches
+        try:
+            return (_loads_phonology, (self.dumps(),))
+        except TypeError:
+            # restored by ``__setstate__``, which observes the phonotactics and rules
+            return super().__reduce_ex__(protocol)
+
+    def dumps(self) -> str:
+        """
+        Serializes the phonology into a compact, versioned JSON string.
+        Only ``SyllableFeatures`` can be serialized as syllable patterns.
+        See ``sinophone.phonology.serialization``.
+        """
+        # imported here, as ``serialization`` imports this module
+        from . import serialization
+
+        return serialization.dumps(self)
+
+    def dump(self, fp: IO[str]) -> None:
+        """Serializes the phonology into a text file. See ``dumps``."""
+        fp.write(self.dumps())
+
+    @classmethod
+    def loads(cls, data: Union[str, bytes]) -> "Phonology":
+        """Deserializes a phonology serialized by ``dumps``."""
+        from . import serialization
+
+        return serialization.loads(data)
+
+    @classmethod
+    def load(cls, fp: IO[str]) -> "Phonology":
+        """Deserializes a phonology from a text file written by ``dump``."""
+        return cls.loads(fp.read())
+
     def update_phoneme_collections_from_syllables(self) -> None:
         """Updates the phoneme collections from the syllables."""
+        if isinstance(self.syllables, SyllableInventory):
+            self.initials |= self.syllables.initials
+            self.finals |= self.syllables.finals
+            self.tones |= self.syllables.tones
+            return
         for syllable in self.syllables:
             for sub_component in syllable.sub_components:
                 if (
@@ -339,34 +858,369 @@ class Phonology(PrettyClass):
                 leaf_phoneme_collection.add(phoneme)
         return leaf_phoneme_collection
 
+    def syllable_table(self) -> SyllableTable:
+        """
+        Returns the syllables of the phonology as a ``SyllableTable``,
+        coded in ``phoneme_codebook``.
+        """
+        return SyllableTable(self.syllables, self.phoneme_codebook)
+
+    def syllable_parser(self) -> SyllableParser:
+        """
+        Returns a parser of IPA transcriptions into syllables
+        of the initials, finals and tones of the phonology.
+        """
+        return SyllableParser(self.initials, self.finals, self.tones)
+
+    def parse_syllables(
+        self, transcriptions: Iterable[str], skip_invalid: bool = False
+    ) -> Iterator[Syllable]:
+        """
+        Lazily parses IPA transcriptions such as ``kɐʔ˥˥`` into syllables
+        of the initials, finals and tones of the phonology.
+        See ``SyllableParser.parse_many``.
+        """
+        return self.syllable_parser().parse_many(transcriptions, skip_invalid)
+
     @property
     def collocations(self) -> AbstractSet[SyllableInPhonology]:
         """Collocates all phonemes and returns resulting syllables."""
-        collocations = set()
-        for initial, final, tone in product(self.initials, self.finals, self.tones):
-            collocations.add(self.render_syllable(Syllable(initial, final, tone)))
-        return collocations
+        if self._use_render_workers(
+            len(self.initials) * len(self.finals) * len(self.tones)
+        ):
+            return set(
+                collocate_in_processes(
+                    self.render_plan,
+                    sorted(self.initials, key=sort_key),
+                    sorted(self.finals, key=sort_key),
+                    sorted(self.tones, key=sort_key),
+                    self.render_workers,
+                )
+            )
+        return set(self.collocation_grid())
+
+    def collocation_grid(
+        self, where: Optional[SyllableFeatures] = None
+    ) -> "CollocationGrid":
+        """
+        Returns the phonotactic acceptability of all collocations of phonemes,
+        without rendering them. See ``CollocationGrid``.
+
+        If ``where`` is specified, only initials, finals and tones
+        matched by it are collocated.
+        """
+        if where is None:
+            return CollocationGrid(self)
+        return CollocationGrid(
+            self,
+            initials=filter(where.matches_component, self.initials),
+            finals=filter(where.matches_component, self.finals),
+            tones=filter(where.matches_component, self.tones),
+        )
+
+    def iter_collocations(
+        self,
+        where: Optional[SyllablePattern] = None,
+        acceptability: Optional[PhonotacticAcceptability] = None,
+    ) -> Iterator[SyllableInPhonology]:
+        """
+        Collocates phonemes and lazily yields the resulting syllables,
+        in order of their initials, finals and tones.
+
+        Only syllables matched by ``where``, and of the given ``acceptability``,
+        are yielded. If ``where`` is a ``SyllableFeatures``, it is matched against
+        initials, finals and tones before they are collocated, so that pruned
+        collocations are never generated. Other patterns are called on each
+        collocation before it is rendered.
+        """
+        if isinstance(where, SyllableFeatures):
+            grid = self.collocation_grid(where)
+            where = None
+        else:
+            grid = self.collocation_grid()
+
+        for i, f, t in grid.indices(acceptability):
+            if where is None or where(
+                Syllable(grid.initials[i], grid.finals[f], grid.tones[t])
+            ):
+                yield grid.syllable(i, f, t)
+
+    def clear_render_cache(self) -> None:
+        """Empties the cache of ``render_syllable`` and resets its counters."""
+        self._render_plan_version = -1
+        self._render_cache: OrderedDict = OrderedDict()
+        self._render_cache_version: int = self._rules_version
+        self._render_cache_hits: int = 0
+        self._render_cache_misses: int = 0
+        self._render_cache_evictions: int = 0
 
     def render_syllable(self, syllable: Syllable) -> SyllableInPhonology:
         """
         Renders a syllable in the phonology
         by applying phonotactics and phonological rules.
+
+        Rendered syllables are cached (see ``render_cache_size``),
+        so the returned syllable may be shared and should not be modified.
         """
-        syllable_in_phonology = SyllableInPhonology.from_syllable(syllable)
-        syllable_in_phonology.acceptability = PhonotacticAcceptability(True, True)
+        if self._render_cache_version != self._rules_version:
+            self._render_cache.clear()
+            self._render_cache_version = self._rules_version
 
-        for constraint in self.phonotactics:
-            syllable_in_phonology = constraint.apply(syllable_in_phonology)
+        key = (syllable.initial, syllable.final, syllable.tone)
+        cached = self._render_cache.get(key)
+        if cached is not None:
+            self._render_cache.move_to_end(key)
+            self._render_cache_hits += 1
+            return cached
+
+        self._render_cache_misses += 1
+        rendered = self._render_syllable_uncached(syllable)
+        if self.render_cache_size > 0:
+            self._render_cache[key] = rendered
+            if len(self._render_cache) > self.render_cache_size:
+                self._render_cache.popitem(last=False)
+                self._render_cache_evictions += 1
+        return rendered
+
+    @property
+    def render_cache_info(self) -> "RenderCacheInfo":
+        """Returns the statistics of the cache of ``render_syllable``."""
+        return RenderCacheInfo(
+            hits=self._render_cache_hits,
+            misses=self._render_cache_misses,
+            evictions=self._render_cache_evictions,
+            size=len(self._render_cache),
+            maxsize=self.render_cache_size,
+        )
+
+    def _render_syllable_uncached(self, syllable: Syllable) -> SyllableInPhonology:
+        return self.render_plan.render(syllable)
+
+    def explain(self, syllable: Syllable) -> RenderExplanation:
+        """
+        Renders a syllable, and returns which phonotactic constraints
+        and phonological rules match it, and which feature tests decided them.
+        Print it for a readable report.
+        """
+        return self.render_plan.explain(syllable)
+
+    @property
+    def render_plan(self) -> RenderPlan:
+        """
+        Returns the phonotactics and phonological rules frozen as a ``RenderPlan``,
+        rebuilt whenever they are modified or reassigned.
+        """
+        if self._render_plan_version != self._rules_version:
+            self._render_plan = RenderPlan(
+                tuple(self.phonotactics), tuple(self.phonological_rules)
+            )
+            self._render_plan_version = self._rules_version
+        return self._render_plan
+
+    def _use_render_workers(self, n_syllables: int) -> bool:
+        if self.render_workers <= 1 or n_syllables <= CHUNK_SIZE:
+            return False
+        if not is_picklable(self.render_plan):
+            sinophone_warning(
+                "Phonotactics or phonological rules cannot be pickled, "
+                "rendering syllables in this process instead"
+            )
+            return False
+        return True
+
+    def apply_phonological_rules(
+        self, syllable: SyllableInPhonology
+    ) -> SyllableInPhonology:
+        """
+        Applies the phonological rules, but not phonotactics,
+        on a ``SyllableInPhonology`` in place, and returns it.
+        """
         for rule in self.phonological_rules:
-            syllable_in_phonology = rule.apply(syllable_in_phonology)
+            rule.apply_in_place(syllable)
+        return syllable
 
-        return syllable_in_phonology
+    def update_syllable_index(self) -> None:
+        """
+        Updates the index from each (recursive) sub-component of the syllables
+        to the syllables containing it.
+        """
+        self._syllable_index: Dict[SyllableComponent, Set[Syllable]] = {}
+        for syllable in self.syllables:
+            self._index_syllable(syllable)
 
-    def update_rendered_syllables(self) -> None:
-        """Updates the rendered syllables of the phonology."""
-        self.rendered_syllables = [
-            self.render_syllable(syllable) for syllable in sorted(self.syllables)
-        ]
+    def _index_syllable(self, syllable: Syllable) -> None:
+        for component in syllable.recursive_sub_components:
+            self._syllable_index.setdefault(component, set()).add(syllable)
+
+    def _unindex_syllable(self, syllable: Syllable) -> None:
+        for component in syllable.recursive_sub_components:
+            syllables = self._syllable_index.get(component)
+            if syllables is not None:
+                syllables.discard(syllable)
+                if not syllables:
+                    del self._syllable_index[component]
+
+    def syllables_containing(self, component: SyllableComponent) -> Set[Syllable]:
+        """Returns the syllables of the phonology containing the component."""
+        self._refresh_if_pending()
+        return set(self._syllable_index.get(component, ()))
+
+    def syllables_matching(self, syllable_pattern: SyllablePattern) -> Set[Syllable]:
+        """
+        Returns the syllables of the phonology matching the syllable pattern.
+
+        A ``SyllableFeatures`` pattern is matched against the initials, finals
+        and tones of the phonology, and the matching syllables are looked up
+        in the index instead of matching every syllable. Other patterns are
+        called on the rendered syllables, as they may read their acceptability.
+        """
+        self._refresh_if_pending()
+        if not isinstance(syllable_pattern, SyllableFeatures):
+            return {
+                syllable
+                for syllable, rendered in self._rendered_syllables.items()
+                if syllable_pattern(rendered)
+            }
+
+        matching_syllables: Optional[Set[Syllable]] = None
+        for phonemes in (self.initials, self.finals, self.tones):
+            syllables: Set[Syllable] = set()
+            for phoneme in phonemes:
+                if syllable_pattern.matches_component(phoneme):
+                    syllables |= self._syllable_index.get(phoneme, set())
+            if matching_syllables is None:
+                matching_syllables = syllables
+            else:
+                matching_syllables &= syllables
+        return matching_syllables or set()
+
+    def update_rendered_syllables(
+        self, syllables: Optional[Iterable[Syllable]] = None
+    ) -> None:
+        """
+        Updates the rendered syllables of the phonology,
+        or only the given syllables of it.
+        """
+        if syllables is None:
+            self._rendered_syllables: Dict[Syllable, SyllableInPhonology] = {}
+            syllables = self.syllables
+        syllables = list(syllables)
+        if self._use_render_workers(len(syllables)):
+            syllables.sort(key=sort_key)
+            rendered_syllables = render_in_processes(
+                self.render_plan, syllables, self.render_workers
+            )
+            self._rendered_syllables.update(zip(syllables, rendered_syllables))
+        else:
+            for syllable in syllables:
+                self._rendered_syllables[syllable] = self.render_syllable(syllable)
+        self._sorted_rendered_syllables: Optional[List[SyllableInPhonology]] = None
+
+    @property
+    def rendered_syllables(self) -> List[SyllableInPhonology]:
+        """Returns the rendered syllables of the phonology, sorted."""
+        self._refresh_if_pending()
+        if self._sorted_rendered_syllables is None:
+            self._sorted_rendered_syllables = [
+                self._rendered_syllables[syllable]
+                for syllable in sorted(self._rendered_syllables, key=sort_key)
+            ]
+        return self._sorted_rendered_syllables
+
+    def add_syllable(self, syllable: Syllable) -> None:
+        """Adds a syllable to the phonology and renders it."""
+        if syllable in self.syllables:
+            return
+        self.syllables.add(syllable)
+        if syllable.initial not in self.initials:
+            self.initials.add(syllable.initial)
+        if syllable.final not in self.finals:
+            self.finals.add(syllable.final)
+        if syllable.tone not in self.tones:
+            self.tones.add(syllable.tone)
+        if self._refresh_pending:
+            return
+        self._index_syllable(syllable)
+        self.update_rendered_syllables([syllable])
+
+    def discard_syllable(self, syllable: Syllable) -> None:
+        """
+        Removes a syllable from the phonology if it is present.
+        Its initial, final and tone are kept in the phonology.
+        """
+        if syllable not in self.syllables:
+            return
+        self.syllables.discard(syllable)
+        if self._refresh_pending:
+            return
+        self._unindex_syllable(syllable)
+        del self._rendered_syllables[syllable]
+        self._sorted_rendered_syllables = None
+
+    def _rerender_syllables_matching(self, syllable_pattern: SyllablePattern) -> None:
+        if isinstance(syllable_pattern, SyllableFeatures):
+            self.update_rendered_syllables(self.syllables_matching(syllable_pattern))
+        else:
+            # other patterns are called on syllables as they are being rendered,
+            # e.g. with the acceptability given by the other constraints,
+            # so which syllables they match is only known by rendering them
+            self.update_rendered_syllables()
+
+    def add_phonotactic_constraint(self, constraint: PhonotacticConstraint) -> None:
+        """
+        Adds a phonotactic constraint to the phonology,
+        re-rendering only the syllables matching its pattern
+        if it is a ``SyllableFeatures``, and all of them otherwise.
+        """
+        if constraint in self.phonotactics:
+            return
+        self.phonotactics.add(constraint)
+        if self._refresh_pending:
+            return
+        self._rerender_syllables_matching(constraint.syllable_pattern)
+
+    def discard_phonotactic_constraint(self, constraint: PhonotacticConstraint) -> None:
+        """
+        Removes a phonotactic constraint from the phonology if it is present,
+        re-rendering only the syllables matching its pattern
+        if it is a ``SyllableFeatures``, and all of them otherwise.
+        """
+        if constraint not in self.phonotactics:
+            return
+        self.phonotactics.discard(constraint)
+        if self._refresh_pending:
+            return
+        self._rerender_syllables_matching(constraint.syllable_pattern)
+
+    def add_phonological_rule(self, rule: PhonologicalRule) -> None:
+        """
+        Appends a phonological rule to the phonology,
+        re-rendering only the syllables containing its phoneme.
+        """
+        if isinstance(self.phonological_rules, MutableSequence):
+            self.phonological_rules.append(rule)
+        else:
+            self.phonological_rules = [*self.phonological_rules, rule]
+        if self._refresh_pending:
+            return
+        self.update_rendered_syllables(self.syllables_containing(rule.phoneme))
+
+    def remove_phonological_rule(self, rule: PhonologicalRule) -> None:
+        """
+        Removes the first occurrence of a phonological rule from the phonology,
+        re-rendering only the syllables containing its phoneme.
+
+        Raises ``ValueError`` if the rule is not present.
+        """
+        if isinstance(self.phonological_rules, MutableSequence):
+            self.phonological_rules.remove(rule)
+        else:
+            rules = list(self.phonological_rules)
+            rules.remove(rule)
+            self.phonological_rules = rules
+        if self._refresh_pending:
+            return
+        self.update_rendered_syllables(self.syllables_containing(rule.phoneme))
 
     def pretty_syllable_str(self, syllable: S) -> str:
         """
@@ -395,3 +1249,163 @@ class Phonology(PrettyClass):
         except UnicodeEncodeError:  # pragma: no cover
             # ! cannot reproduce this error in my local Windows environment
             sinophone_warning("UnicodeEncodeError caught. Check your encoding.")
+
+
+def _loads_phonology(data: str) -> Phonology:
+    return Phonology.loads(data)
+
+
+class CollocationGrid(PrettyClass):
+    """
+    吳：搭配網格
+
+    The phonotactic acceptability of every collocation of the initials, finals
+    and tones of a phonology (or of the given subsets of them),
+    computed without rendering any syllable.
+
+    Initials, finals and tones are sorted and indexed along the three axes of
+    the grid. For every initial and final, the collocations with all tones are
+    stored as a bitset, bit ``t`` being set if the collocation with the ``t``-th
+    tone is existent (or grammatical). A phonotactic constraint whose pattern is
+    ``SyllableFeatures`` can be matched component by component, so it is
+    evaluated once per phoneme and applied to the whole grid by bitwise
+    operations. Other patterns are called on each collocation.
+
+    ``SyllableInPhonology`` objects are only created when iterated over.
+    """
+
+    def __init__(
+        self,
+        phonology: "Phonology",
+        initials: Optional[Iterable[Initial]] = None,
+        finals: Optional[Iterable[Final]] = None,
+        tones: Optional[Iterable[Tone]] = None,
+    ) -> None:
+        self.phonology = phonology
+        self.initials: List[Initial] = sorted(
+            phonology.initials if initials is None else initials, key=sort_key
+        )
+        self.finals: List[Final] = sorted(
+            phonology.finals if finals is None else finals, key=sort_key
+        )
+        self.tones: List[Tone] = sorted(
+            phonology.tones if tones is None else tones, key=sort_key
+        )
+
+        all_tones = (1 << len(self.tones)) - 1
+        self._existent = [[all_tones] * len(self.finals) for _ in self.initials]
+        self._grammatical = [[all_tones] * len(self.finals) for _ in self.initials]
+
+        for constraint in phonology.phonotactics:
+            acceptability = constraint.acceptability
+            if acceptability.existent and acceptability.grammatical:
+                continue
+            if isinstance(constraint.syllable_pattern, SyllableFeatures):
+                self._apply_syllable_features(constraint)
+            else:
+                self._apply_syllable_pattern(constraint)
+
+    def __str__(self) -> str:
+        return (
+            f"{len(self.initials)} initials × {len(self.finals)} finals"
+            f" × {len(self.tones)} tones"
+        )
+
+    def __len__(self) -> int:
+        return len(self.initials) * len(self.finals) * len(self.tones)
+
+    def __iter__(self) -> Iterator[SyllableInPhonology]:
+        for indices in self.indices():
+            yield self.syllable(*indices)
+
+    def _rows(self, constraint: PhonotacticConstraint) -> List[List[List[int]]]:
+        rows = []
+        if not constraint.acceptability.existent:
+            rows.append(self._existent)
+        if not constraint.acceptability.grammatical:
+            rows.append(self._grammatical)
+        return rows
+
+    def _apply_syllable_features(self, constraint: PhonotacticConstraint) -> None:
+        pattern: SyllableFeatures = constraint.syllable_pattern  # type: ignore
+        initial_indices = [
+            i
+            for i, initial in enumerate(self.initials)
+            if pattern.matches_component(initial)
+        ]
+        final_indices = [
+            f for f, final in enumerate(self.finals) if pattern.matches_component(final)
+        ]
+        tone_bits = 0
+        for t, tone in enumerate(self.tones):
+            if pattern.matches_component(tone):
+                tone_bits |= 1 << t
+        if not tone_bits:
+            return
+
+        for grid in self._rows(constraint):
+            for i in initial_indices:
+                row = grid[i]
+                for f in final_indices:
+                    row[f] &= ~tone_bits
+
+    def _apply_syllable_pattern(self, constraint: PhonotacticConstraint) -> None:
+        grids = self._rows(constraint)
+        for (i, initial), (f, final), (t, tone) in product(
+            enumerate(self.initials), enumerate(self.finals), enumerate(self.tones)
+        ):
+            if constraint.syllable_pattern(Syllable(initial, final, tone)):
+                for grid in grids:
+                    grid[i][f] &= ~(1 << t)
+
+    def acceptability(self, i: int, f: int, t: int) -> PhonotacticAcceptability:
+        """
+        Returns the acceptability of the collocation of the ``i``-th initial,
+        the ``f``-th final and the ``t``-th tone.
+        """
+        return PhonotacticAcceptability(
+            existent=bool(self._existent[i][f] >> t & 1),
+            grammatical=bool(self._grammatical[i][f] >> t & 1),
+        )
+
+    def indices(
+        self, acceptability: Optional[PhonotacticAcceptability] = None
+    ) -> Iterator[Tuple[int, int, int]]:
+        """
+        Yields the indices of collocations,
+        only those of the given acceptability if specified.
+        """
+        for i, f in product(range(len(self.initials)), range(len(self.finals))):
+            bits = self._bits(i, f, acceptability)
+            t = 0
+            while bits:
+                if bits & 1:
+                    yield i, f, t
+                bits >>= 1
+                t += 1
+
+    def count(self, acceptability: Optional[PhonotacticAcceptability] = None) -> int:
+        """Counts collocations, only those of the given acceptability if specified."""
+        return sum(
+            bin(self._bits(i, f, acceptability)).count("1")
+            for i, f in product(range(len(self.initials)), range(len(self.finals)))
+        )
+
+    def _bits(
+        self, i: int, f: int, acceptability: Optional[PhonotacticAcceptability]
+    ) -> int:
+        bits = (1 << len(self.tones)) - 1
+        if acceptability is not None:
+            existent, grammatical = self._existent[i][f], self._grammatical[i][f]
+            bits &= existent if acceptability.existent else ~existent
+            bits &= grammatical if acceptability.grammatical else ~grammatical
+        return bits
+
+    def syllable(self, i: int, f: int, t: int) -> SyllableInPhonology:
+        """
+        Renders the collocation of the ``i``-th initial, the ``f``-th final
+        and the ``t``-th tone, applying phonological rules.
+        """
+        syllable = SyllableInPhonology(self.initials[i], self.finals[f], self.tones[t])
+        syllable.acceptability = self.acceptability(i, f, t)
+        return self.phonology.apply_phonological_rules(syllable)
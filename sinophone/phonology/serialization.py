@@ -0,0 +1,237 @@
+"""
+Serializes phonologies into a compact, versioned JSON format.
+
+Syllable components are stored as canonical IPA strings,
+``SyllableFeatures`` as lists of feature labels,
+and syllables as a flat table of indices of their initials, finals and tones::
+
+    {
+        "format": "sinophone.phonology",
+        "version": 1,
+        "initials": ["k", ...],
+        "finals": [["ʷ", "ɐ", "ʔ"], ...],
+        "tones": ["˥˥", ...],
+        "syllables": [0, 0, 0, ...],
+        "phonotactics": [{"pattern": ..., "acceptability": [false, false]}, ...],
+        "phonological_rules": [
+            {"phoneme": ["Nucleus", "o"], "phonetic_ipa_str": "ʊ̃", "pattern": ...},
+            ...
+        ],
+        "settings": {"color_syllables": true, ...}
+    }
+
+Only ``SyllableFeatures`` can be serialized as syllable patterns;
+other callables raise ``TypeError``.
+"""
+
+import json
+from typing import IO, AbstractSet, Any, Dict, List, Sequence, Type, Union
+
+from ..phonetics.ipa_utils import IPAString
+from ..phonetics.phonetics import IPAFeatureGroup
+from .phonology import (
+    PhonologicalRule,
+    Phonology,
+    PhonotacticAcceptability,
+    PhonotacticConstraint,
+    SyllableFeatures,
+    SyllablePattern,
+)
+from .syllable import (
+    BranchSyllableComponent,
+    Coda,
+    Final,
+    Initial,
+    LeafSyllableComponent,
+    Medial,
+    Nucleus,
+    Syllable,
+    SyllableComponent,
+    Tone,
+    sort_key,
+)
+
+FORMAT = "sinophone.phonology"
+
+FORMAT_VERSION = 1
+"""The version of the format written by ``phonology_to_dict``."""
+
+SETTINGS = ("color_syllables", "phonetic_str", "render_cache_size", "render_workers")
+"""The settings of a phonology that are serialized."""
+
+COMPONENT_TYPES: Dict[str, Type[SyllableComponent]] = {
+    cls.__name__: cls for cls in (Initial, Final, Medial, Nucleus, Coda, Tone, Syllable)
+}
+"""The syllable components that can be serialized, by name."""
+
+EncodedComponent = List[Any]
+
+
+def component_to_list(component: SyllableComponent) -> EncodedComponent:
+    """
+    Encodes a syllable component as its type name followed by its IPA string,
+    or by its encoded sub-components.
+    """
+    name = type(component).__name__
+    if name not in COMPONENT_TYPES:
+        if isinstance(component, Syllable):
+            name = "Syllable"
+        else:
+            raise TypeError(f"Cannot serialize {name}")
+    if isinstance(component, LeafSyllableComponent):
+        return [name, str(component.ipa_str)]
+    assert isinstance(component, BranchSyllableComponent)
+    return [name] + [component_to_list(sub) for sub in component.sub_components]
+
+
+def component_from_list(encoded: Sequence[Any]) -> SyllableComponent:
+    """Decodes a syllable component encoded by ``component_to_list``."""
+    name, *contents = encoded
+    if name not in COMPONENT_TYPES:
+        raise ValueError(f"Unknown syllable component: {name}")
+    cls = COMPONENT_TYPES[name]
+    if issubclass(cls, LeafSyllableComponent):
+        return cls(*contents)
+    return cls(*map(component_from_list, contents))
+
+
+def pattern_to_dict(pattern: SyllablePattern) -> Dict[str, List[List[str]]]:
+    """Encodes a ``SyllableFeatures`` as lists of feature labels."""
+    if not isinstance(pattern, SyllableFeatures):
+        raise TypeError(
+            f"Cannot serialize syllable pattern {pattern!r}, "
+            "only SyllableFeatures can be serialized"
+        )
+    return {
+        name: sorted(sorted(map(str, features)) for features in set_of_features)
+        for name, set_of_features in pattern.syllable_component_features.items()
+    }
+
+
+def pattern_from_dict(encoded: Dict[str, List[List[str]]]) -> SyllableFeatures:
+    """Decodes a ``SyllableFeatures`` encoded by ``pattern_to_dict``."""
+    # the component names are those encoded by ``pattern_to_dict``
+    syllable_component_features: Dict[Any, AbstractSet[IPAFeatureGroup]] = {
+        name: {IPAFeatureGroup(" ".join(labels)) for labels in list_of_labels}
+        for name, list_of_labels in encoded.items()
+    }
+    return SyllableFeatures(syllable_component_features)
+
+
+def phonology_to_dict(phonology: Phonology) -> Dict[str, Any]:
+    """Encodes a phonology into a dictionary that can be dumped as JSON."""
+    initials = sorted(phonology.initials, key=sort_key)
+    finals = sorted(phonology.finals, key=sort_key)
+    tones = sorted(phonology.tones, key=sort_key)
+    initial_indices = {initial: i for i, initial in enumerate(initials)}
+    final_indices = {final: f for f, final in enumerate(finals)}
+    tone_indices = {tone: t for t, tone in enumerate(tones)}
+
+    syllables: List[int] = []
+    for syllable in sorted(phonology.syllables, key=sort_key):
+        syllables.append(initial_indices[syllable.initial])
+        syllables.append(final_indices[syllable.final])
+        syllables.append(tone_indices[syllable.tone])
+
+    return {
+        "format": FORMAT,
+        "version": FORMAT_VERSION,
+        "initials": [str(initial) for initial in initials],
+        "finals": [
+            [str(final.medial), str(final.nucleus), str(final.coda)] for final in finals
+        ],
+        "tones": [str(tone) for tone in tones],
+        "syllables": syllables,
+        "phonotactics": sorted(
+            (
+                {
+                    "pattern": pattern_to_dict(constraint.syllable_pattern),
+                    "acceptability": [
+                        constraint.acceptability.existent,
+                        constraint.acceptability.grammatical,
+                    ],
+                }
+                for constraint in phonology.phonotactics
+            ),
+            key=lambda encoded: json.dumps(encoded, sort_keys=True),
+        ),
+        "phonological_rules": [
+            {
+                "phoneme": component_to_list(rule.phoneme),
+                "phonetic_ipa_str": str(rule.phonetic_ipa_str),
+                "pattern": pattern_to_dict(rule.syllable_pattern),
+            }
+            for rule in phonology.phonological_rules
+        ],
+        "settings": {name: getattr(phonology, name) for name in SETTINGS},
+    }
+
+
+def phonology_from_dict(encoded: Dict[str, Any]) -> Phonology:
+    """Decodes a phonology encoded by ``phonology_to_dict``."""
+    if encoded.get("format") != FORMAT:
+        raise ValueError("Not a serialized phonology")
+    version = encoded.get("version")
+    if not isinstance(version, int) or version > FORMAT_VERSION:
+        raise ValueError(f"Unsupported version of serialized phonology: {version}")
+
+    initials = [Initial(initial) for initial in encoded["initials"]]
+    finals = [
+        Final(Medial(medial), Nucleus(nucleus), Coda(coda))
+        for medial, nucleus, coda in encoded["finals"]
+    ]
+    tones = [Tone(tone) for tone in encoded["tones"]]
+    table = encoded["syllables"]
+    syllables = {
+        Syllable(initials[table[k]], finals[table[k + 1]], tones[table[k + 2]])
+        for k in range(0, len(table), 3)
+    }
+
+    return Phonology(
+        initials=set(initials),
+        finals=set(finals),
+        tones=set(tones),
+        syllables=syllables,
+        phonotactics={
+            PhonotacticConstraint(
+                pattern_from_dict(constraint["pattern"]),
+                PhonotacticAcceptability(*constraint["acceptability"]),
+            )
+            for constraint in encoded["phonotactics"]
+        },
+        phonological_rules=[
+            PhonologicalRule(
+                component_from_list(rule["phoneme"]),
+                IPAString(rule["phonetic_ipa_str"]),
+                pattern_from_dict(rule["pattern"]),
+            )
+            for rule in encoded["phonological_rules"]
+        ],
+        **{
+            name: value
+            for name, value in encoded.get("settings", {}).items()
+            if name in SETTINGS
+        },
+    )
+
+
+def dumps(phonology: Phonology) -> str:
+    """Serializes a phonology into a JSON string."""
+    return json.dumps(
+        phonology_to_dict(phonology), ensure_ascii=False, separators=(",", ":")
+    )
+
+
+def loads(data: Union[str, bytes]) -> Phonology:
+    """Deserializes a phonology from a JSON string."""
+    return phonology_from_dict(json.loads(data))
+
+
+def dump(phonology: Phonology, fp: IO[str]) -> None:
+    """Serializes a phonology into a text file."""
+    fp.write(dumps(phonology))
+
+
+def load(fp: IO[str]) -> Phonology:
+    """Deserializes a phonology from a text file."""
+    return loads(fp.read())
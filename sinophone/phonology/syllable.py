@@ -1,11 +1,29 @@
 from dataclasses import dataclass, field
 from functools import total_ordering
-from typing import Dict, List, Union, overload
+from typing import (
+    Any,
+    Dict,
+    FrozenSet,
+    Hashable,
+    List,
+    Optional,
+    Tuple,
+    Union,
+    overload,
+)
 
 from ..options import AnsiColors
 from ..phonetics.ipa_utils import IPAChar, IPAConsonant, IPAString
 from ..phonetics.phonetics import IPAFeatureGroup
-from ..utils import PostInitCaller, PrettyClass, obj_to_mro_chain_names
+from ..utils import (
+    Interned,
+    InternPool,
+    PostInitCaller,
+    PrettyClass,
+    add_slots,
+    has_capability,
+    type_capabilities,
+)
 
 SYLLABLE_STRUCTURE: Dict[str, List[str]] = {
     "Syllable": ["Initial", "Final", "Tone"],
@@ -18,6 +36,29 @@ SYLLABLE_STRUCTURE: Dict[str, List[str]] = {
 }
 """Hard-code syllable structure of Chinese."""
 
+COMPONENT_ATTRIBUTES: FrozenSet[str] = frozenset(
+    ["_component"]
+    + [name.lower() for names in SYLLABLE_STRUCTURE.values() for name in names]
+)
+"""Attributes holding the content of syllable components, set only once."""
+
+COMPONENT_POOL = InternPool()
+"""The pool of interned leaf syllable components and finals."""
+
+
+_SUB_COMPONENT_NAMES: Dict[type, Tuple[str, ...]] = {}
+
+SortKey = Tuple[int, Tuple[int, ...]]
+
+
+def sort_key(component: "SyllableComponent") -> SortKey:
+    """Returns ``component.sort_key``, to be used as the key of ``sorted``."""
+    return component.sort_key
+
+
+class InternedComponent(Interned, PostInitCaller):
+    """The metaclass of interned syllable components."""
+
 
 @total_ordering
 class SyllableComponent(PrettyClass, metaclass=PostInitCaller):
@@ -28,8 +69,18 @@ class SyllableComponent(PrettyClass, metaclass=PostInitCaller):
         - 梢音節要素
         - 榦音節要素
             - 根音節要素
+
+    Syllable components are immutable and slotted.
+    Leaf syllable components and finals are interned as well,
+    so that a syllable costs little more than its own slots.
+    As they are immutable, their hashes and sort keys are computed once and cached.
     """
 
+    __slots__ = ("_hash", "_sort_key")
+
+    _hash: int
+    _sort_key: "SortKey"
+
     COMPONENT_ORDER = [
         "SyllableComponent",
         "LeafSyllableComponent",
@@ -53,10 +104,20 @@ class SyllableComponent(PrettyClass, metaclass=PostInitCaller):
 
     def has_features(self, features: IPAFeatureGroup) -> bool:
         """Returns whether a syllable has a feature."""
-        return any([ipa_char.has_features(features) for ipa_char in self.ipa_str])
+        present, absent = features.masks
+        for ipa_char in self.ipa_str:
+            descriptor_mask = ipa_char.descriptor_mask
+            if descriptor_mask & present == present and not descriptor_mask & absent:
+                return True
+        return False
 
     def __post_init__(self) -> None:
-        self._phonetic_ipa_str = None
+        pass
+
+    def __setattr__(self, name: str, value: Any) -> None:
+        if name in COMPONENT_ATTRIBUTES and hasattr(self, name):
+            raise AttributeError(f"{type(self).__name__} is immutable")
+        super().__setattr__(name, value)
 
     def __str__(self) -> str:
         return self._substr
@@ -66,22 +127,46 @@ class SyllableComponent(PrettyClass, metaclass=PostInitCaller):
         return f"{color}<{self.translated_name} {self._subrepr}{color}>{AnsiColors.END}"
 
     def __eq__(self, other) -> bool:
+        if self is other:
+            return True
         return (
             type(self) == type(other)
-            and "SyllableComponent" in obj_to_mro_chain_names(other)
+            and has_capability(other, "SyllableComponent")
             and self.ipa_str == other.ipa_str
         )
 
     def __lt__(self, other) -> bool:
-        if "SyllableComponent" not in obj_to_mro_chain_names(other):
+        if not has_capability(other, "SyllableComponent"):
             raise TypeError("Cannot compare SyllableComponent to non-SyllableComponent")
-        return (
-            self.ipa_str < other.ipa_str
-            if self.component_order == other.component_order
-            else self.component_order < other.component_order
-        )
+        return self.sort_key < other.sort_key
+
+    @property
+    def sort_key(self) -> "SortKey":
+        """
+        Returns the key by which components are ordered:
+        the order of the component in a syllable,
+        followed by the IPA orders of the characters of its IPA string.
+
+        It is computed once and cached, so ``sorted(components, key=sort_key)``
+        only compares tuples of integers.
+        """
+        try:
+            return self._sort_key
+        except AttributeError:
+            self._sort_key = (self.component_order, self._ipa_orders())
+            return self._sort_key
+
+    def _ipa_orders(self) -> Tuple[int, ...]:
+        ...
 
     def __hash__(self) -> int:
+        try:
+            return self._hash
+        except AttributeError:
+            self._hash = self._compute_hash()
+            return self._hash
+
+    def _compute_hash(self) -> int:
         ...
 
     @property
@@ -102,14 +187,18 @@ class SyllableComponent(PrettyClass, metaclass=PostInitCaller):
     @property
     def phonetic_ipa_str(self) -> IPAString:
         """Returns the phonetic IPA string of the component.
-        It will be automatically set when the component is rendered
-        in a phonology with phonological rules.
+        As components are immutable, it is the same as ``ipa_str``.
+        The phonetic realizations of components in a phonology
+        are stored in ``SyllableInPhonology.phonetic_overlay``.
         """
-        ...
+        return self.ipa_str
 
     @phonetic_ipa_str.setter
     def phonetic_ipa_str(self, value) -> None:
-        ...
+        raise AttributeError(
+            f"{type(self).__name__} is immutable, "
+            "render it in a phonology to set its phonetic IPA string"
+        )
 
     @property
     def ipa_chars(self) -> List[IPAChar]:
@@ -125,11 +214,15 @@ class SyllableComponent(PrettyClass, metaclass=PostInitCaller):
         ...
 
 
-class LeafSyllableComponent(SyllableComponent):
+class LeafSyllableComponent(SyllableComponent, metaclass=InternedComponent):
     """
     吳：梢音節要素
     """
 
+    __slots__ = ("_component",)
+
+    intern_pool = COMPONENT_POOL
+
     @overload
     def __init__(self, component: str) -> None:
         ...
@@ -142,14 +235,37 @@ class LeafSyllableComponent(SyllableComponent):
         if isinstance(component, str):
             component = IPAString(component)
         elif isinstance(component, IPAString):
-            ...
+            # copy it, as the component is shared once interned
+            component = IPAString(component.ipa_chars)
         else:
             raise TypeError("Invalid component type")
         self._component = component
 
-    def __hash__(self) -> int:
+    @classmethod
+    def _intern_call_key(cls, component: Any = "") -> Optional[Hashable]:
+        return (cls, component) if isinstance(component, str) else None
+
+    def _intern_canonical_key(self) -> Hashable:
+        return (type(self), tuple(self._component.ipa_chars))
+
+    def _freeze(self) -> None:
+        pass
+
+    def __copy__(self) -> "LeafSyllableComponent":
+        return self
+
+    def __deepcopy__(self, memo) -> "LeafSyllableComponent":
+        return self
+
+    def __reduce__(self):
+        return (type(self), (str(self._component),))
+
+    def _compute_hash(self) -> int:
         return hash((type(self).__name__, self.ipa_str))
 
+    def _ipa_orders(self) -> Tuple[int, ...]:
+        return self._component.sort_key
+
     @property
     def sub_components(self) -> List["SyllableComponent"]:
         return []
@@ -162,18 +278,6 @@ class LeafSyllableComponent(SyllableComponent):
     def ipa_str(self) -> IPAString:
         return self._component
 
-    @property
-    def phonetic_ipa_str(self) -> IPAString:
-        return (
-            self._phonetic_ipa_str
-            if self._phonetic_ipa_str is not None
-            else self.ipa_str
-        )
-
-    @phonetic_ipa_str.setter
-    def phonetic_ipa_str(self, value) -> None:
-        self._phonetic_ipa_str = value
-
     @property
     def _substr(self) -> str:
         return str(self.ipa_str)
@@ -191,20 +295,49 @@ class BranchSyllableComponent(SyllableComponent):
     # decorate subclasses with dataclass to ensure the attribute ``__match_args__``
     # __match_args__: List[str]
 
-    def __hash__(self) -> int:
+    __slots__ = ()
+
+    def __eq__(self, other) -> bool:
+        if (
+            type(self) is type(other)
+            and self._sub_component_names() == other._sub_component_names()
+            and all(
+                getattr(self, name) is getattr(other, name)
+                for name in self._sub_component_names()
+            )
+        ):
+            return True
+        return super().__eq__(other)
+
+    __hash__ = SyllableComponent.__hash__
+
+    def _compute_hash(self) -> int:
         return hash((type(self).__name__, tuple(self.sub_components)))
 
+    def _ipa_orders(self) -> Tuple[int, ...]:
+        ipa_orders: Tuple[int, ...] = ()
+        for sub_component in self.sub_components:
+            if sub_component:
+                ipa_orders += sub_component.sort_key[1]
+        return ipa_orders
+
+    @classmethod
+    def _sub_component_names(cls) -> Tuple[str, ...]:
+        names = _SUB_COMPONENT_NAMES.get(cls)
+        if names is None:
+            cls_name = cls.__name__
+            if "Syllable" in type_capabilities(cls):
+                cls_name = "Syllable"
+            names = _SUB_COMPONENT_NAMES[cls] = tuple(
+                sub_component.lower()
+                for sub_component in SYLLABLE_STRUCTURE[cls_name]
+                # sub_component_name for sub_component_name in cls.__match_args__
+            )
+        return names
+
     @property
     def sub_components(self) -> List[SyllableComponent]:
-        cls_name = type(self).__name__
-        if "Syllable" in obj_to_mro_chain_names(self):
-            cls_name = "Syllable"
-        return [
-            getattr(self, sub_component.lower())
-            for sub_component in SYLLABLE_STRUCTURE[cls_name]
-            # getattr(self, sub_component_name)
-            # for sub_component_name in self.__match_args__
-        ]
+        return [getattr(self, name) for name in self._sub_component_names()]
 
     @property
     def recursive_sub_components(self) -> List["SyllableComponent"]:
@@ -223,21 +356,6 @@ class BranchSyllableComponent(SyllableComponent):
                 ipa_str += sub_component.ipa_str
         return ipa_str
 
-    @property
-    def phonetic_ipa_str(self) -> IPAString:
-        if self._phonetic_ipa_str is not None:
-            return self._phonetic_ipa_str
-
-        phonetic_ipa_str = IPAString()
-        for sub_component in self.sub_components:
-            if sub_component:
-                phonetic_ipa_str += sub_component.phonetic_ipa_str
-        return phonetic_ipa_str
-
-    @phonetic_ipa_str.setter
-    def phonetic_ipa_str(self, value) -> None:
-        self._phonetic_ipa_str = value
-
     @property
     def _substr(self) -> str:
         return "".join(map(str, self.sub_components))
@@ -253,36 +371,48 @@ class RootSyllableComponent(BranchSyllableComponent):
     吳：根音節要素
     """
 
+    __slots__ = ()
+
 
 class Initial(LeafSyllableComponent):
     """
     吳：聲母
     """
 
+    __slots__ = ()
+
 
 class Medial(LeafSyllableComponent):
     """
     吳：介音
     """
 
+    __slots__ = ()
+
 
 class Nucleus(LeafSyllableComponent):
     """
     吳：韻腹
     """
 
+    __slots__ = ()
+
 
 class Coda(LeafSyllableComponent):
     """
     吳：韻尾
     """
 
+    __slots__ = ()
 
-class Tone(LeafSyllableComponent, metaclass=PostInitCaller):
+
+class Tone(LeafSyllableComponent):
     """
     吳：聲調
     """
 
+    __slots__ = ()
+
     def __post_init__(self) -> None:
         super().__post_init__()
         self.validate()
@@ -297,8 +427,9 @@ class Tone(LeafSyllableComponent, metaclass=PostInitCaller):
                 raise ValueError(f"'{self.ipa_str}' is not a tone.")
 
 
+@add_slots
 @dataclass(repr=False, eq=False)
-class Final(BranchSyllableComponent):
+class Final(BranchSyllableComponent, metaclass=InternedComponent):
     """
     吳：韻母
 
@@ -309,7 +440,29 @@ class Final(BranchSyllableComponent):
     nucleus: Nucleus = field(default_factory=Nucleus)
     coda: Coda = field(default_factory=Coda)
 
+    intern_pool = COMPONENT_POOL
+
+    @classmethod
+    def _intern_call_key(cls, *args, **kwargs) -> Optional[Hashable]:
+        return None
+
+    def _intern_canonical_key(self) -> Hashable:
+        return (type(self), self.medial, self.nucleus, self.coda)
+
+    def _freeze(self) -> None:
+        pass
+
+    def __copy__(self) -> "Final":
+        return self
+
+    def __deepcopy__(self, memo) -> "Final":
+        return self
+
+    def __reduce__(self):
+        return (type(self), (self.medial, self.nucleus, self.coda))
+
 
+@add_slots
 @dataclass(repr=False, eq=False)
 class Syllable(RootSyllableComponent):
     """
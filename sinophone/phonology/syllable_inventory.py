@@ -0,0 +1,371 @@
+import mmap
+import struct
+import sys
+from array import array
+from bisect import bisect_left
+from typing import (
+    IO,
+    Dict,
+    Iterable,
+    Iterator,
+    List,
+    MutableSet,
+    Optional,
+    Sequence,
+    Set,
+)
+
+from ..utils import PrettyClass, repr_set_in_order
+from .syllable import (
+    Coda,
+    Final,
+    Initial,
+    LeafSyllableComponent,
+    Medial,
+    Nucleus,
+    Syllable,
+    Tone,
+    sort_key,
+)
+from .syllable_table import (
+    CODE_BITS,
+    CODE_MASK,
+    MAX_CODES,
+    SLOTS,
+    SyllableTable,
+    pack_codes,
+)
+
+MAGIC = b"SNPI"
+"""The first bytes of a syllable inventory file."""
+
+FORMAT_VERSION = 1
+"""The version of the format written by ``SyllableInventory.write``."""
+
+HEADER = struct.Struct("<4sHHI5I")
+"""
+The header of a syllable inventory file: magic, version, reserved,
+number of syllables and number of phonemes of each slot.
+
+It is followed by the phoneme dictionary, each phoneme being its IPA string
+in UTF-8 prefixed by its length as a ``uint16``, slot by slot,
+and then by the packed keys of the syllables (see ``pack_codes``)
+as sorted ``uint64`` integers, aligned to 8 bytes. All integers are little-endian.
+"""
+
+PHONEME_LENGTH = struct.Struct("<H")
+
+SLOT_TYPES = (Initial, Medial, Nucleus, Coda, Tone)
+"""The types of the phonemes of ``SLOTS``."""
+
+FINAL_SHIFT = CODE_BITS
+FINAL_MASK = (1 << 3 * CODE_BITS) - 1
+
+
+class SyllableInventory(PrettyClass, MutableSet[Syllable]):
+    """
+    吳：音節庫
+
+    A set of syllables backed by a binary file opened with ``mmap``,
+    so that processes opening the same file share its pages read-only.
+
+    Syllables are stored as sorted integer keys, and are only decoded
+    when iterated over or indexed. Membership is tested by binary search
+    on the keys. Syllables added to or discarded from the inventory
+    are kept in memory, and the file is never modified.
+
+    Use it as the syllables of a phonology with ``Phonology.open_inventory``.
+    """
+
+    def __init__(self, path: str) -> None:
+        self.path = path
+        self._buffer: Optional[memoryview] = None
+        self._key_bytes: Optional[memoryview] = None
+        self._file: Optional[IO[bytes]] = open(path, "rb")
+        try:
+            self._mmap: Optional[mmap.mmap] = mmap.mmap(
+                self._file.fileno(), 0, access=mmap.ACCESS_READ
+            )
+        except ValueError:
+            # raised for an empty file, which cannot be memory-mapped
+            self._file.close()
+            raise ValueError(f"{path} is not a syllable inventory file") from None
+        except BaseException:
+            self._file.close()
+            raise
+        buffer = self._buffer = memoryview(self._mmap)
+
+        if len(buffer) < HEADER.size or buffer[: len(MAGIC)] != MAGIC:
+            self.close()
+            raise ValueError(f"{path} is not a syllable inventory file")
+        _, version, _, n_syllables, *n_phonemes = HEADER.unpack_from(buffer)
+        if version > FORMAT_VERSION:
+            self.close()
+            raise ValueError(f"Unsupported version of syllable inventory: {version}")
+
+        offset = HEADER.size
+        self._phoneme_strs: List[List[str]] = []
+        for n in n_phonemes:
+            strs = []
+            for _ in range(n):
+                (length,) = PHONEME_LENGTH.unpack_from(buffer, offset)
+                offset += PHONEME_LENGTH.size
+                strs.append(str(buffer[offset : offset + length], "utf-8"))
+                offset += length
+            self._phoneme_strs.append(strs)
+        offset += -offset % 8
+
+        key_bytes = self._key_bytes = buffer[offset : offset + 8 * n_syllables]
+        self._keys: Sequence[int]
+        if sys.byteorder == "little":
+            self._keys = key_bytes.cast("Q")
+        else:  # pragma: no cover
+            keys = array("Q", key_bytes)
+            keys.byteswap()
+            self._keys = keys
+
+        self._phonemes: List[List[Optional[LeafSyllableComponent]]] = [
+            [None] * len(strs) for strs in self._phoneme_strs
+        ]
+        self._finals: Dict[int, Final] = {}
+        self._codes: Optional[List[Dict[LeafSyllableComponent, int]]] = None
+        self._added: Set[Syllable] = set()
+        self._removed: Set[int] = set()
+
+    @classmethod
+    def open(cls, path: str) -> "SyllableInventory":
+        """Opens a syllable inventory file written by ``write``."""
+        return cls(path)
+
+    @staticmethod
+    def write(path: str, syllables: Iterable[Syllable]) -> None:
+        """Writes syllables to a syllable inventory file."""
+        syllables = list(syllables)
+        phoneme_sets: List[Set[LeafSyllableComponent]] = [set() for _ in SLOTS]
+        for syllable in syllables:
+            final = syllable.final
+            phonemes_of_syllable = (
+                syllable.initial,
+                final.medial,
+                final.nucleus,
+                final.coda,
+                syllable.tone,
+            )
+            for phoneme_set, phoneme in zip(phoneme_sets, phonemes_of_syllable):
+                phoneme_set.add(phoneme)
+        phonemes = [sorted(phoneme_set, key=sort_key) for phoneme_set in phoneme_sets]
+        codes: List[Dict[LeafSyllableComponent, int]] = []
+        for slot, slot_phonemes in zip(SLOTS, phonemes):
+            if len(slot_phonemes) > MAX_CODES:
+                raise OverflowError(f"Too many distinct phonemes for {slot}")
+            codes.append({phoneme: code for code, phoneme in enumerate(slot_phonemes)})
+        keys = sorted({_encode(codes, syllable) for syllable in syllables})
+        _write(path, phonemes, keys)
+
+    @staticmethod
+    def write_table(path: str, table: SyllableTable) -> None:
+        """
+        Writes the syllables of a ``SyllableTable`` to a syllable inventory file,
+        translating their codes without decoding them into ``Syllable`` objects.
+        """
+        codebook = table.codebook
+        phonemes: List[List[LeafSyllableComponent]] = []
+        translations: List[List[int]] = []
+        for slot in SLOTS:
+            codes = sorted(
+                set(table.columns[slot]),
+                key=lambda code: sort_key(codebook.decode(slot, code)),
+            )
+            phonemes.append([codebook.decode(slot, code) for code in codes])
+            translation = [0] * len(codebook.phonemes[slot])
+            for new_code, code in enumerate(codes):
+                translation[code] = new_code
+            translations.append(translation)
+        initials, medials, nuclei, codas, tones = translations
+        keys = sorted(
+            pack_codes(
+                (
+                    initials[initial],
+                    medials[medial],
+                    nuclei[nucleus],
+                    codas[coda],
+                    tones[tone],
+                )
+            )
+            for initial, medial, nucleus, coda, tone in zip(
+                *(table.columns[slot] for slot in SLOTS)
+            )
+        )
+        _write(path, phonemes, keys)
+
+    def close(self) -> None:
+        """Closes the file. The inventory cannot be used afterwards."""
+        for view in (getattr(self, "_keys", None), self._key_bytes, self._buffer):
+            if isinstance(view, memoryview):
+                view.release()
+        if self._mmap is not None:
+            self._mmap.close()
+            self._mmap = None
+        if self._file is not None:
+            self._file.close()
+            self._file = None
+
+    def __enter__(self) -> "SyllableInventory":
+        return self
+
+    def __exit__(self, *args) -> None:
+        self.close()
+
+    def __str__(self) -> str:
+        return repr_set_in_order(set(self))
+
+    def _phoneme(self, slot: int, code: int) -> LeafSyllableComponent:
+        phoneme = self._phonemes[slot][code]
+        if phoneme is None:
+            phoneme = self._phonemes[slot][code] = SLOT_TYPES[slot](
+                self._phoneme_strs[slot][code]
+            )
+        return phoneme
+
+    def _final(self, codes: int) -> Final:
+        final = self._finals.get(codes)
+        if final is None:
+            final = self._finals[codes] = Final(
+                self._phoneme(1, codes >> 2 * CODE_BITS),  # type: ignore
+                self._phoneme(2, codes >> CODE_BITS & CODE_MASK),  # type: ignore
+                self._phoneme(3, codes & CODE_MASK),  # type: ignore
+            )
+        return final
+
+    def _decode(self, key: int) -> Syllable:
+        return Syllable(
+            self._phoneme(0, key >> 4 * CODE_BITS),  # type: ignore
+            self._final(key >> FINAL_SHIFT & FINAL_MASK),
+            self._phoneme(4, key & CODE_MASK),  # type: ignore
+        )
+
+    def _key(self, syllable: Syllable) -> Optional[int]:
+        """Returns the key of a syllable if it is in the file."""
+        if self._codes is None:
+            self._codes = [
+                {self._phoneme(slot, code): code for code in range(len(strs))}
+                for slot, strs in enumerate(self._phoneme_strs)
+            ]
+        try:
+            key = _encode(self._codes, syllable)
+        except KeyError:
+            return None
+        i = bisect_left(self._keys, key)  # type: ignore
+        if i < len(self._keys) and self._keys[i] == key:
+            return key
+        return None
+
+    def __len__(self) -> int:
+        return len(self._keys) - len(self._removed) + len(self._added)
+
+    def __iter__(self) -> Iterator[Syllable]:
+        removed = self._removed
+        for key in self._keys:
+            if key not in removed:
+                yield self._decode(key)
+        yield from self._added
+
+    def __getitem__(self, i: int) -> Syllable:
+        """Returns the ``i``-th syllable in the file, ignoring modifications."""
+        return self._decode(self._keys[i])
+
+    def __contains__(self, syllable: object) -> bool:
+        if not isinstance(syllable, Syllable):
+            return False
+        if syllable in self._added:
+            return True
+        key = self._key(syllable)
+        return key is not None and key not in self._removed
+
+    def add(self, syllable: Syllable) -> None:
+        key = self._key(syllable)
+        if key is None:
+            self._added.add(syllable)
+        else:
+            self._removed.discard(key)
+
+    def discard(self, syllable: Syllable) -> None:
+        if syllable in self._added:
+            self._added.discard(syllable)
+            return
+        key = self._key(syllable)
+        if key is not None:
+            self._removed.add(key)
+
+    @property
+    def initials(self) -> Set[Initial]:
+        """Returns the initials of the syllables, without decoding them."""
+        return self._slot_phonemes(0, 4 * CODE_BITS) | {s.initial for s in self._added}
+
+    @property
+    def tones(self) -> Set[Tone]:
+        """Returns the tones of the syllables, without decoding them."""
+        return self._slot_phonemes(4, 0) | {s.tone for s in self._added}
+
+    @property
+    def finals(self) -> Set[Final]:
+        """Returns the finals of the syllables, without decoding them."""
+        removed = self._removed
+        final_codes = {
+            key >> FINAL_SHIFT & FINAL_MASK
+            for key in self._keys
+            if not removed or key not in removed
+        }
+        finals = {self._final(codes) for codes in final_codes}
+        return finals | {s.final for s in self._added}
+
+    def _slot_phonemes(self, slot: int, shift: int) -> Set:
+        codes: Iterable[int]
+        if self._removed:
+            removed = self._removed
+            codes = {
+                key >> shift & CODE_MASK for key in self._keys if key not in removed
+            }
+        else:
+            # every phoneme in the file is in some syllable of it
+            codes = range(len(self._phoneme_strs[slot]))
+        return {self._phoneme(slot, code) for code in codes}
+
+
+def _write(
+    path: str, phonemes: Sequence[Sequence[LeafSyllableComponent]], keys: List[int]
+) -> None:
+    """Writes the phonemes of each slot and the sorted keys of syllables to a file."""
+    key_array = array("Q", keys)
+    if sys.byteorder != "little":  # pragma: no cover
+        key_array.byteswap()
+
+    with open(path, "wb") as f:
+        header = HEADER.pack(
+            MAGIC, FORMAT_VERSION, 0, len(key_array), *map(len, phonemes)
+        )
+        f.write(header)
+        offset = HEADER.size
+        for slot_phonemes in phonemes:
+            for phoneme in slot_phonemes:
+                encoded = str(phoneme).encode("utf-8")
+                f.write(PHONEME_LENGTH.pack(len(encoded)))
+                f.write(encoded)
+                offset += PHONEME_LENGTH.size + len(encoded)
+        f.write(b"\0" * (-offset % 8))
+        f.write(key_array.tobytes())
+
+
+def _encode(
+    codes: Sequence[Dict[LeafSyllableComponent, int]], syllable: Syllable
+) -> int:
+    final = syllable.final
+    return pack_codes(
+        (
+            codes[0][syllable.initial],
+            codes[1][final.medial],
+            codes[2][final.nucleus],
+            codes[3][final.coda],
+            codes[4][syllable.tone],
+        )
+    )
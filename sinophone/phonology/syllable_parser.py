@@ -0,0 +1,155 @@
+from dataclasses import dataclass
+from time import perf_counter
+from typing import Dict, Iterable, Iterator, Optional, Sequence, Tuple
+
+from ..phonetics.ipa_utils import IPAChar, tokenize_ipa
+from ..utils import PrettyClass
+from .syllable import Final, Initial, Syllable, SyllableComponent, Tone
+
+IPAKey = Tuple[IPAChar, ...]
+
+
+@dataclass(frozen=True)
+class SyllableParserStats(object):
+    """Statistics of a ``SyllableParser``."""
+
+    parsed: int
+    """Number of transcriptions parsed into syllables."""
+    failed: int
+    """Number of transcriptions that could not be segmented."""
+    cached: int
+    """Number of distinct transcriptions whose syllables are cached."""
+    seconds: float
+    """Time spent parsing, in seconds."""
+
+    @property
+    def throughput(self) -> float:
+        """Transcriptions parsed per second."""
+        total = self.parsed + self.failed
+        return total / self.seconds if self.seconds else 0.0
+
+
+class _Inventory(object):
+    """Components of one kind, looked up by the IPA characters they consist of."""
+
+    def __init__(self, components: Iterable[SyllableComponent]) -> None:
+        self.components: Dict[IPAKey, SyllableComponent] = {
+            tuple(component.ipa_str.ipa_chars): component for component in components
+        }
+        self.max_length = max(map(len, self.components), default=0)
+
+    def prefixes(
+        self, ipa_chars: IPAKey, start: int
+    ) -> Iterator[Tuple[int, SyllableComponent]]:
+        """
+        Yields the ends and components of the prefixes of ``ipa_chars[start:]``
+        in the inventory, longest first.
+        """
+        components = self.components
+        for end in range(min(start + self.max_length, len(ipa_chars)), start - 1, -1):
+            component = components.get(ipa_chars[start:end])
+            if component is not None:
+                yield end, component
+
+    def get(self, ipa_chars: IPAKey) -> Optional[SyllableComponent]:
+        return self.components.get(ipa_chars)
+
+
+class SyllableParser(PrettyClass):
+    """
+    吳：音節剖析器
+
+    Segments IPA transcriptions such as ``kɐʔ˥˥`` into syllables,
+    given the initials, finals and tones of a phonology.
+
+    The initial and then the final are matched longest first,
+    backtracking to shorter ones until the rest of the transcription is a tone.
+    An empty initial or tone only matches if it is in the inventory.
+    Parsed syllables are cached by transcription,
+    as a dictionary repeats the same syllables many times.
+    """
+
+    def __init__(
+        self,
+        initials: Iterable[Initial],
+        finals: Iterable[Final],
+        tones: Iterable[Tone],
+    ) -> None:
+        self.initials = _Inventory(initials)
+        self.finals = _Inventory(finals)
+        self.tones = _Inventory(tones)
+        self._cache: Dict[str, Syllable] = {}
+        self.reset_stats()
+
+    def __str__(self) -> str:
+        return (
+            f"{len(self.initials.components)} initials,"
+            f" {len(self.finals.components)} finals,"
+            f" {len(self.tones.components)} tones"
+        )
+
+    def reset_stats(self) -> None:
+        """Resets the counters of ``stats``."""
+        self._parsed = 0
+        self._failed = 0
+        self._seconds = 0.0
+
+    def stats(self) -> SyllableParserStats:
+        """Returns how many transcriptions were parsed, and how fast."""
+        return SyllableParserStats(
+            self._parsed, self._failed, len(self._cache), self._seconds
+        )
+
+    def segment(self, ipa_chars: Sequence[IPAChar]) -> Optional[Syllable]:
+        """
+        Segments IPA characters into a syllable,
+        or returns ``None`` if they are not a syllable of the inventories.
+        """
+        key = tuple(ipa_chars)
+        for initial_end, initial in self.initials.prefixes(key, 0):
+            for final_end, final in self.finals.prefixes(key, initial_end):
+                tone = self.tones.get(key[final_end:])
+                if tone is not None:
+                    return Syllable(initial, final, tone)  # type: ignore
+        return None
+
+    def parse(self, transcription: str) -> Syllable:
+        """
+        Parses an IPA transcription into a syllable.
+
+        Raises ``ValueError`` if it is not a syllable of the inventories.
+        """
+        start = perf_counter()
+        try:
+            syllable = self._cache.get(transcription)
+            if syllable is None:
+                syllable = self.segment(tokenize_ipa(transcription))
+                if syllable is None:
+                    raise ValueError(f"'{transcription}' is not a syllable")
+                self._cache[transcription] = syllable
+        except ValueError:
+            self._failed += 1
+            raise
+        finally:
+            self._seconds += perf_counter() - start
+        self._parsed += 1
+        return syllable
+
+    def parse_many(
+        self, transcriptions: Iterable[str], skip_invalid: bool = False
+    ) -> Iterator[Syllable]:
+        """
+        Lazily parses IPA transcriptions into syllables,
+        so that inputs of any size can be streamed through.
+
+        Transcriptions that cannot be parsed raise ``ValueError``,
+        or are left out if ``skip_invalid`` is ``True``.
+        """
+        for transcription in transcriptions:
+            try:
+                syllable = self.parse(transcription)
+            except ValueError:
+                if skip_invalid:
+                    continue
+                raise
+            yield syllable
@@ -0,0 +1,306 @@
+from array import array
+from typing import (
+    AbstractSet,
+    Dict,
+    Iterable,
+    Iterator,
+    List,
+    Optional,
+    Sequence,
+    Tuple,
+)
+
+from ..utils import PrettyClass, repr_set_in_order
+from .syllable import Final, LeafSyllableComponent, Syllable
+
+SLOTS: Tuple[str, ...] = ("initial", "medial", "nucleus", "coda", "tone")
+"""The columns of a syllable table, in order."""
+
+CODE_BITS = 12
+"""How many bits the code of a phoneme takes in a packed syllable key."""
+
+MAX_CODES = 1 << CODE_BITS
+CODE_MASK = MAX_CODES - 1
+
+SHIFTS: Tuple[int, ...] = tuple(CODE_BITS * i for i in reversed(range(len(SLOTS))))
+
+SyllableCodes = Tuple[int, int, int, int, int]
+
+
+def pack_codes(codes: Sequence[int]) -> int:
+    """Packs the codes of the five phonemes of a syllable into an integer key."""
+    key = 0
+    for code in codes:
+        key = key << CODE_BITS | code
+    return key
+
+
+def unpack_key(key: int) -> SyllableCodes:
+    """Unpacks an integer key into the codes of the five phonemes of a syllable."""
+    return (
+        key >> 4 * CODE_BITS,
+        key >> 3 * CODE_BITS & CODE_MASK,
+        key >> 2 * CODE_BITS & CODE_MASK,
+        key >> CODE_BITS & CODE_MASK,
+        key & CODE_MASK,
+    )
+
+
+class PhonemeCodebook(PrettyClass):
+    """
+    吳：音位碼本
+
+    Assigns small integer codes to the initials, medials, nuclei, codas
+    and tones of syllables, one code space for each of them.
+    Codes are assigned in order of appearance and never change,
+    so that tables sharing a codebook can be compared code by code.
+    """
+
+    def __init__(self) -> None:
+        self.phonemes: Dict[str, List[LeafSyllableComponent]] = {
+            slot: [] for slot in SLOTS
+        }
+        self.codes: Dict[str, Dict[LeafSyllableComponent, int]] = {
+            slot: {} for slot in SLOTS
+        }
+        self._order_keys: Optional[Dict[str, List[Tuple[int, ...]]]] = None
+
+    def __str__(self) -> str:
+        return " ".join(
+            f"{slot}: {repr_set_in_order(set(self.phonemes[slot]))}" for slot in SLOTS
+        )
+
+    def __len__(self) -> int:
+        return sum(len(phonemes) for phonemes in self.phonemes.values())
+
+    def encode(self, slot: str, phoneme: LeafSyllableComponent) -> int:
+        """Returns the code of a phoneme, assigning a new code if necessary."""
+        codes = self.codes[slot]
+        code = codes.get(phoneme)
+        if code is None:
+            code = len(codes)
+            if code >= MAX_CODES:
+                raise OverflowError(f"Too many distinct phonemes for {slot}")
+            codes[phoneme] = code
+            self.phonemes[slot].append(phoneme)
+            self._order_keys = None
+        return code
+
+    def encode_syllable(self, syllable: Syllable) -> int:
+        """Returns the packed key of a syllable, assigning new codes if necessary."""
+        final = syllable.final
+        return pack_codes(
+            (
+                self.encode("initial", syllable.initial),
+                self.encode("medial", final.medial),
+                self.encode("nucleus", final.nucleus),
+                self.encode("coda", final.coda),
+                self.encode("tone", syllable.tone),
+            )
+        )
+
+    def lookup_syllable(self, syllable: Syllable) -> Optional[int]:
+        """
+        Returns the packed key of a syllable,
+        or ``None`` if any of its phonemes has no code.
+        """
+        final = syllable.final
+        codes = []
+        for slot, phoneme in zip(
+            SLOTS,
+            (
+                syllable.initial,
+                final.medial,
+                final.nucleus,
+                final.coda,
+                syllable.tone,
+            ),
+        ):
+            code = self.codes[slot].get(phoneme)
+            if code is None:
+                return None
+            codes.append(code)
+        return pack_codes(codes)
+
+    def decode(self, slot: str, code: int) -> LeafSyllableComponent:
+        """Returns the phoneme of a code."""
+        return self.phonemes[slot][code]
+
+    def decode_key(self, key: int) -> Syllable:
+        """Returns the syllable of a packed key."""
+        initial, medial, nucleus, coda, tone = unpack_key(key)
+        phonemes = self.phonemes
+        return Syllable(
+            phonemes["initial"][initial],  # type: ignore
+            Final(
+                phonemes["medial"][medial],  # type: ignore
+                phonemes["nucleus"][nucleus],  # type: ignore
+                phonemes["coda"][coda],  # type: ignore
+            ),
+            phonemes["tone"][tone],  # type: ignore
+        )
+
+    def translation(self, other: "PhonemeCodebook", slot: str) -> List[int]:
+        """Returns the codes in this codebook of the phonemes of ``other``."""
+        return [self.encode(slot, phoneme) for phoneme in other.phonemes[slot]]
+
+    @property
+    def order_keys(self) -> Dict[str, List[Tuple[int, ...]]]:
+        """
+        Returns, for each code, the IPA orders of the characters of its phoneme,
+        so that concatenating them gives the sort key of a syllable.
+        """
+        if self._order_keys is None:
+            self._order_keys = {
+                slot: [phoneme.sort_key[1] for phoneme in self.phonemes[slot]]
+                for slot in SLOTS
+            }
+        return self._order_keys
+
+
+class SyllableTable(PrettyClass, AbstractSet[Syllable]):
+    """
+    吳：音節表
+
+    An immutable set of syllables stored column by column:
+    the initial, medial, nucleus, coda and tone of every syllable are stored
+    as codes of a ``PhonemeCodebook`` in ``array`` columns.
+
+    Set operations, membership tests and sorting work on the integer codes.
+    Tables sharing a codebook are combined directly, otherwise the codes of
+    the other table are translated first. ``Syllable`` objects are only
+    created when the table is iterated over or indexed.
+    """
+
+    def __init__(
+        self,
+        syllables: Iterable[Syllable] = (),
+        codebook: Optional[PhonemeCodebook] = None,
+    ) -> None:
+        self.codebook = codebook if codebook is not None else PhonemeCodebook()
+        encode_syllable = self.codebook.encode_syllable
+        keys: Dict[int, None] = {}
+        for syllable in syllables:
+            keys[encode_syllable(syllable)] = None
+        self._set_keys(keys)
+
+    @classmethod
+    def from_keys(
+        cls, keys: Iterable[int], codebook: PhonemeCodebook
+    ) -> "SyllableTable":
+        """Returns a table of the packed keys of syllables in ``codebook``."""
+        table = cls.__new__(cls)
+        table.codebook = codebook
+        table._set_keys(dict.fromkeys(keys))
+        return table
+
+    def _set_keys(self, keys: Dict[int, None]) -> None:
+        self.columns: Dict[str, array] = {
+            slot: array("H", [key >> shift & CODE_MASK for key in keys])
+            for slot, shift in zip(SLOTS, SHIFTS)
+        }
+        self._keys: AbstractSet[int] = keys.keys()
+
+    @property
+    def keys(self) -> List[int]:
+        """Returns the packed keys of the syllables, in the order of the rows."""
+        return list(self._keys)
+
+    def _keys_in(self, codebook: PhonemeCodebook) -> Iterable[int]:
+        """Returns the packed keys of the syllables in another codebook."""
+        if codebook is self.codebook:
+            return self._keys
+        translations = [codebook.translation(self.codebook, slot) for slot in SLOTS]
+        return [
+            pack_codes(
+                [translation[code] for translation, code in zip(translations, codes)]
+            )
+            for codes in zip(*(self.columns[slot] for slot in SLOTS))
+        ]
+
+    def __str__(self) -> str:
+        return repr_set_in_order(set(self))
+
+    def __len__(self) -> int:
+        return len(self._keys)
+
+    def __iter__(self) -> Iterator[Syllable]:
+        decode_key = self.codebook.decode_key
+        for key in self._keys:
+            yield decode_key(key)
+
+    def __getitem__(self, row: int) -> Syllable:
+        return self.codebook.decode_key(
+            pack_codes([self.columns[slot][row] for slot in SLOTS])
+        )
+
+    def __contains__(self, syllable: object) -> bool:
+        if not isinstance(syllable, Syllable):
+            return False
+        key = self.codebook.lookup_syllable(syllable)
+        return key is not None and key in self._keys
+
+    def __eq__(self, other: object) -> bool:
+        if isinstance(other, SyllableTable):
+            return len(self) == len(other) and self._keys == set(
+                other._keys_in(self.codebook)
+            )
+        return super().__eq__(other)
+
+    def __hash__(self) -> int:
+        return self._hash()
+
+    def __and__(self, other: AbstractSet) -> "SyllableTable":
+        if not isinstance(other, SyllableTable):
+            other = SyllableTable(other, self.codebook)
+        other_keys = set(other._keys_in(self.codebook))
+        return self.from_keys(
+            (key for key in self._keys if key in other_keys), self.codebook
+        )
+
+    def __or__(self, other: AbstractSet) -> "SyllableTable":  # type: ignore
+        if not isinstance(other, SyllableTable):
+            other = SyllableTable(other, self.codebook)
+        return self.from_keys(
+            list(self._keys) + list(other._keys_in(self.codebook)), self.codebook
+        )
+
+    def __sub__(self, other: AbstractSet) -> "SyllableTable":
+        if not isinstance(other, SyllableTable):
+            other = SyllableTable(other, self.codebook)
+        other_keys = set(other._keys_in(self.codebook))
+        return self.from_keys(
+            (key for key in self._keys if key not in other_keys), self.codebook
+        )
+
+    def __xor__(self, other: AbstractSet) -> "SyllableTable":  # type: ignore
+        if not isinstance(other, SyllableTable):
+            other = SyllableTable(other, self.codebook)
+        other_keys = list(other._keys_in(self.codebook))
+        other_key_set = set(other_keys)
+        return self.from_keys(
+            [key for key in self._keys if key not in other_key_set]
+            + [key for key in other_keys if key not in self._keys],
+            self.codebook,
+        )
+
+    def sorted(self, reverse: bool = False) -> "SyllableTable":
+        """
+        Returns a table of the same syllables,
+        with rows in the same order as ``sorted`` on ``Syllable`` objects.
+        """
+        order_keys = self.codebook.order_keys
+        key_columns = [
+            [order_keys[slot][code] for code in self.columns[slot]] for slot in SLOTS
+        ]
+        sort_keys = [
+            initial + medial + nucleus + coda + tone
+            for initial, medial, nucleus, coda, tone in zip(*key_columns)
+        ]
+        keys = self.keys
+        rows = sorted(range(len(keys)), key=sort_keys.__getitem__, reverse=reverse)
+        return self.from_keys([keys[row] for row in rows], self.codebook)
+
+    def to_syllables(self) -> List[Syllable]:
+        """Returns the syllables in the order of the rows."""
+        return list(self)
@@ -0,0 +1,421 @@
+"""
+Generates synthetic phonologies of any size, e.g. for benchmarks and property tests.
+
+Inventories are drawn from the IPA tables of ``ipa_utils``: initials from
+consonants and their aspirated, labialized and palatalized variants,
+finals from glides, vowels and their nasalized variants, and nasal and stop codas,
+and tones from contours of up to three tone letters.
+Syllables are sampled from the collocations of the initials, finals and tones
+as packed keys of a ``SyllableTable``, without creating ``Syllable`` objects,
+so that inventories of a million syllables are generated in seconds.
+"""
+
+import math
+from dataclasses import dataclass, field
+from functools import lru_cache
+from itertools import product
+from random import Random
+from typing import Dict, FrozenSet, List, Sequence, Tuple
+
+from ..phonetics.ipa_utils import IPAString, ipa_to_unicode
+from ..phonetics.phonetics import IPAFeatureGroup
+from ..utils import PrettyClass
+from .phonology import (
+    PhonologicalRule,
+    Phonology,
+    PhonotacticAcceptability,
+    PhonotacticConstraint,
+    SyllableFeatures,
+)
+from .syllable import (
+    Coda,
+    Final,
+    Initial,
+    LeafSyllableComponent,
+    Medial,
+    Nucleus,
+    Syllable,
+    Tone,
+)
+from .syllable_inventory import SyllableInventory
+from .syllable_table import PhonemeCodebook, SyllableTable, pack_codes
+
+INITIAL_MANNERS = frozenset(
+    {
+        "plosive",
+        "nasal",
+        "sibilant-affricate",
+        "sibilant-fricative",
+        "non-sibilant-fricative",
+        "approximant",
+        "lateral-approximant",
+    }
+)
+"""The manners of articulation of the consonants initials are drawn from."""
+
+SECONDARY_ARTICULATIONS = ("aspirated", "labialized", "palatalized")
+"""The diacritics added to plosives and affricates to make more initials."""
+
+TONE_LEVELS = (
+    "extra-high-level",
+    "high-level",
+    "mid-level",
+    "low-level",
+    "extra-low-level",
+)
+"""The tone letters tones are drawn from, as contours of up to three letters."""
+
+CLASS_LABELS = frozenset({"consonant", "vowel", "diacritic", "tone"})
+"""Descriptor labels shared by whole classes of phonemes, not tested by patterns."""
+
+COMPONENT_TYPES = {
+    "Initial": Initial,
+    "Medial": Medial,
+    "Nucleus": Nucleus,
+    "Coda": Coda,
+    "Tone": Tone,
+}
+
+ACCEPTABILITIES = ((False, True), (True, False), (False, False))
+"""The ``existent`` and ``grammatical`` of generated phonotactic constraints."""
+
+
+def _unicode(*labels: str) -> str:
+    """Returns the Unicode string of the IPA character of exactly ``labels``."""
+    return _unicode_by_labels()[frozenset(labels)]
+
+
+@lru_cache(maxsize=None)
+def _unicode_by_labels() -> Dict[FrozenSet[str], str]:
+    return {
+        frozenset(ipa.split()): unicode_str
+        for ipa, unicode_str in ipa_to_unicode().items()
+    }
+
+
+@lru_cache(maxsize=None)
+def candidate_phonemes() -> Dict[str, Tuple[str, ...]]:
+    """
+    Returns the IPA strings phonemes are drawn from, by component name,
+    in the order of the IPA tables. The empty medial and coda come first.
+    """
+    consonants: List[Tuple[str, FrozenSet[str]]] = []
+    vowels: List[str] = []
+    for labels, unicode_str in _unicode_by_labels().items():
+        if "consonant" in labels:
+            consonants.append((unicode_str, labels))
+        elif "vowel" in labels:
+            vowels.append(unicode_str)
+
+    initials = [c for c, labels in consonants if labels & INITIAL_MANNERS]
+    for label in SECONDARY_ARTICULATIONS:
+        diacritic = _unicode(label, "diacritic")
+        initials.extend(
+            c + diacritic
+            for c, labels in consonants
+            if labels & {"plosive", "sibilant-affricate"} and "voiceless" in labels
+        )
+    medials = [""] + [
+        c
+        for c, labels in consonants
+        if {"approximant", "voiced"} <= labels
+        and labels & {"palatal", "velar", "labio-velar", "labio-palatal"}
+    ]
+    nasalized = _unicode("diacritic", "nasalized")
+    nuclei = vowels + [v + nasalized for v in vowels]
+    codas = [""] + [
+        c
+        for c, labels in consonants
+        if {"nasal", "voiced"} <= labels or {"plosive", "voiceless"} <= labels
+    ]
+    levels = [_unicode(level, "tone") for level in TONE_LEVELS]
+    tones = [
+        "".join(letters)
+        for length in range(1, 4)
+        for letters in product(levels, repeat=length)
+    ]
+    candidates = {
+        "Initial": initials,
+        "Medial": medials,
+        "Nucleus": nuclei,
+        "Coda": codas,
+        "Tone": tones,
+    }
+    return {
+        name: tuple(_valid(COMPONENT_TYPES[name], unicode_strs))
+        for name, unicode_strs in candidates.items()
+    }
+
+
+def _valid(component_type: type, unicode_strs: Sequence[str]) -> List[str]:
+    """Returns the distinct strings that are valid phonemes of a type."""
+    valid: Dict[str, None] = {}
+    for unicode_str in unicode_strs:
+        try:
+            component_type(unicode_str)
+        except (KeyError, ValueError):
+            continue
+        valid[unicode_str] = None
+    return list(valid)
+
+
+def _dimensions(n: int, limits: Sequence[int], exponents: Sequence[float]) -> List[int]:
+    """
+    Returns sizes of at most ``limits`` whose product is at least ``n``,
+    the ``i``-th being about the ``exponents[i]``-th power of what remains of ``n``.
+    """
+    sizes = []
+    remaining = float(n)
+    for limit, exponent in zip(limits, exponents):
+        size = min(limit, max(1, round(remaining**exponent)))
+        sizes.append(size)
+        remaining /= size
+    for i, limit in enumerate(limits):
+        others = math.prod(sizes) // sizes[i]
+        if others * sizes[i] < n:
+            sizes[i] = min(limit, math.ceil(n / others))
+    return sizes
+
+
+@dataclass(repr=False, frozen=True)
+class PhonologyGenerator(PrettyClass):
+    """
+    吳：音系生成器
+
+    Generates a synthetic phonology of ``n_syllables`` syllables,
+    the same for the same parameters and ``seed``.
+
+    The numbers of initials, finals and tones grow with the number of
+    collocations, about ``n_syllables / collocation_density``, like those of
+    Chinese phonologies, and phonotactic constraints and phonological rules
+    test features of the phonemes of the inventory, so that they match
+    some of the syllables.
+
+    Use ``phonology`` for up to about 100k syllables. For more,
+    ``write_inventory`` writes the syllables without decoding them,
+    to be opened with ``Phonology.open_inventory``.
+    """
+
+    n_syllables: int
+    seed: int = 0
+    collocation_density: float = 0.5
+    """The proportion of the collocations of initials, finals and tones sampled."""
+    n_phonotactics: int = 10
+    n_phonological_rules: int = 10
+    max_clauses: int = 2
+    """How many components a generated syllable pattern tests at most."""
+
+    _inventory: Tuple[List[Initial], List[Final], List[Tone]] = field(
+        init=False, repr=False, compare=False
+    )
+    _phonemes: Dict[str, List[LeafSyllableComponent]] = field(
+        init=False, repr=False, compare=False
+    )
+    _labels: Dict[str, List[List[str]]] = field(init=False, repr=False, compare=False)
+
+    def __post_init__(self) -> None:
+        if self.n_syllables < 1:
+            raise ValueError("A synthetic phonology must have syllables")
+        if not 0 < self.collocation_density <= 1:
+            raise ValueError("The collocation density must be in (0, 1]")
+        if self.max_clauses < 1:
+            raise ValueError("A syllable pattern must test at least one component")
+        object.__setattr__(self, "_inventory", self._generate_inventory())
+        phonemes: Dict[str, List[LeafSyllableComponent]] = {
+            name: [] for name in COMPONENT_TYPES
+        }
+        initials, finals, tones = self.inventory()
+        phonemes["Initial"].extend(initials)
+        for name in ("Medial", "Nucleus", "Coda"):
+            phonemes[name].extend(
+                {getattr(final, name.lower()): None for final in finals}
+            )
+        phonemes["Tone"].extend(tones)
+        object.__setattr__(
+            self,
+            "_phonemes",
+            {
+                name: [phoneme for phoneme in components if phoneme.ipa_str]
+                for name, components in phonemes.items()
+            },
+        )
+        # the descriptor labels of each phoneme, for the features of patterns
+        object.__setattr__(
+            self,
+            "_labels",
+            {
+                name: [
+                    sorted(
+                        {
+                            label
+                            for ipa_char in phoneme.ipa_str
+                            for label in ipa_char.descriptors
+                        }
+                        - CLASS_LABELS
+                    )
+                    for phoneme in components
+                ]
+                for name, components in self._phonemes.items()
+                if components
+            },
+        )
+
+    def __str__(self) -> str:
+        initials, finals, tones = self.inventory()
+        return (
+            f"{self.n_syllables} syllables of {len(initials)} initials,"
+            f" {len(finals)} finals and {len(tones)} tones,"
+            f" {self.n_phonotactics} phonotactic constraints,"
+            f" {self.n_phonological_rules} phonological rules, seed {self.seed}"
+        )
+
+    def _random(self, part: str) -> Random:
+        # a generator for each part, so that parts do not depend on one another
+        return Random(f"{self.seed}:{part}")
+
+    def _generate_inventory(self) -> Tuple[List[Initial], List[Final], List[Tone]]:
+        random = self._random("inventory")
+        candidates = candidate_phonemes()
+        medials, nuclei, codas = (
+            candidates[name] for name in ("Medial", "Nucleus", "Coda")
+        )
+        n_collocations = math.ceil(self.n_syllables / self.collocation_density)
+        n_tones, n_initials, n_finals = _dimensions(
+            n_collocations,
+            (
+                len(candidates["Tone"]),
+                len(candidates["Initial"]),
+                len(medials) * len(nuclei) * len(codas),
+            ),
+            (0.25, 0.45, 1),
+        )
+        if n_tones * n_initials * n_finals < self.n_syllables:
+            raise ValueError(
+                f"Cannot generate {self.n_syllables} syllables, at most"
+                f" {n_tones * n_initials * n_finals} collocations are available"
+            )
+        n_nuclei, n_medials, n_codas = _dimensions(
+            n_finals, (len(nuclei), len(medials), len(codas)), (0.5, 1 / 3, 1)
+        )
+        # the empty medial and coda are always in the inventory
+        medials = medials[:1] + tuple(random.sample(medials[1:], n_medials - 1))
+        codas = codas[:1] + tuple(random.sample(codas[1:], n_codas - 1))
+        nuclei = tuple(random.sample(nuclei, n_nuclei))
+        finals = random.sample(list(product(medials, nuclei, codas)), n_finals)
+        return (
+            [Initial(i) for i in random.sample(candidates["Initial"], n_initials)],
+            [Final(Medial(m), Nucleus(n), Coda(c)) for m, n, c in finals],
+            [Tone(t) for t in random.sample(candidates["Tone"], n_tones)],
+        )
+
+    def inventory(self) -> Tuple[List[Initial], List[Final], List[Tone]]:
+        """Returns the initials, finals and tones syllables are collocated from."""
+        return self._inventory
+
+    def syllable_table(self) -> SyllableTable:
+        """
+        Returns the syllables, sampled from the collocations of the inventory,
+        as a ``SyllableTable`` with a new codebook.
+        """
+        random = self._random("syllables")
+        codebook = PhonemeCodebook()
+        initials, finals, tones = self.inventory()
+        initial_keys = [
+            pack_codes((codebook.encode("initial", initial), 0, 0, 0, 0))
+            for initial in initials
+        ]
+        final_keys = [
+            pack_codes(
+                (
+                    0,
+                    codebook.encode("medial", final.medial),
+                    codebook.encode("nucleus", final.nucleus),
+                    codebook.encode("coda", final.coda),
+                    0,
+                )
+            )
+            for final in finals
+        ]
+        tone_keys = [codebook.encode("tone", tone) for tone in tones]
+        n_finals, n_tones = len(finals), len(tones)
+        keys = []
+        for index in sorted(
+            random.sample(range(len(initials) * n_finals * n_tones), self.n_syllables)
+        ):
+            rest, tone = divmod(index, n_tones)
+            initial, final = divmod(rest, n_finals)
+            keys.append(initial_keys[initial] | final_keys[final] | tone_keys[tone])
+        return SyllableTable.from_keys(keys, codebook)
+
+    def syllables(self) -> List[Syllable]:
+        """Returns the syllables of ``syllable_table`` as ``Syllable`` objects."""
+        return self.syllable_table().to_syllables()
+
+    def _syllable_features(self, random: Random) -> SyllableFeatures:
+        names = random.sample(
+            sorted(self._labels), min(self.max_clauses, len(self._labels))
+        )
+        names = names[: random.randint(1, len(names))]
+        syllable_component_features = {}
+        for name in names:
+            features = set()
+            for _ in range(random.randint(1, 2)):
+                labels = random.choice(self._labels[name])
+                if labels:
+                    features.add(IPAFeatureGroup(f"+{random.choice(labels)}"))
+            if features:
+                syllable_component_features[name] = features
+        return SyllableFeatures(syllable_component_features)  # type: ignore
+
+    def phonotactics(self) -> List[PhonotacticConstraint]:
+        """
+        Returns ``n_phonotactics`` constraints, each testing features
+        of up to ``max_clauses`` components of syllables.
+        """
+        random = self._random("phonotactics")
+        return [
+            PhonotacticConstraint(
+                self._syllable_features(random),
+                PhonotacticAcceptability(*random.choice(ACCEPTABILITIES)),
+            )
+            for _ in range(self.n_phonotactics)
+        ]
+
+    def phonological_rules(self) -> List[PhonologicalRule]:
+        """
+        Returns ``n_phonological_rules`` rules, each rendering a phoneme
+        of the inventory as another candidate phoneme of the same component.
+        """
+        random = self._random("phonological_rules")
+        candidates = candidate_phonemes()
+        names = sorted(self._labels)
+        rules = []
+        for _ in range(self.n_phonological_rules):
+            name = random.choice(names)
+            phoneme = random.choice(self._phonemes[name])
+            phonetic = random.choice([c for c in candidates[name] if c])
+            rules.append(
+                PhonologicalRule(
+                    phoneme, IPAString(phonetic), self._syllable_features(random)
+                )
+            )
+        return rules
+
+    def phonology(self, **kwargs) -> Phonology:
+        """
+        Returns the synthetic phonology.
+        Other fields of the phonology can be given as keyword arguments.
+        """
+        return Phonology(
+            syllables=set(self.syllable_table()),
+            phonotactics=set(self.phonotactics()),
+            phonological_rules=self.phonological_rules(),
+            **kwargs,
+        )
+
+    def write_inventory(self, path: str) -> None:
+        """
+        Writes the syllables to a syllable inventory file,
+        without decoding them (see ``SyllableInventory.write_table``).
+        """
+        SyllableInventory.write_table(path, self.syllable_table())
@@ -0,0 +1,269 @@
+"""
+Applies tone sandhi rules to sequences of syllables, e.g. polysyllabic words.
+
+Rules rewrite the tones of windows of consecutive syllables,
+and are applied left to right: at each syllable in turn, the first rule
+matching the tones from there on, as already rewritten, rewrites them.
+The result for each window of tones is looked up in a table,
+filled as windows are seen, so that applying rules takes linear time
+and the table is bounded by the number of possible windows of tones.
+"""
+
+from collections import deque
+from dataclasses import dataclass
+from typing import (
+    Deque,
+    Dict,
+    Iterable,
+    Iterator,
+    Optional,
+    Sequence,
+    Tuple,
+    Union,
+    overload,
+)
+
+from ..phonetics.ipa_utils import IPAString
+from ..utils import PrettyClass
+from .syllable import Syllable, Tone
+
+WindowKey = Tuple[bool, bool, Tuple[Tone, ...]]
+"""
+Whether a window is at the start of a sequence, whether it reaches its end,
+and its tones.
+"""
+
+WindowResult = Optional[Tuple[int, Tuple[Tone, ...]]]
+"""
+The number of tones rewritten by the first rule matching a window,
+and their sandhi tones.
+"""
+
+
+class SyllableSequence(PrettyClass, Sequence[Syllable]):
+    """
+    吳：音節串
+
+    An immutable sequence of syllables, e.g. a polysyllabic word.
+    """
+
+    def __init__(self, syllables: Iterable[Syllable] = ()) -> None:
+        self.syllables: Tuple[Syllable, ...] = tuple(syllables)
+
+    def __str__(self) -> str:
+        return ".".join(str(syllable) for syllable in self.syllables)
+
+    def __len__(self) -> int:
+        return len(self.syllables)
+
+    @overload
+    def __getitem__(self, i: int) -> Syllable:
+        ...
+
+    @overload
+    def __getitem__(self, i: slice) -> "SyllableSequence":
+        ...
+
+    def __getitem__(self, i: Union[int, slice]) -> Union[Syllable, "SyllableSequence"]:
+        if isinstance(i, slice):
+            return type(self)(self.syllables[i])
+        return self.syllables[i]
+
+    def __iter__(self) -> Iterator[Syllable]:
+        return iter(self.syllables)
+
+    def __eq__(self, other) -> bool:
+        if not isinstance(other, SyllableSequence):
+            return NotImplemented
+        return self.syllables == other.syllables
+
+    def __hash__(self) -> int:
+        return hash((type(self).__name__, self.syllables))
+
+    @property
+    def tones(self) -> Tuple[Tone, ...]:
+        """Returns the tones of the syllables."""
+        return tuple(syllable.tone for syllable in self.syllables)
+
+    @property
+    def ipa_str(self) -> IPAString:
+        """Returns the IPA string of the syllables, without separators."""
+        ipa_str = IPAString()
+        for syllable in self.syllables:
+            ipa_str += syllable.ipa_str
+        return ipa_str
+
+
+@dataclass(repr=False, frozen=True)
+class ToneSandhiRule(PrettyClass):
+    """
+    吳：連讀變調規則
+
+    Rewrites the tones of consecutive syllables matching ``tones``
+    into ``sandhi_tones``. ``None`` in ``tones`` matches any tone,
+    and ``None`` in ``sandhi_tones`` keeps the tone.
+    A rule can be restricted to the start or the end of a sequence,
+    e.g. so that Wu words take the tones spread from their first syllable.
+    """
+
+    tones: Tuple[Optional[Tone], ...]
+    sandhi_tones: Tuple[Optional[Tone], ...]
+    word_initial: bool = False
+    """Whether the rule only matches at the start of a sequence."""
+    word_final: bool = False
+    """Whether the rule only matches at the end of a sequence."""
+
+    def __post_init__(self) -> None:
+        if not self.tones or len(self.tones) != len(self.sandhi_tones):
+            raise ValueError(
+                "A tone sandhi rule must rewrite as many tones as it matches"
+            )
+
+    def __str__(self) -> str:
+        def tones_str(tones: Sequence[Optional[Tone]]) -> str:
+            return ".".join("_" if tone is None else str(tone) for tone in tones)
+
+        return (
+            f"{'#' if self.word_initial else ''}{tones_str(self.tones)}"
+            f"{'#' if self.word_final else ''} -> {tones_str(self.sandhi_tones)}"
+        )
+
+    def matches(self, key: WindowKey) -> bool:
+        """Returns whether the rule matches the start of a window."""
+        at_start, at_end, window = key
+        length = len(self.tones)
+        if length > len(window) or (self.word_initial and not at_start):
+            return False
+        if self.word_final and not (at_end and length == len(window)):
+            return False
+        return all(
+            tone is None or tone == window_tone
+            for tone, window_tone in zip(self.tones, window)
+        )
+
+    def rewrite(self, window: Sequence[Tone]) -> Tuple[Tone, ...]:
+        """Returns the sandhi tones of the start of a window matched by the rule."""
+        return tuple(
+            window_tone if tone is None else tone
+            for tone, window_tone in zip(self.sandhi_tones, window)
+        )
+
+
+class ToneSandhi(PrettyClass):
+    """
+    吳：連讀變調
+
+    Applies tone sandhi rules left to right to sequences of syllables,
+    word by word with ``apply_many``, or over a stream of syllables
+    with ``apply_stream``, in memory bounded by the longest rule.
+    """
+
+    def __init__(self, rules: Iterable[ToneSandhiRule]) -> None:
+        self.rules: Tuple[ToneSandhiRule, ...] = tuple(rules)
+        # the number of tones looked up at a time, i.e. the length of the longest rule
+        self.window_size = max((len(rule.tones) for rule in self.rules), default=0)
+        self._table: Dict[WindowKey, WindowResult] = {}
+        self._sequences: Dict[Tuple[Tone, ...], Tuple[Tone, ...]] = {}
+        self._retoned: Dict[Tuple[Syllable, Tone], Syllable] = {}
+
+    def __str__(self) -> str:
+        return "; ".join(map(str, self.rules))
+
+    @property
+    def table_size(self) -> int:
+        """How many windows and short sequences of tones are in the lookup tables."""
+        return len(self._table) + len(self._sequences)
+
+    def _lookup(self, key: WindowKey) -> WindowResult:
+        try:
+            return self._table[key]
+        except KeyError:
+            pass
+        result: WindowResult = None
+        for rule in self.rules:
+            if rule.matches(key):
+                result = len(rule.tones), rule.rewrite(key[2])
+                break
+        self._table[key] = result
+        return result
+
+    def sandhi_tones(self, tones: Sequence[Tone]) -> Tuple[Tone, ...]:
+        """Returns the tones of a sequence of syllables after tone sandhi."""
+        key = tuple(tones)
+        n, size = len(key), self.window_size
+        # sequences no longer than a window, e.g. most words, are looked up whole
+        if n <= size:
+            cached = self._sequences.get(key)
+            if cached is not None:
+                return cached
+        sandhi_tones = list(key)
+        for i in range(n):
+            end = min(i + size, n)
+            result = self._lookup((i == 0, end == n, tuple(sandhi_tones[i:end])))
+            if result is not None:
+                length, rewritten = result
+                sandhi_tones[i : i + length] = rewritten
+        if n <= size:
+            self._sequences[key] = tuple(sandhi_tones)
+        return tuple(sandhi_tones)
+
+    def _retone(self, syllable: Syllable, tone: Tone) -> Syllable:
+        if syllable.tone is tone:
+            return syllable
+        key = (syllable, tone)
+        retoned = self._retoned.get(key)
+        if retoned is None:
+            retoned = self._retoned[key] = Syllable(
+                syllable.initial, syllable.final, tone
+            )
+        return retoned
+
+    def apply(self, syllables: Iterable[Syllable]) -> SyllableSequence:
+        """Returns a sequence of syllables, e.g. a word, after tone sandhi."""
+        syllables = tuple(syllables)
+        sandhi_tones = self.sandhi_tones([syllable.tone for syllable in syllables])
+        retone = self._retone
+        return SyllableSequence(
+            [retone(syllable, tone) for syllable, tone in zip(syllables, sandhi_tones)]
+        )
+
+    def apply_many(
+        self, words: Iterable[Iterable[Syllable]]
+    ) -> Iterator[SyllableSequence]:
+        """
+        Lazily applies tone sandhi to each word of a tokenized corpus,
+        so that inputs of any size can be streamed through.
+        """
+        for word in words:
+            yield self.apply(word)
+
+    def apply_stream(self, syllables: Iterable[Syllable]) -> Iterator[Syllable]:
+        """
+        Lazily applies tone sandhi over a stream of syllables taken as
+        one sequence, with a sliding window of ``window_size`` syllables.
+        A syllable is yielded as soon as no rule can rewrite it any more.
+        """
+        size = self.window_size
+        buffer: Deque[Syllable] = deque()
+        tones: Deque[Tone] = deque()
+        at_start = True
+
+        def step(at_end: bool) -> Syllable:
+            nonlocal at_start
+            window = tuple(tones)[:size]
+            result = self._lookup((at_start, at_end, window))
+            if result is not None:
+                length, sandhi_tones = result
+                for k in range(length):
+                    tones[k] = sandhi_tones[k]
+            at_start = False
+            return self._retone(buffer.popleft(), tones.popleft())
+
+        for syllable in syllables:
+            buffer.append(syllable)
+            tones.append(syllable.tone)
+            # one more syllable than the window tells whether it reaches the end
+            if len(buffer) > size:
+                yield step(False)
+        while buffer:
+            yield step(True)
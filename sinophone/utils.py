@@ -1,7 +1,8 @@
 import sys
 import warnings
+from dataclasses import dataclass, fields
 from inspect import getdoc
-from typing import AbstractSet, Any, FrozenSet, List
+from typing import AbstractSet, Any, Callable, Dict, FrozenSet, Hashable, List, Optional
 
 from .options import AnsiColors, LanguageCode, options
 
@@ -19,9 +20,125 @@ class PostInitCaller(type):
         return obj
 
 
+@dataclass(frozen=True)
+class InternPoolStats(object):
+    """Statistics of an ``InternPool``."""
+
+    size: int
+    """Number of distinct instances in the pool."""
+    hits: int
+    """Number of constructions answered with an existing instance."""
+    misses: int
+    """Number of constructions that added a new instance to the pool."""
+
+    @property
+    def hit_rate(self) -> float:
+        """Ratio of hits to all constructions."""
+        lookups = self.hits + self.misses
+        return self.hits / lookups if lookups else 0.0
+
+
+class InternPool(object):
+    """
+    A process-wide pool of immutable flyweight instances.
+
+    Instances are looked up by the arguments they are constructed with
+    (``aliases``), and by their canonical key once constructed (``instances``),
+    so that differently spelled but equivalent constructions share one instance.
+    """
+
+    def __init__(self) -> None:
+        self.instances: Dict[Hashable, Any] = {}
+        self.aliases: Dict[Hashable, Any] = {}
+        self.hits = 0
+        self.misses = 0
+        self._clear_callbacks: List[Callable[[], None]] = []
+
+    def __len__(self) -> int:
+        return len(self.instances)
+
+    def stats(self) -> InternPoolStats:
+        """Returns the size and hit rate of the pool."""
+        return InternPoolStats(len(self.instances), self.hits, self.misses)
+
+    def on_clear(self, callback: Callable[[], None]) -> None:
+        """
+        Registers a function called by ``clear``,
+        e.g. to drop other caches of instances of the pool.
+        """
+        self._clear_callbacks.append(callback)
+
+    def clear(self) -> None:
+        """Forgets all interned instances and resets the counters."""
+        self.instances.clear()
+        self.aliases.clear()
+        self.hits = 0
+        self.misses = 0
+        for callback in self._clear_callbacks:
+            callback()
+
+
+class Interned(type):
+    """
+    Intern instances of a class in its ``intern_pool``.
+
+    Classes using this metaclass define ``intern_pool``,
+    the classmethod ``_intern_call_key``, which returns a hashable key
+    for the constructor arguments (or ``None`` if they cannot be hashed),
+    and the method ``_intern_canonical_key``, which returns a hashable key
+    for a constructed instance. ``_freeze`` is called on every new instance
+    before it is added to the pool.
+    """
+
+    def __call__(cls, *args, **kwargs) -> Any:
+        pool: InternPool = cls.intern_pool  # type: ignore
+        call_key = cls._intern_call_key(*args, **kwargs)  # type: ignore
+        if call_key is not None:
+            obj = pool.aliases.get(call_key)
+            if obj is not None:
+                pool.hits += 1
+                return obj
+
+        obj = super().__call__(*args, **kwargs)
+        canonical_key = obj._intern_canonical_key()
+        interned = pool.instances.get(canonical_key)
+        if interned is None:
+            pool.misses += 1
+            obj._freeze()
+            interned = pool.instances[canonical_key] = obj
+        else:
+            pool.hits += 1
+
+        if call_key is not None:
+            pool.aliases[call_key] = interned
+        return interned
+
+
+def add_slots(cls: type) -> type:
+    """
+    Recreates a dataclass with ``__slots__`` for its fields,
+    like ``dataclass(slots=True)`` in Python 3.10+.
+
+    Methods of the class must not use ``super()`` without arguments,
+    as they would refer to the original class.
+    """
+    field_names = tuple(f.name for f in fields(cls))
+    cls_dict = dict(cls.__dict__)
+    cls_dict["__slots__"] = field_names
+    for name in field_names:
+        cls_dict.pop(name, None)
+    cls_dict.pop("__dict__", None)
+    cls_dict.pop("__weakref__", None)
+    new_cls = type(cls)(cls.__name__, cls.__bases__, cls_dict)
+    new_cls.__qualname__ = cls.__qualname__
+    return new_cls
+
+
 class PrettyClass(object):
     """This class is pretty when printed."""
 
+    __slots__ = ()
+
     def __repr__(self) -> str:
         OPEN_DELIMS = "([{'\""
         FALLBACK_DELIMS = ["'", '"']
@@ -90,6 +207,100 @@ class PrettyClass(object):
         return type(self).__name__  # pragma: no cover
 
 
+def _notify_on_change(cls: type, base: type, method_names: List[str]) -> type:
+    def wrap(method_name: str) -> Callable:
+        method = getattr(base, method_name)
+
+        def wrapper(self, *args, **kwargs):
+            result = method(self, *args, **kwargs)
+            if self.on_change is not None:
+                self.on_change()
+            return result
+
+        wrapper.__name__ = method_name
+        wrapper.__doc__ = method.__doc__
+        return wrapper
+
+    for method_name in method_names:
+        setattr(cls, method_name, wrap(method_name))
+    return cls
+
+
+class ObservedSet(set):
+    """A ``set`` that calls ``on_change`` after it is modified."""
+
+    def __init__(self, iterable=(), on_change: Optional[Callable[[], None]] = None):
+        super().__init__(iterable)
+        self.on_change = on_change
+
+    def __reduce__(self):
+        # copied and pickled without ``on_change``, which its owner re-binds
+        return (set, (list(self),))
+
+
+class ObservedList(list):
+    """A ``list`` that calls ``on_change`` after it is modified."""
+
+    def __init__(self, iterable=(), on_change: Optional[Callable[[], None]] = None):
+        super().__init__(iterable)
+        self.on_change = on_change
+
+    def __reduce__(self):
+        # copied and pickled without ``on_change``, which its owner re-binds
+        return (list, (list(self),))
+
+
+_notify_on_change(
+    ObservedSet,
+    set,
+    [
+        "add",
+        "clear",
+        "discard",
+        "pop",
+        "remove",
+        "update",
+        "difference_update",
+        "intersection_update",
+        "symmetric_difference_update",
+        "__iand__",
+        "__ior__",
+        "__isub__",
+        "__ixor__",
+    ],
+)
+_notify_on_change(
+    ObservedList,
+    list,
+    [
+        "append",
+        "clear",
+        "extend",
+        "insert",
+        "pop",
+        "remove",
+        "reverse",
+        "sort",
+        "__delitem__",
+        "__iadd__",
+        "__imul__",
+        "__setitem__",
+    ],
+)
+
+
+def observed(value: Any, on_change: Callable[[], None]) -> Any:
+    """
+    Wraps a ``set`` or ``list`` so that ``on_change`` is called after it is
+    modified. Other (e.g. immutable) values are returned as is.
+    """
+    if isinstance(value, set):
+        return ObservedSet(value, on_change)
+    if isinstance(value, list):
+        return ObservedList(value, on_change)
+    return value
+
+
 class SinophoneWarning(Warning):
     ...
 
@@ -106,6 +317,35 @@ def obj_to_mro_chain_names(obj: object) -> List[str]:
     return [cls.__name__ for cls in type(obj).__mro__]
 
 
+_TYPE_CAPABILITIES: Dict[type, FrozenSet[str]] = {}
+
+
+def type_capabilities(cls: type) -> FrozenSet[str]:
+    """
+    Returns the capability tags of a class,
+    i.e. the names of the classes in its MRO, computed once per class.
+
+    Checking class names instead of ``isinstance`` also accepts
+    the ``ipapy`` classes that the classes of this package are named after.
+    """
+    try:
+        return _TYPE_CAPABILITIES[cls]
+    except KeyError:
+        capabilities = _TYPE_CAPABILITIES[cls] = frozenset(
+            base.__name__ for base in cls.__mro__
+        )
+        return capabilities
+
+
+def has_capability(obj: object, capability: str) -> bool:
+    """Returns whether ``capability`` is a capability tag of the class of ``obj``."""
+    cls = type(obj)
+    capabilities = _TYPE_CAPABILITIES.get(cls)
+    if capabilities is None:
+        capabilities = type_capabilities(cls)
+    return capability in capabilities
+
+
 def sinophone_warning(msg: str) -> None:  # pragma: no cover
     warnings.warn(color_str(msg, "SinophoneWarning"), category=SinophoneWarning)
 
@@ -1,7 +1,13 @@
+from copy import copy, deepcopy
 from itertools import product
+from pickle import dumps, loads
 
+from ipapy.ipachar import variant_to_canonical_string
+
+from sinophone import phonetics
 from sinophone.phonetics import (
     ALL_DESCRIPTORS,
+    IPA_CHAR_POOL,
     IPAConsonant,
     IPADescriptor,
     IPADescriptorGroup,
@@ -11,7 +17,10 @@ from sinophone.phonetics import (
     IPAString,
     IPATone,
     IPAVowel,
+    ipa_utils,
 )
+from sinophone.phonetics.ipa_utils import IPA_TO_ORDER, tokenize_ipa
+from sinophone.utils import InternPoolStats
 
 from .utils import BaseTestCase
 
@@ -60,6 +69,17 @@ class TestIPAChar(BaseTestCase):
             IPAVowel("open back unrounded"), IPAConsonant("voiceless glottal stop")
         )
 
+    def test_cached_canonical_representation(self) -> None:
+        for ipa_char in IPAString("kʰuɑ̃ŋ˥˧"):
+            self.assertEqual(
+                ipa_char._old_canonical_representation,
+                variant_to_canonical_string(ipa_char.descriptors),
+            )
+            self.assertEqual(
+                ipa_char.ipa_order,
+                IPA_TO_ORDER[ipa_char._old_canonical_representation],
+            )
+
     def test_order(self) -> None:
         with self.assertRaises(TypeError):
             IPAConsonant("voiceless velar stop") < "g"
@@ -78,6 +98,74 @@ class TestIPAChar(BaseTestCase):
         )
 
 
+class TestIPACharFeatures(BaseTestCase):
+    def test_has_features(self) -> None:
+        k = IPAConsonant("voiceless velar stop")
+        self.assertTrue(k.has_features(IPAFeatureGroup("+plosive +velar -voiced")))
+        self.assertTrue(k.has_feature(IPAFeature("+stop")))
+        self.assertFalse(k.has_features(IPAFeatureGroup("+plosive +voiced")))
+
+        # labels that are substrings of other labels are not confused
+        u = IPAVowel("close back rounded")
+        self.assertFalse(u.has_features(IPAFeatureGroup("+unrounded")))
+        self.assertFalse(
+            IPAVowel("mid central unrounded").has_feature(IPAFeature("close-mid"))
+        )
+
+    def test_masks(self) -> None:
+        ifg = IPAFeatureGroup("+velar -voiced")
+        present, absent = ifg.masks
+        self.assertEqual(present, IPAFeature("velar").mask)
+        self.assertEqual(absent, IPAFeature("voiced").mask)
+
+        ifg.add(IPAFeature("+plosive"))
+        self.assertEqual(ifg.masks[0], present | IPAFeature("stop").mask)
+        ifg.discard(IPAFeature("-voiced"))
+        self.assertEqual(ifg.masks[1], 0)
+
+
+class TestIPACharPool(BaseTestCase):
+    def test_interned(self) -> None:
+        k = IPAConsonant("voiceless velar plosive")
+        self.assertIs(k, IPAConsonant("voiceless velar plosive"))
+        self.assertIs(k, IPAConsonant("plosive velar voiceless"))
+        self.assertIs(k, IPAString("k")[0])
+        self.assertIs(k, copy(k))
+        self.assertIs(k, deepcopy(k))
+        self.assertIs(k, loads(dumps(k)))
+
+        # spelled differently in canonical_representation
+        self.assertIsNot(k, IPAConsonant("voiceless velar stop"))
+        self.assertEqualAndHashEqual(k, IPAConsonant("voiceless velar stop"))
+
+    def test_immutable(self) -> None:
+        with self.assertRaises(AttributeError):
+            IPAConsonant("voiceless velar plosive").voicing = "voiced"
+
+    def test_stats(self) -> None:
+        IPATone("extra-high-level")
+        stats = IPA_CHAR_POOL.stats()
+        IPATone("extra-high-level")
+        new_stats = IPA_CHAR_POOL.stats()
+
+        self.assertEqual(new_stats.size, stats.size)
+        self.assertEqual(new_stats.hits, stats.hits + 1)
+        self.assertGreater(new_stats.hit_rate, 0)
+        self.assertLessEqual(new_stats.hit_rate, 1)
+
+    def test_stats_of_strings(self) -> None:
+        IPA_CHAR_POOL.clear()
+        for _ in range(1000):
+            IPAString("kɐʔ˥˥")
+        self.assertEqual(IPA_CHAR_POOL.stats(), InternPoolStats(4, 4996, 4))
+
+        # characters cached by the tokenizer are dropped with the pool
+        k = IPAString("k")[0]
+        IPA_CHAR_POOL.clear()
+        self.assertIsNot(IPAString("k")[0], k)
+        self.assertEqual(IPA_CHAR_POOL.stats(), InternPoolStats(1, 0, 1))
+
+
 class TestIPAString(BaseTestCase):
     def test_str(self) -> None:
         self.assertEqual(str(IPAString("kɑ")), "kɑ")
@@ -104,6 +192,29 @@ class TestIPAString(BaseTestCase):
 
         self.assertLess(IPAString("k"), IPAString("kɑ"))
         self.assertLess(IPAString("kɑ"), IPAString("gɑ"))
+        self.assertEqual(
+            IPAString("kɑ").sort_key,
+            tuple(ipa_char.ipa_order for ipa_char in IPAString("kɑ")),
+        )
+
+    def test_tokenize(self) -> None:
+        self.assertEqual(
+            tokenize_ipa("kʰuɑ̃ŋ˥˧"),
+            [
+                IPAConsonant("voiceless velar plosive"),
+                IPADiacritic("aspirated"),
+                IPAVowel("close back rounded vowel"),
+                IPAVowel("open back unrounded vowel"),
+                IPADiacritic("nasalized"),
+                IPAConsonant("voiced velar nasal"),
+                IPATone("extra-high-level"),
+                IPATone("mid-level"),
+            ],
+        )
+        self.assertIs(tokenize_ipa("ŋ")[0], IPAString("ŋ")[0])
+        self.assertEqual(tokenize_ipa(""), [])
+        with self.assertRaises(ValueError):
+            tokenize_ipa("k1")
 
     def test_add(self) -> None:
         with self.assertRaises(TypeError):
@@ -165,6 +276,20 @@ class TestIPADescriptorGroup(BaseTestCase):
         str(ALL_DESCRIPTORS)
         repr(ALL_DESCRIPTORS)
 
+    def test_lazy_tables(self) -> None:
+        self.assertIs(ipa_utils.DG_ALL_DESCRIPTORS, ipa_utils.all_descriptors())
+        self.assertEqual(ALL_DESCRIPTORS, ipa_utils.DG_ALL_DESCRIPTORS)
+        self.assertIs(phonetics.ALL_DESCRIPTORS, ALL_DESCRIPTORS)
+        self.assertIs(phonetics.DG_ALL_DESCRIPTORS, ipa_utils.DG_ALL_DESCRIPTORS)
+        self.assertIs(
+            ipa_utils.LABEL_TO_DESCRIPTOR["stop"],
+            ipa_utils.LABEL_TO_DESCRIPTOR["plosive"],
+        )
+        with self.assertRaises(AttributeError):
+            ipa_utils.NONEXISTENT_TABLE
+        with self.assertRaises(AttributeError):
+            phonetics.NONEXISTENT_TABLE
+
 
 class TestIPAFeature(BaseTestCase):
     def test_eq_hash_pos_neg_init(self) -> None:
@@ -182,6 +307,10 @@ class TestIPAFeature(BaseTestCase):
         for velar_a, velar_b in product(velars, velars):
             self.assertEqualAndHashEqual(velar_a, velar_b)
 
+    def test_alias(self) -> None:
+        self.assertEqualAndHashEqual(IPAFeature("-stp"), IPAFeature("-plosive"))
+        self.assertEqual(str(IPAFeature("vcd")), "+voiced")
+
     def test_order(self) -> None:
         with self.assertRaises(TypeError):
             IPAFeature("-velar") < "+velar"
@@ -223,6 +352,16 @@ class TestIPAFeatureGroup(BaseTestCase):
         with self.assertRaises(TypeError):
             IPAFeatureGroup("-velar") | "+velar"
 
+    def test_parse_cache(self) -> None:
+        ifg1 = IPAFeatureGroup("-nasal -lateral-approximant +voiced")
+        ifg2 = IPAFeatureGroup("-nasal -lateral-approximant +voiced")
+        self.assertEqualAndHashEqual(ifg1, ifg2)
+
+        ifg1.discard(IPAFeature("+voiced"))
+        self.assertNotEqualAndHashNotEqual(ifg1, ifg2)
+        self.assertEqual(len(ifg2), 3)
+        self.assertNotEqual(ifg1.masks, ifg2.masks)
+
     def test_order(self):
         with self.assertRaises(TypeError):
             IPAFeatureGroup("-velar") < "+velar"
@@ -1,32 +1,74 @@
+import gc
+import warnings
+from copy import copy, deepcopy
 from itertools import combinations, product
+from os import path
+from pickle import dumps, loads
+from tempfile import TemporaryDirectory
 
 from sinophone import options
 from sinophone.phonetics import IPAConsonant, IPAFeatureGroup, IPAString
 from sinophone.phonology import (
     Coda,
+    FeatureDAG,
     Final,
     Initial,
     Medial,
     Nucleus,
     PhonologicalRule,
     Phonology,
+    PhonologyGenerator,
     PhonotacticAcceptability,
     PhonotacticConstraint,
+    RenderPlan,
     Syllable,
     SyllableFeatures,
     SyllableInPhonology,
+    SyllableInventory,
+    SyllableParser,
+    SyllableSequence,
+    SyllableTable,
     Tone,
+    ToneSandhi,
+    ToneSandhiRule,
 )
+from sinophone.phonology.phonology import pattern_slots
+from sinophone.phonology.syllable import sort_key
+from sinophone.utils import SinophoneWarning
 
 from .utils import BaseTestCase
 
 
+def has_lateral_initial(syllable: Syllable) -> bool:
+    # a syllable pattern that can be pickled, but not serialized by ``dumps``
+    return syllable.initial == Initial("l")
+
+
 class TestSyllableComponent(BaseTestCase):
     def test_order(self) -> None:
         with self.assertRaises(TypeError):
             Initial("k") < "k"
         self.assertLess(Initial("k"), Medial("k"))
 
+    def test_sort_key(self) -> None:
+        kuaq = Syllable(
+            Initial("k"), Final(Medial("ʷ"), Nucleus("ɐ"), Coda("ʔ")), Tone("˥˥")
+        )
+        ko = Syllable(Initial("k"), Final(nucleus=Nucleus("o")), Tone("˨˧"))
+        self.assertEqual(
+            kuaq.sort_key,
+            (
+                kuaq.component_order,
+                tuple(ipa_char.ipa_order for ipa_char in kuaq.ipa_str),
+            ),
+        )
+        self.assertIs(kuaq.sort_key, kuaq.sort_key)
+        self.assertEqual(kuaq.final.sort_key[1], kuaq.final.ipa_str.sort_key)
+        self.assertEqual(
+            sorted([ko, kuaq], key=sort_key),
+            sorted([ko, kuaq], key=lambda syllable: tuple(syllable.ipa_str)),
+        )
+
     def test_has_features(self) -> None:
         self.assertTrue(Coda("k").has_features(IPAFeatureGroup("voiceless velar stop")))
         self.assertFalse(Coda("k").has_features(IPAFeatureGroup("-voiceless")))
@@ -93,6 +135,41 @@ class TestBranchSyllableComponent(BaseTestCase):
             k.ipa_chars[0], IPAConsonant("voiceless velar stop")
         )
 
+    def test_immutable_interned(self) -> None:
+        uaq = Final(Medial("ʷ"), Nucleus("ɐ"), Coda("ʔ"))
+        kuaq = Syllable(Initial("k"), uaq, Tone("˥˥"))
+
+        self.assertIs(Initial("k"), Initial(IPAString("k")))
+        self.assertIs(
+            uaq, Final(medial=Medial("ʷ"), nucleus=Nucleus("ɐ"), coda=Coda("ʔ"))
+        )
+        self.assertIsNot(Initial("k"), Coda("k"))
+        self.assertFalse(hasattr(kuaq, "__dict__"))
+
+        with self.assertRaises(AttributeError):
+            kuaq.initial = Initial("p")
+        with self.assertRaises(AttributeError):
+            uaq.nucleus = Nucleus("a")
+        with self.assertRaises(AttributeError):
+            uaq.phonetic_ipa_str = IPAString("ua")
+
+        self.assertIs(deepcopy(uaq), uaq)
+        self.assertIs(loads(dumps(kuaq)).final, uaq)
+        self.assertEqualAndHashEqual(deepcopy(kuaq), kuaq)
+
+    def test_cached_hash(self) -> None:
+        kuaq = Syllable(
+            Initial("k"), Final(Medial("ʷ"), Nucleus("ɐ"), Coda("ʔ")), Tone("˥˥")
+        )
+        self.assertEqual(
+            hash(kuaq), hash(("Syllable", (kuaq.initial, kuaq.final, kuaq.tone)))
+        )
+        self.assertEqual(kuaq._hash, hash(kuaq))
+
+        rendered = SyllableInPhonology.from_syllable(kuaq)
+        self.assertEqualAndHashEqual(rendered.final, kuaq.final)
+        self.assertNotEqual(rendered, kuaq)
+
 
 class TestTone(BaseTestCase):
     def test_validate(self) -> None:
@@ -251,6 +328,29 @@ class TestPhonologicalRule(BaseTestCase):
         lon.acceptability = PhonotacticAcceptability(True, False)
         self.assertEqualAndHashEqual(lon.acceptability, pr.apply(lon).acceptability)
 
+    def test_apply_shares_components(self) -> None:
+        sf = SyllableFeatures({"Final": {IPAFeatureGroup("+nasal")}})
+        pr = PhonologicalRule(Nucleus("o"), IPAString("ʊ̃"), sf)
+        lon = Syllable(
+            Initial("l"), Final(nucleus=Nucleus("o"), coda=Coda("ŋ")), Tone("˨˧")
+        )
+
+        rendered = pr.apply(lon)
+        self.assertIs(rendered.final, lon.final)
+        self.assertEqualAndHashEqual(lon.phonetic_ipa_str, IPAString("loŋ˨˧"))
+        self.assertEqualAndHashEqual(
+            rendered.phonetic_ipa_str_of(rendered.final.nucleus), IPAString("ʊ̃")
+        )
+        self.assertEqualAndHashEqual(
+            rendered.phonetic_ipa_str_of(rendered.final), IPAString("ʊ̃ŋ")
+        )
+
+        rendered.phonetic_ipa_str = IPAString("lɔ̃˨˧")
+        self.assertEqualAndHashEqual(rendered.phonetic_ipa_str, IPAString("lɔ̃˨˧"))
+        self.assertEqualAndHashEqual(
+            pr.apply(rendered).phonetic_ipa_str, IPAString("lɔ̃˨˧")
+        )
+
 
 class TestPhonology(BaseTestCase):
     def test_phonology(self) -> None:
@@ -338,3 +438,859 @@ class TestPhonology(BaseTestCase):
 
         options.color = True
         phonology.pretty_print_syllable(kuaq)
+
+    def test_render_cache(self) -> None:
+        pr = PhonologicalRule(
+            Nucleus("o"),
+            IPAString("ʊ̃"),
+            SyllableFeatures({"Final": {IPAFeatureGroup("+nasal")}}),
+        )
+        lon = Syllable(
+            Initial("l"), Final(nucleus=Nucleus("o"), coda=Coda("ŋ")), Tone("˨˧")
+        )
+        bo = Syllable(Initial("b"), Final(nucleus=Nucleus("o")), Tone("˨˧"))
+        phonology = Phonology(syllables={bo, lon}, render_cache_size=2)
+        phonology.clear_render_cache()
+
+        self.assertEqual(str(phonology.render_syllable(lon).phonetic_ipa_str), "loŋ˨˧")
+        self.assertIs(phonology.render_syllable(lon), phonology.render_syllable(lon))
+        info = phonology.render_cache_info
+        self.assertEqual((info.hits, info.misses, info.size), (2, 1, 1))
+
+        version = phonology.rules_version
+        phonology.phonological_rules.append(pr)  # type: ignore
+        self.assertGreater(phonology.rules_version, version)
+        self.assertEqual(str(phonology.render_syllable(lon).phonetic_ipa_str), "lʊ̃ŋ˨˧")
+
+        phonology.render_syllable(bo)
+        phonology.render_syllable(Syllable(Initial("l"), Final(nucleus=Nucleus("o"))))
+        self.assertEqual(phonology.render_cache_info.evictions, 1)
+        self.assertEqual(phonology.render_cache_info.size, 2)
+
+        phonology.phonological_rules = []
+        self.assertEqual(str(phonology.render_syllable(lon).phonetic_ipa_str), "loŋ˨˧")
+
+    def test_incremental(self) -> None:
+        pc = PhonotacticConstraint(
+            SyllableFeatures(
+                {
+                    "Initial": {IPAFeatureGroup("+stop +voiced")},
+                    "Tone": {IPAFeatureGroup("+extra-high-level")},
+                }
+            ),
+            PhonotacticAcceptability(False, False),
+        )
+        pr = PhonologicalRule(
+            Nucleus("o"),
+            IPAString("ʊ̃"),
+            SyllableFeatures({"Final": {IPAFeatureGroup("+nasal")}}),
+        )
+        kuaq = Syllable(
+            Initial("k"), Final(Medial("ʷ"), Nucleus("ɐ"), Coda("ʔ")), Tone("˥˥")
+        )
+        lon = Syllable(
+            Initial("l"), Final(nucleus=Nucleus("o"), coda=Coda("ŋ")), Tone("˨˧")
+        )
+        bon = Syllable(
+            Initial("b"), Final(nucleus=Nucleus("o"), coda=Coda("ŋ")), Tone("˥˥")
+        )
+        phonology = Phonology(syllables={kuaq, lon})
+
+        self.assertEqual(phonology.syllables_containing(Nucleus("o")), {lon})
+        self.assertEqual(phonology.syllables_matching(pc.syllable_pattern), set())
+
+        phonology.add_syllable(bon)
+        phonology.add_phonotactic_constraint(pc)
+        phonology.add_phonological_rule(pr)
+        self.assertEqual(phonology.syllables_matching(pc.syllable_pattern), {bon})
+        incremental = [
+            (s.phonetic_ipa_str, s.acceptability) for s in phonology.rendered_syllables
+        ]
+        phonology.refresh()
+        self.assertEqual(
+            incremental,
+            [
+                (s.phonetic_ipa_str, s.acceptability)
+                for s in phonology.rendered_syllables
+            ],
+        )
+        self.assertIn(Initial("b"), phonology.initials)
+
+        phonology.discard_phonotactic_constraint(pc)
+        phonology.remove_phonological_rule(pr)
+        phonology.discard_syllable(kuaq)
+        self.assertEqual(
+            [str(s.phonetic_ipa_str) for s in phonology.rendered_syllables],
+            ["boŋ˥˥", "loŋ˨˧"],
+        )
+        self.assertEqual(
+            {s.acceptability for s in phonology.rendered_syllables},
+            {PhonotacticAcceptability(True, True)},
+        )
+        self.assertEqual(phonology.syllables_containing(Coda("ʔ")), set())
+
+        # patterns other than ``SyllableFeatures`` may read the acceptability
+        existent_high = PhonotacticConstraint(
+            lambda s: s.acceptability.existent and s.tone == Tone("˥˥"),  # type: ignore
+            PhonotacticAcceptability(True, False),
+        )
+        phonology.add_phonotactic_constraint(existent_high)
+        self.assertEqual(
+            phonology.syllables_matching(existent_high.syllable_pattern), {bon}
+        )
+        self.assertEqual(
+            [s.acceptability for s in phonology.rendered_syllables],
+            [
+                PhonotacticAcceptability(True, False),
+                PhonotacticAcceptability(True, True),
+            ],
+        )
+        phonology.discard_phonotactic_constraint(existent_high)
+        self.assertEqual(
+            {s.acceptability for s in phonology.rendered_syllables},
+            {PhonotacticAcceptability(True, True)},
+        )
+
+
+class TestSerialization(BaseTestCase):
+    def test_dumps_loads(self) -> None:
+        pc = PhonotacticConstraint(
+            SyllableFeatures(
+                {
+                    "Initial": {IPAFeatureGroup("+stop +voiced")},
+                    "Tone": {IPAFeatureGroup("+extra-high-level")},
+                }
+            ),
+            PhonotacticAcceptability(False, False),
+        )
+        pr = PhonologicalRule(
+            Final(nucleus=Nucleus("o"), coda=Coda("ŋ")),
+            IPAString("ʊ̃"),
+            SyllableFeatures({"Final": {IPAFeatureGroup("+nasal")}}),
+        )
+        kuaq = Syllable(
+            Initial("k"), Final(Medial("ʷ"), Nucleus("ɐ"), Coda("ʔ")), Tone("˥˥")
+        )
+        lon = Syllable(
+            Initial("l"), Final(nucleus=Nucleus("o"), coda=Coda("ŋ")), Tone("˨˧")
+        )
+        phonology = Phonology(
+            syllables={kuaq, lon},
+            phonotactics={pc},
+            phonological_rules=[pr],
+            phonetic_str=False,
+        )
+
+        data = phonology.dumps()
+        self.assertEqual(Phonology.loads(data), phonology)
+        self.assertEqual(Phonology.loads(data).dumps(), data)
+        self.assertEqual(
+            [s.phonetic_ipa_str for s in Phonology.loads(data).rendered_syllables],
+            [s.phonetic_ipa_str for s in phonology.rendered_syllables],
+        )
+        self.assertEqual(loads(dumps(phonology)), phonology)
+        self.assertEqual(deepcopy(phonology), phonology)
+
+        with self.assertRaises(ValueError):
+            Phonology.loads(data.replace('"version":1', '"version":100'))
+
+        phonology.add_phonotactic_constraint(
+            PhonotacticConstraint(
+                lambda syllable: True, PhonotacticAcceptability(True, False)
+            )
+        )
+        with self.assertRaises(TypeError):
+            phonology.dumps()
+
+    def test_copy(self) -> None:
+        kuaq = Syllable(
+            Initial("k"), Final(Medial("ʷ"), Nucleus("ɐ"), Coda("ʔ")), Tone("˥˥")
+        )
+        lon = Syllable(
+            Initial("l"), Final(nucleus=Nucleus("o"), coda=Coda("ŋ")), Tone("˨˧")
+        )
+        pc = PhonotacticConstraint(
+            SyllableFeatures({"Initial": {IPAFeatureGroup("+lateral-approximant")}}),
+            PhonotacticAcceptability(False, False),
+        )
+        pr = PhonologicalRule(Nucleus("o"), IPAString("ʊ"), has_lateral_initial)
+        for patterns in ([], [pr]):  # serializable by ``dumps`` or not
+            phonology = Phonology(
+                syllables={kuaq, lon}, phonological_rules=list(patterns)
+            )
+            for copied in (copy(phonology), deepcopy(phonology)):
+                self.assertEqual(copied, phonology)
+                self.assertTrue(copied.render_syllable(lon).acceptability.existent)
+                copied.phonotactics.add(pc)
+                self.assertFalse(copied.render_syllable(lon).acceptability.existent)
+                self.assertTrue(phonology.render_syllable(lon).acceptability.existent)
+                copied.phonological_rules.clear()  # type: ignore
+                self.assertEqual(
+                    str(copied.render_syllable(lon).phonetic_ipa_str), "loŋ˨˧"
+                )
+            self.assertEqual(
+                str(phonology.render_syllable(lon).phonetic_ipa_str),
+                "lʊŋ˨˧" if patterns else "loŋ˨˧",
+            )
+
+    def test_pickle(self) -> None:
+        lon = Syllable(
+            Initial("l"), Final(nucleus=Nucleus("o"), coda=Coda("ŋ")), Tone("˨˧")
+        )
+        pc = PhonotacticConstraint(
+            SyllableFeatures({"Initial": {IPAFeatureGroup("+lateral-approximant")}}),
+            PhonotacticAcceptability(False, False),
+        )
+        pr = PhonologicalRule(Nucleus("o"), IPAString("ʊ"), has_lateral_initial)
+        for patterns in ([], [pr]):  # pickled in the format of ``dumps`` or not
+            phonology = Phonology(syllables={lon}, phonological_rules=list(patterns))
+            pickled = loads(dumps(phonology))
+            self.assertEqual(pickled, phonology)
+            self.assertTrue(pickled.render_syllable(lon).acceptability.existent)
+            pickled.phonotactics.add(pc)
+            self.assertFalse(pickled.render_syllable(lon).acceptability.existent)
+            pickled.phonological_rules.append(
+                PhonologicalRule(Nucleus("o"), IPAString("ɔ"))
+            )
+            self.assertEqual(
+                str(pickled.render_syllable(lon).phonetic_ipa_str), "lɔŋ˨˧"
+            )
+
+
+class TestCollocationGrid(BaseTestCase):
+    def test_grid(self) -> None:
+        pc1 = PhonotacticConstraint(
+            SyllableFeatures(
+                {
+                    "Initial": {IPAFeatureGroup("+stop +voiced")},
+                    "Tone": {IPAFeatureGroup("+extra-high-level")},
+                }
+            ),
+            PhonotacticAcceptability(False, False),
+        )
+        pc2 = PhonotacticConstraint(
+            SyllableFeatures({"Medial": {IPAFeatureGroup("+labialized")}}),
+            PhonotacticAcceptability(False, True),
+        )
+        pc3 = PhonotacticConstraint(
+            lambda syllable: str(syllable.initial) == "l",
+            PhonotacticAcceptability(True, False),
+        )
+        pr = PhonologicalRule(
+            Nucleus("o"),
+            IPAString("ʊ̃"),
+            SyllableFeatures({"Final": {IPAFeatureGroup("+nasal")}}),
+        )
+        phonology = Phonology(
+            syllables={
+                Syllable(
+                    Initial("k"),
+                    Final(Medial("ʷ"), Nucleus("ɐ"), Coda("ʔ")),
+                    Tone("˥˥"),
+                ),
+                Syllable(
+                    Initial("l"),
+                    Final(nucleus=Nucleus("o"), coda=Coda("ŋ")),
+                    Tone("˨˧"),
+                ),
+                Syllable(Initial("b"), Final(nucleus=Nucleus("o")), Tone("˨˧")),
+            },
+            phonotactics={pc1, pc2, pc3},
+            phonological_rules=[pr],
+        )
+
+        grid = phonology.collocation_grid()
+        str(grid)
+        self.assertEqual(len(grid), 18)
+
+        for i, f, t in grid.indices():
+            syllable = grid.syllable(i, f, t)
+            rendered = phonology.render_syllable(syllable)
+            self.assertEqualAndHashEqual(syllable.acceptability, rendered.acceptability)
+            self.assertEqualAndHashEqual(
+                syllable.phonetic_ipa_str, rendered.phonetic_ipa_str
+            )
+
+        pas = [
+            PhonotacticAcceptability(existent, grammatical)
+            for existent, grammatical in product([False, True], [False, True])
+        ]
+        self.assertEqual(sum(grid.count(pa) for pa in pas), grid.count())
+        for pa in pas:
+            self.assertEqual(grid.count(pa), len(list(grid.indices(pa))))
+            for syllable in (grid.syllable(*indices) for indices in grid.indices(pa)):
+                self.assertEqualAndHashEqual(syllable.acceptability, pa)
+
+    def test_iter_collocations(self) -> None:
+        pc = PhonotacticConstraint(
+            SyllableFeatures(
+                {
+                    "Initial": {IPAFeatureGroup("+stop +voiced")},
+                    "Tone": {IPAFeatureGroup("+extra-high-level")},
+                }
+            ),
+            PhonotacticAcceptability(False, True),
+        )
+        phonology = Phonology(
+            syllables={
+                Syllable(Initial("k"), Final(nucleus=Nucleus("ɐ")), Tone("˥˥")),
+                Syllable(Initial("g"), Final(nucleus=Nucleus("o")), Tone("˨˧")),
+                Syllable(Initial("b"), Final(nucleus=Nucleus("o")), Tone("˨˧")),
+            },
+            phonotactics={pc},
+        )
+        voiced = SyllableFeatures({"Initial": {IPAFeatureGroup("+voiced")}})
+        pa = PhonotacticAcceptability(False, True)
+
+        expected = sorted(
+            syllable
+            for syllable in phonology.collocations
+            if voiced(syllable) and syllable.acceptability == pa
+        )
+        self.assertEqual(len(expected), 4)
+        self.assertEqual(list(phonology.iter_collocations(voiced, pa)), expected)
+        self.assertEqual(
+            list(phonology.iter_collocations(lambda s: voiced(s), pa)), expected
+        )
+        self.assertEqual(
+            len(list(phonology.iter_collocations(voiced))),
+            len(phonology.collocation_grid(voiced)),
+        )
+
+        self.assertEqual(len(phonology.collocation_grid(voiced).initials), 2)
+        self.assertEqual(next(phonology.iter_collocations(voiced, pa)), expected[0])
+
+
+class TestRenderWorkers(BaseTestCase):
+    def test_render_workers(self) -> None:
+        initials = [Initial(i) for i in "p b m t d n k g ŋ h ɦ".split()]
+        finals = [
+            Final(nucleus=Nucleus(n), coda=Coda(c))
+            for n, c in product("ɐoi", ["", "ŋ"])
+        ]
+        tones = [Tone(t) for t in "˥˥ ˨˧ ˧˦ ˩˧ ˥ ˩˨ ˧ ˦ ˨ ˩˩ ˧˧ ˦˦ ˨˨ ˥˧ ˧˩ ˦˨".split()]
+        pc = PhonotacticConstraint(
+            SyllableFeatures(
+                {
+                    "Initial": {IPAFeatureGroup("+stop +voiced")},
+                    "Tone": {IPAFeatureGroup("+extra-high-level")},
+                }
+            ),
+            PhonotacticAcceptability(False, False),
+        )
+        pr = PhonologicalRule(
+            Nucleus("o"),
+            IPAString("ʊ̃"),
+            SyllableFeatures({"Final": {IPAFeatureGroup("+nasal")}}),
+        )
+        syllables = {
+            Syllable(initial, final, tone)
+            for initial, final, tone in product(initials, finals, tones)
+        }
+        self.assertGreater(len(syllables), 1024)
+
+        serial = Phonology(
+            syllables=set(syllables), phonotactics={pc}, phonological_rules=[pr]
+        )
+        parallel = Phonology(
+            syllables=set(syllables),
+            phonotactics={pc},
+            phonological_rules=[pr],
+            render_workers=2,
+        )
+        self.assertEqual(parallel.render_cache_info.misses, 0)
+        self.assertEqual(parallel.rendered_syllables, serial.rendered_syllables)
+        self.assertEqual(
+            [s.acceptability for s in parallel.rendered_syllables],
+            [s.acceptability for s in serial.rendered_syllables],
+        )
+        self.assertEqual(
+            [s.phonetic_ipa_str for s in parallel.rendered_syllables],
+            [s.phonetic_ipa_str for s in serial.rendered_syllables],
+        )
+        self.assertEqual(
+            {(s, s.acceptability) for s in parallel.collocations},
+            {(s, s.acceptability) for s in serial.collocations},
+        )
+
+        with self.assertWarns(SinophoneWarning):
+            parallel.add_phonotactic_constraint(
+                PhonotacticConstraint(
+                    lambda syllable: syllable.initial == Initial("p"),
+                    PhonotacticAcceptability(False, True),
+                )
+            )
+        with self.assertWarns(SinophoneWarning):
+            parallel.refresh()
+
+
+class TestRenderPlan(BaseTestCase):
+    def test_render(self) -> None:
+        initials = [Initial(i) for i in ["", "p", "b", "m", "k", "g", "ŋ", "h"]]
+        finals = [
+            Final(Medial(m), Nucleus(n), Coda(c))
+            for m, n, c in product(["", "j"], "ɐoa", ["", "ŋ", "ʔ"])
+        ]
+        tones = [Tone(t) for t in ["˥˥", "˨˧", "˥", "˩˨"]]
+        stop_voiced = SyllableFeatures({"Initial": {IPAFeatureGroup("+stop +voiced")}})
+        nasal_final = SyllableFeatures({"Final": {IPAFeatureGroup("+nasal")}})
+        phonotactics = (
+            PhonotacticConstraint(stop_voiced, PhonotacticAcceptability(False, True)),
+            PhonotacticConstraint(stop_voiced, PhonotacticAcceptability(True, False)),
+            PhonotacticConstraint(
+                SyllableFeatures(
+                    {
+                        "Medial": {IPAFeatureGroup("+palatal")},
+                        "Tone": {IPAFeatureGroup("+extra-high-level")},
+                    }
+                ),
+                PhonotacticAcceptability(False, True),
+            ),
+            PhonotacticConstraint(
+                lambda syllable: syllable.tone == Tone("˥"),
+                PhonotacticAcceptability(True, False),
+            ),
+        )
+        phonological_rules = (
+            PhonologicalRule(Nucleus("o"), IPAString("ʊ̃"), nasal_final),
+            PhonologicalRule(Nucleus("o"), IPAString("u"), nasal_final),
+            PhonologicalRule(Nucleus("a"), IPAString("ɑ"), stop_voiced),
+            PhonologicalRule(
+                Coda("ʔ"),
+                IPAString("k"),
+                lambda syllable: syllable.acceptability.grammatical,  # type: ignore
+            ),
+            PhonologicalRule(
+                Final(Medial("j"), Nucleus("ɐ"), Coda("ŋ")),
+                IPAString("iɪŋ"),
+                SyllableFeatures(),
+            ),
+        )
+        plan = RenderPlan(phonotactics, phonological_rules)
+        self.assertEqual(pattern_slots(stop_voiced), (0,))
+        self.assertEqual(pattern_slots(phonotactics[2].syllable_pattern), (1, 2))
+        self.assertIsNone(pattern_slots(phonotactics[3].syllable_pattern))
+
+        for _ in range(2):
+            for initial, final, tone in product(initials, finals, tones):
+                syllable = Syllable(initial, final, tone)
+                expected = SyllableInPhonology.from_syllable(syllable)
+                expected.acceptability = PhonotacticAcceptability(True, True)
+                for constraint in phonotactics:
+                    constraint.apply_in_place(expected)
+                for rule in phonological_rules:
+                    rule.apply_in_place(expected)
+
+                rendered = plan.render(syllable)
+                self.assertEqual(rendered, expected)
+                self.assertEqual(rendered.acceptability, expected.acceptability)
+                self.assertEqual(rendered.phonetic_overlay, expected.phonetic_overlay)
+
+        self.assertEqual(
+            plan.render(Syllable(Initial("b"), finals[4], Tone("˥"))).phonetic_ipa_str,
+            IPAString("buŋ˥"),
+        )
+
+
+class TestFeatureDAG(BaseTestCase):
+    def test_matches_explain(self) -> None:
+        stop = IPAFeatureGroup("+stop")
+        nasal = IPAFeatureGroup("+nasal")
+        high = IPAFeatureGroup("+extra-high-level")
+        patterns = [
+            SyllableFeatures({"Initial": {stop}}),
+            SyllableFeatures({"Initial": {stop}, "Tone": {high}}),
+            SyllableFeatures({"Initial": {stop, nasal}, "Final": {nasal}}),
+            SyllableFeatures({"Coda": {nasal}, "Tone": {high}}),
+            SyllableFeatures({"Initial": {stop}}),
+            SyllableFeatures(),
+        ]
+        dag = FeatureDAG()
+        nodes = [dag.add(pattern) for pattern in patterns]
+        self.assertEqual(nodes, [0, 1, 2, 3, 0, 4])
+        self.assertEqual(len(dag.clauses), 5)
+
+        syllables = [
+            Syllable(Initial(i), Final(nucleus=Nucleus("o"), coda=Coda(c)), Tone(t))
+            for i, c, t in product(["", "p", "m", "h"], ["", "ŋ"], ["˥˥", "˨˧"])
+        ]
+        for syllable, (pattern, node) in product(syllables, zip(patterns, nodes)):
+            self.assertEqual(dag.matches(node, syllable), pattern(syllable))
+            explanation = dag.explain(node, syllable)
+            self.assertEqual(explanation.matched, pattern(syllable))
+            self.assertEqual(
+                all(result.passed for result in explanation.results),
+                explanation.matched,
+            )
+        self.assertLessEqual(dag.tests_evaluated, 4 * 2 + 2 * 2 + 2 * 1)
+
+        explanation = dag.explain(nodes[1], syllables[-1])
+        self.assertFalse(explanation.matched)
+        self.assertEqual(
+            [(str(r.component), r.passed) for r in explanation.results],
+            [("h", False)],
+        )
+        str(explanation)
+        repr(dag)
+
+    def test_phonology_explain(self) -> None:
+        voiced_stop = SyllableFeatures({"Initial": {IPAFeatureGroup("+stop +voiced")}})
+        pc = PhonotacticConstraint(voiced_stop, PhonotacticAcceptability(False, True))
+        pr1 = PhonologicalRule(Nucleus("o"), IPAString("u"), voiced_stop)
+        pr2 = PhonologicalRule(Nucleus("a"), IPAString("ɑ"), voiced_stop)
+        pr3 = PhonologicalRule(
+            Nucleus("o"), IPAString("ʊ"), lambda syllable: syllable.tone == Tone("˥")
+        )
+        syllable = Syllable(Initial("b"), Final(nucleus=Nucleus("o")), Tone("˩˧"))
+        phonology = Phonology(
+            syllables={syllable},
+            phonotactics={pc},
+            phonological_rules=[pr1, pr2, pr3],
+        )
+        explanation = phonology.explain(syllable)
+        self.assertEqual(explanation.syllable, phonology.render_syllable(syllable))
+        self.assertEqual(
+            explanation.syllable.acceptability, PhonotacticAcceptability(False, True)
+        )
+        self.assertEqual(explanation.syllable.phonetic_ipa_str, IPAString("bu˩˧"))
+        self.assertEqual(
+            [(item, e.matched) for item, e in explanation.constraints], [(pc, True)]
+        )
+        self.assertEqual(
+            [(item, e.matched) for item, e in explanation.rules],
+            [(pr1, True), (pr3, False)],
+        )
+        (result,) = explanation.constraints[0][1].results
+        self.assertEqual(result.component, Initial("b"))
+        self.assertEqual(result.matched_features, IPAFeatureGroup("+stop +voiced"))
+        self.assertTrue(str(result).startswith("Initial b has {"))
+        self.assertEqual(explanation.rules[1][1].results, ())
+        str(explanation)
+
+
+class TestSyllableInventory(BaseTestCase):
+    def test_inventory(self) -> None:
+        kuaq = Syllable(
+            Initial("k"), Final(Medial("ʷ"), Nucleus("ɐ"), Coda("ʔ")), Tone("˥˥")
+        )
+        lon = Syllable(
+            Initial("l"), Final(nucleus=Nucleus("o"), coda=Coda("ŋ")), Tone("˨˧")
+        )
+        bo = Syllable(Initial("b"), Final(nucleus=Nucleus("o")), Tone("˨˧"))
+        ka = Syllable(Initial("k"), Final(nucleus=Nucleus("a")), Tone("˨˧"))
+        pr = PhonologicalRule(
+            Nucleus("o"),
+            IPAString("ʊ̃"),
+            SyllableFeatures({"Final": {IPAFeatureGroup("+nasal")}}),
+        )
+        phonology = Phonology(syllables={kuaq, lon, bo}, phonological_rules=[pr])
+
+        with TemporaryDirectory() as directory:
+            file_path = path.join(directory, "wu.syllables")
+            phonology.write_inventory(file_path)
+
+            with SyllableInventory.open(file_path) as inventory:
+                str(inventory)
+                self.assertEqual(len(inventory), 3)
+                self.assertEqual(inventory, {kuaq, lon, bo})
+                self.assertIn(lon, inventory)
+                self.assertNotIn(ka, inventory)
+                self.assertEqual(sorted(inventory), sorted([kuaq, lon, bo]))
+                self.assertEqual(inventory.finals, phonology.finals)
+
+                inventory.add(ka)
+                inventory.discard(bo)
+                self.assertEqual(inventory, {kuaq, lon, ka})
+                self.assertEqual(inventory.initials, {Initial("k"), Initial("l")})
+                self.assertEqual(inventory.finals, {kuaq.final, lon.final, ka.final})
+                self.assertEqual(inventory.tones, {Tone("˥˥"), Tone("˨˧")})
+                inventory.add(bo)
+                self.assertIn(bo, inventory)
+
+            with Phonology.open_inventory(file_path, phonological_rules=[pr]) as lazy:
+                self.assertTrue(lazy._refresh_pending)
+                self.assertEqual(lazy.initials, phonology.initials)
+                self.assertEqual(lazy.finals, phonology.finals)
+                self.assertEqual(lazy.tones, phonology.tones)
+                lazy.add_syllable(ka)
+                self.assertTrue(lazy._refresh_pending)
+                self.assertEqual(
+                    [s.phonetic_ipa_str for s in lazy.rendered_syllables],
+                    [
+                        s.phonetic_ipa_str
+                        for s in sorted(
+                            map(phonology.render_syllable, [kuaq, lon, bo, ka])
+                        )
+                    ],
+                )
+                self.assertFalse(lazy._refresh_pending)
+                self.assertEqual(lazy.syllables_containing(Nucleus("o")), {lon, bo})
+            with self.assertRaises(ValueError):
+                lon in lazy.syllables
+
+            with open(file_path, "wb") as f:
+                f.write(b"not an inventory")
+            with self.assertRaises(ValueError):
+                SyllableInventory.open(file_path)
+
+            open(file_path, "wb").close()
+            with warnings.catch_warnings(record=True) as caught:
+                warnings.simplefilter("always", ResourceWarning)
+                with self.assertRaises(ValueError):
+                    SyllableInventory.open(file_path)
+                gc.collect()
+            # the file opened for the empty inventory is closed, not leaked
+            self.assertFalse(
+                [w for w in caught if issubclass(w.category, ResourceWarning)]
+            )
+
+
+class TestSyllableParser(BaseTestCase):
+    def test_parse(self) -> None:
+        kuaq = Syllable(
+            Initial("k"), Final(Medial("ʷ"), Nucleus("ɐ"), Coda("ʔ")), Tone("˥˥")
+        )
+        ngo = Syllable(Initial("ŋ"), Final(nucleus=Nucleus("o")), Tone("˨˧"))
+        ng = Syllable(Initial(), Final(nucleus=Nucleus("ŋ")), Tone("˨˧"))
+        khaq = Syllable(
+            Initial("kʰ"), Final(nucleus=Nucleus("ɐ"), coda=Coda("ʔ")), Tone("˥˥")
+        )
+        phonology = Phonology(syllables={kuaq, ngo, ng, khaq})
+        parser = phonology.syllable_parser()
+        str(parser)
+
+        self.assertEqual(parser.parse("kʷɐʔ˥˥"), kuaq)
+        self.assertEqual(parser.parse("kʰɐʔ˥˥"), khaq)
+        self.assertEqual(parser.parse("ŋ˨˧"), ng)
+        self.assertEqual(
+            parser.parse("ŋo˥˥"), Syllable(ngo.initial, ngo.final, kuaq.tone)
+        )
+        self.assertIs(parser.parse("kʷɐʔ˥˥"), parser.parse("kʷɐʔ˥˥"))
+        with self.assertRaises(ValueError):
+            parser.parse("kʷɐʔ")
+        with self.assertRaises(ValueError):
+            parser.parse("pɐʔ˥˥")
+
+        stats = parser.stats()
+        self.assertEqual((stats.parsed, stats.failed, stats.cached), (6, 2, 4))
+        self.assertGreater(stats.throughput, 0)
+
+    def test_parse_many(self) -> None:
+        bo = Syllable(Initial("b"), Final(nucleus=Nucleus("o")), Tone("˨˧"))
+        lon = Syllable(
+            Initial("l"), Final(nucleus=Nucleus("o"), coda=Coda("ŋ")), Tone("˨˧")
+        )
+        phonology = Phonology(syllables={bo, lon})
+        transcriptions = iter(["bo˨˧", "x", "loŋ˨˧", "bo˨˧"])
+
+        syllables = phonology.parse_syllables(transcriptions, skip_invalid=True)
+        self.assertEqual(next(syllables), bo)
+        self.assertEqual(list(syllables), [lon, bo])
+
+        parser = SyllableParser(phonology.initials, phonology.finals, phonology.tones)
+        with self.assertRaises(ValueError):
+            list(parser.parse_many(["bo˨˧", "bo"]))
+        self.assertEqual(parser.stats().parsed, 1)
+        parser.reset_stats()
+        self.assertEqual(parser.stats().parsed, 0)
+
+
+class TestSyllableTable(BaseTestCase):
+    def test_table(self) -> None:
+        kuaq = Syllable(
+            Initial("k"), Final(Medial("ʷ"), Nucleus("ɐ"), Coda("ʔ")), Tone("˥˥")
+        )
+        lon = Syllable(
+            Initial("l"), Final(nucleus=Nucleus("o"), coda=Coda("ŋ")), Tone("˨˧")
+        )
+        bo = Syllable(Initial("b"), Final(nucleus=Nucleus("o")), Tone("˨˧"))
+        ka = Syllable(Initial("k"), Final(nucleus=Nucleus("a")), Tone("˨˧"))
+
+        phonology = Phonology(syllables={kuaq, lon, bo})
+        table = phonology.syllable_table()
+        str(table)
+        self.assertEqual(len(table), 3)
+        self.assertIn(lon, table)
+        self.assertNotIn(ka, table)
+        self.assertEqual(table, {kuaq, lon, bo})
+        self.assertEqual(list(table.sorted()), sorted([kuaq, lon, bo]))
+        self.assertEqual(table.sorted()[0], sorted([kuaq, lon, bo])[0])
+
+        other = SyllableTable([ka, lon, lon])
+        self.assertEqual(len(other), 2)
+        self.assertIsNot(other.codebook, table.codebook)
+        self.assertEqual(table & other, {lon})
+        self.assertEqual(table | other, {kuaq, lon, bo, ka})
+        self.assertEqual(table - other, {kuaq, bo})
+        self.assertEqual(table ^ other, {kuaq, bo, ka})
+        self.assertEqual(table - {kuaq}, {lon, bo})
+        self.assertEqual(table, SyllableTable([bo, lon, kuaq]))
+        self.assertEqualAndHashEqual(
+            frozenset(table), frozenset(SyllableTable([bo, lon, kuaq]))
+        )
+
+        ordered = SyllableTable([kuaq, lon, bo])
+        self.assertEqual(list(ordered), [kuaq, lon, bo])
+        self.assertEqual(list(ordered.columns["tone"]), [0, 1, 1])
+        self.assertEqual(list(ordered.columns["nucleus"]), [0, 1, 1])
+
+
+class TestToneSandhi(BaseTestCase):
+    def test_rule(self) -> None:
+        with self.assertRaises(ValueError):
+            ToneSandhiRule((Tone("˥˧"),), ())
+        with self.assertRaises(ValueError):
+            ToneSandhiRule((), ())
+        rule = ToneSandhiRule((Tone("˥˧"), None), (Tone("˥˥"), Tone("˧˩")), True)
+        self.assertEqual(str(rule), "#˥˧._ -> ˥˥.˧˩")
+        self.assertEqualAndHashEqual(
+            rule, ToneSandhiRule((Tone("˥˧"), None), (Tone("˥˥"), Tone("˧˩")), True)
+        )
+
+    def test_sequence(self) -> None:
+        se = Syllable(Initial("s"), Final(nucleus=Nucleus("e")), Tone("˥˧"))
+        noq = Syllable(Initial("n"), Final(nucleus=Nucleus("o"), coda=Coda("ʔ")))
+        word = SyllableSequence([se, noq])
+        self.assertEqual(str(word), "se˥˧.noʔ")
+        self.assertEqual(len(word), 2)
+        self.assertEqual(word[0], se)
+        self.assertEqual(word[1:], SyllableSequence([noq]))
+        self.assertEqual(list(word), [se, noq])
+        self.assertEqual(word.tones, (Tone("˥˧"), Tone()))
+        self.assertEqual(word.ipa_str, IPAString("se˥˧noʔ"))
+        self.assertEqualAndHashEqual(word, SyllableSequence((se, noq)))
+        self.assertNotEqual(word, [se, noq])
+        repr(word)
+
+    def test_apply(self) -> None:
+        def syllables(*tones: str):
+            return [
+                Syllable(Initial("m"), Final(nucleus=Nucleus("a")), Tone(tone))
+                for tone in tones
+            ]
+
+        # Mandarin third tone sandhi, applied left to right
+        third = ToneSandhi(
+            [ToneSandhiRule((Tone("˨˩˦"), Tone("˨˩˦")), (Tone("˧˥"), None))]
+        )
+        self.assertEqual(
+            third.apply(syllables("˨˩˦", "˨˩˦", "˨˩˦")),
+            SyllableSequence(syllables("˧˥", "˧˥", "˨˩˦")),
+        )
+        stream = syllables("˨˩˦", "˥", "˨˩˦", "˨˩˦", "˨˩˦", "˨˩˦")
+        self.assertEqual(
+            list(third.apply_stream(iter(stream))), list(third.apply(stream))
+        )
+        self.assertEqual(list(third.apply_stream([])), [])
+
+        # Shanghainese tones spread from the first syllable of a word
+        wu = ToneSandhi(
+            [
+                ToneSandhiRule(
+                    (Tone("˥˧"), None, None),
+                    (Tone("˥˥"), Tone("˧˧"), Tone("˧˩")),
+                    word_initial=True,
+                    word_final=True,
+                ),
+                ToneSandhiRule(
+                    (Tone("˥˧"), None),
+                    (Tone("˥˥"), Tone("˧˩")),
+                    word_initial=True,
+                    word_final=True,
+                ),
+            ]
+        )
+        self.assertEqual(wu.window_size, 3)
+        words = [
+            syllables("˥˧", "˩˧"),
+            syllables("˥˧", "˩˧", "˥˧"),
+            syllables("˩˧", "˥˧"),
+            syllables("˥˧", "˩˧", "˥˧", "˩˧"),
+            syllables("˥˧"),
+        ]
+        results = wu.apply_many(iter(words))
+        self.assertEqual(next(results).tones, (Tone("˥˥"), Tone("˧˩")))
+        self.assertEqual(
+            [word.tones for word in results],
+            [
+                (Tone("˥˥"), Tone("˧˧"), Tone("˧˩")),
+                (Tone("˩˧"), Tone("˥˧")),
+                (Tone("˥˧"), Tone("˩˧"), Tone("˥˧"), Tone("˩˧")),
+                (Tone("˥˧"),),
+            ],
+        )
+        for word in words:
+            self.assertEqual(list(wu.apply_stream(word)), list(wu.apply(word)))
+        table_size = wu.table_size
+        for word in words * 3:
+            wu.apply(word)
+        self.assertEqual(wu.table_size, table_size)
+
+        untouched = syllables("˥˧", "˩˧")
+        self.assertIs(ToneSandhi([]).apply(untouched)[0], untouched[0])
+        repr(wu)
+
+
+class TestPhonologyGenerator(BaseTestCase):
+    def test_generate(self) -> None:
+        generator = PhonologyGenerator(500, seed=1)
+        str(generator)
+        table = generator.syllable_table()
+        self.assertEqual(len(table), 500)
+        self.assertEqual(
+            table.keys, PhonologyGenerator(500, seed=1).syllable_table().keys
+        )
+        self.assertNotEqual(
+            set(generator.syllables()), set(PhonologyGenerator(500, seed=2).syllables())
+        )
+        self.assertEqual(
+            list(map(str, generator.phonological_rules())),
+            list(map(str, PhonologyGenerator(500, seed=1).phonological_rules())),
+        )
+
+        initials, finals, tones = generator.inventory()
+        phonology = generator.phonology()
+        self.assertEqual(phonology.syllables, set(table))
+        self.assertLessEqual(phonology.initials, set(initials))
+        self.assertLessEqual(phonology.finals, set(finals))
+        self.assertLessEqual(phonology.tones, set(tones))
+        self.assertEqual(len(phonology.phonotactics), 10)
+
+        with TemporaryDirectory() as directory:
+            file_path = path.join(directory, "synthetic.syllables")
+            generator.write_inventory(file_path)
+            with SyllableInventory.open(file_path) as inventory:
+                self.assertEqual(inventory, phonology.syllables)
+
+        with self.assertRaises(ValueError):
+            PhonologyGenerator(0)
+        with self.assertRaises(ValueError):
+            PhonologyGenerator(10, collocation_density=0)
+        with self.assertRaises(ValueError):
+            PhonologyGenerator(10**12)
+
+    def test_render(self) -> None:
+        # rendering with a render plan is the same as applying
+        # the constraints and rules one by one, whatever the phonology
+        for seed in range(5):
+            generator = PhonologyGenerator(
+                200,
+                seed=seed,
+                n_phonotactics=20,
+                n_phonological_rules=10,
+                max_clauses=3,
+            )
+            phonotactics = tuple(generator.phonotactics())
+            phonological_rules = tuple(generator.phonological_rules())
+            plan = RenderPlan(phonotactics, phonological_rules)
+            for syllable in generator.syllables():
+                expected = SyllableInPhonology.from_syllable(syllable)
+                expected.acceptability = PhonotacticAcceptability(True, True)
+                for constraint in phonotactics:
+                    constraint.apply_in_place(expected)
+                for rule in phonological_rules:
+                    rule.apply_in_place(expected)
+
+                rendered = plan.render(syllable)
+                self.assertEqual(rendered.acceptability, expected.acceptability)
+                self.assertEqual(rendered.phonetic_overlay, expected.phonetic_overlay)
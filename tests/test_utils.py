@@ -3,6 +3,8 @@ from sinophone.utils import (
     PostInitCaller,
     PrettyClass,
     fix_ipapy_import_from_collections,
+    has_capability,
+    type_capabilities,
 )
 
 from .utils import BaseTestCase
@@ -21,6 +23,17 @@ class TestUtils(BaseTestCase):
 
         self.assertTrue(foo.called)
 
+    def test_type_capabilities(self) -> None:
+        class Foo(PrettyClass):
+            pass
+
+        self.assertEqual(
+            type_capabilities(Foo), frozenset(["Foo", "PrettyClass", "object"])
+        )
+        self.assertIs(type_capabilities(Foo), type_capabilities(Foo))
+        self.assertTrue(has_capability(Foo(), "PrettyClass"))
+        self.assertFalse(has_capability(Foo(), "IPAChar"))
+
     def test_translated_name(self) -> None:
         class Foo(PrettyClass):
             """